@@ -0,0 +1,71 @@
+# benchmarks/bench_auth.py
+"""
+Korumalı bir endpoint'in (GET /users/me) saniyedeki istek sayısını ölçer.
+
+Üç durum karşılaştırılır:
+- legacy: 'uid' claim'i olmayan eski token, önbellek kapalı
+  (her istekte JWT çözümü + e-postayla kullanıcı sorgusu)
+- uid: 'uid' claim'li token, önbellek kapalı (birincil anahtarla sorgu)
+- cached: 'uid' claim'li token, token ve kullanıcı önbelleği açık
+
+Uygulama geçici bir SQLite veritabanıyla süreç içinde çalışır; istekler
+ASGI üzerinden (ağ olmadan) sırayla gönderilir.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_auth --requests 2000
+"""
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+
+
+async def _measure(http, headers: dict, requests: int) -> float:
+    # Isınma
+    for _ in range(20):
+        (await http.get("/users/me", headers=headers)).raise_for_status()
+    start = time.perf_counter()
+    for _ in range(requests):
+        (await http.get("/users/me", headers=headers)).raise_for_status()
+    return requests / (time.perf_counter() - start)
+
+
+async def _run(args):
+    import httpx
+
+    from benchmarks.load_ai_latency import _setup_app
+    app, _ = _setup_app()
+    from core import auth_cache, security
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        await http.post("/users/", json={"email": "bench@example.com", "password": "benchmark-password"})
+        token = (await http.post(
+            "/auth/token", data={"username": "bench@example.com", "password": "benchmark-password"}
+        )).json()["access_token"]
+        legacy_token = security.create_access_token({"sub": "bench@example.com"}, timedelta(minutes=30))
+
+        ttl = auth_cache.token_cache.ttl
+        results = []
+        for name, bearer, cache_ttl in (("legacy", legacy_token, 0), ("uid", token, 0), ("cached", token, ttl)):
+            for cache in (auth_cache.token_cache, auth_cache.user_cache):
+                cache.clear()
+                cache.ttl = cache_ttl
+            rps = await _measure(http, {"Authorization": f"Bearer {bearer}"}, args.requests)
+            results.append((name, rps))
+
+    print(f"requests={args.requests} endpoint=GET /users/me auth_cache_ttl={ttl}s")
+    baseline = results[0][1]
+    for name, rps in results:
+        print(f"{name:<8} {rps:8.0f} istek/s  ({rps / baseline:4.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_chat_stream.py
+"""
+/ai/chat ile /ai/chat/stream'i ağ erişimi olmadan karşılaştırır.
+
+Sahte LLM sunucusu (fake_llm_server) ve uygulama aynı süreçte, ayrı
+thread'lerde gerçek uvicorn sunucuları olarak başlatılır; istemci HTTP
+üzerinden bağlanır. Her uç için ilk içeriğin gelme süresi (TTFT) ve toplam
+süre p50/p95 olarak raporlanır. Son turda akış yarıda kesilip geçmişe
+yazılmadığı kontrol edilir.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_chat_stream --requests 20 --token-delay 0.02
+"""
+import argparse
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def _ms(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    from benchmarks.fake_llm_server import create_app
+
+    llm_port = _free_port()
+    _serve(create_app(args.first_token_delay, args.token_delay), llm_port)
+
+    # Uygulama ayarları import anında okunur; sahte sunucuyu önce tanıt
+    os.environ["openai_base_url"] = f"http://127.0.0.1:{llm_port}/v1"
+    os.environ["openai_api_key"] = "fake"
+    # Kesilen akışın geçmişe yazılmadığını sayarak görebilmek için sınırı kaldır
+    os.environ["chat_history_max_messages"] = str(10 * args.requests)
+    from benchmarks.load_ai_latency import _setup_app
+    app, _ = _setup_app()
+    app_port = _free_port()
+    _serve(app, app_port)
+
+    import httpx
+
+    base = f"http://127.0.0.1:{app_port}"
+    with httpx.Client(base_url=base, timeout=60) as http:
+        http.post("/users/", json={"email": "bench@example.com", "password": "benchmark-password"})
+        token = http.post(
+            "/auth/token", data={"username": "bench@example.com", "password": "benchmark-password"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        body = {"message": "Which chart should I use?"}
+
+        plain_total = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            http.post("/ai/chat", json=body, headers=headers).raise_for_status()
+            plain_total.append(time.perf_counter() - start)
+
+        stream_first, stream_total = [], []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            first = None
+            with http.stream("POST", "/ai/chat/stream", json=body, headers=headers) as response:
+                for line in response.iter_lines():
+                    if first is None and line == "event: token":
+                        first = time.perf_counter() - start
+            stream_first.append(first)
+            stream_total.append(time.perf_counter() - start)
+
+        # Akışı ilk parçadan sonra kes: geçmiş yazılmamalı
+        with http.stream("POST", "/ai/chat/stream", json=body, headers=headers) as response:
+            for line in response.iter_lines():
+                if line == "event: token":
+                    break
+
+    from core.chat_history import chat_history
+    time.sleep(args.first_token_delay + 0.5)
+    stored = len(chat_history.load(1))
+
+    print(f"requests={args.requests} first_token_delay={args.first_token_delay}s token_delay={args.token_delay}s")
+    print(f"{'/ai/chat':<18} TTFT p50={_ms(plain_total, 50):8.1f} ms  p95={_ms(plain_total, 95):8.1f} ms  (cevap tamamı)")
+    print(f"{'/ai/chat/stream':<18} TTFT p50={_ms(stream_first, 50):8.1f} ms  p95={_ms(stream_first, 95):8.1f} ms")
+    print(f"{'/ai/chat/stream':<18} total p50={_ms(stream_total, 50):7.1f} ms  p95={_ms(stream_total, 95):8.1f} ms")
+    expected = 2 * 2 * args.requests  # Tamamlanan her istek için kullanıcı + asistan mesajı
+    print(f"geçmişteki mesaj sayısı: {stored} (beklenen {expected}; kesilen akış yazılmamalı)")
+
+
+if __name__ == "__main__":
+    main()
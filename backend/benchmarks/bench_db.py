@@ -0,0 +1,103 @@
+# benchmarks/bench_db.py
+"""
+Eşzamanlı dosya yükleme ve dosya listeleme altında veritabanı verimini ölçer.
+
+'--uploaders' istemci sürekli aynı küçük CSV'yi yükler (içerik tekilleştirildiği
+için ayrıştırma yapılmaz; ölçülen iş ağırlıklı olarak DB yazımıdır),
+'--listers' istemci sürekli GET /files/ çağırır. Saniyedeki işlem sayısı ve
+p50/p99 gecikme raporlanır. Uygulama geçici bir SQLite dosyasıyla süreç
+içinde çalışır.
+
+'--baseline' eski varsayılanları kullanır (journal_mode=delete,
+synchronous=full, mmap yok, varsayılan sayfa önbelleği).
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_db --baseline
+    python -m benchmarks.bench_db
+"""
+import argparse
+import asyncio
+import io
+import os
+import time
+
+import numpy as np
+
+BASELINE_ENV = {
+    "sqlite_journal_mode": "delete",
+    "sqlite_synchronous": "full",
+    "sqlite_mmap_size": "0",
+    "sqlite_cache_size_kib": "2000",
+}
+
+
+def _ms(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else float("nan")
+
+
+async def _run(args):
+    import httpx
+
+    if args.baseline:
+        os.environ.update(BASELINE_ENV)
+    from benchmarks.load_ai_latency import _setup_app
+    app, _ = _setup_app()
+    from core.config import settings
+
+    csv = b"date,category,value\n" + b"".join(b"2024-01-%02d,c%d,%d\n" % (i % 28 + 1, i % 5, i) for i in range(50))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        await http.post("/users/", json={"email": "bench@example.com", "password": "benchmark-password"})
+        token = (await http.post(
+            "/auth/token", data={"username": "bench@example.com", "password": "benchmark-password"}
+        )).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        # İlk yükleme içeriği ayrıştırır; sonrakiler aynı içeriği paylaşır
+        (await http.post("/files/upload", files={"file": ("b.csv", io.BytesIO(csv), "text/csv")},
+                         headers=headers)).raise_for_status()
+
+        stop = asyncio.Event()
+        upload_latencies, list_latencies = [], []
+
+        async def uploader():
+            while not stop.is_set():
+                start = time.perf_counter()
+                response = await http.post(
+                    "/files/upload", files={"file": ("b.csv", io.BytesIO(csv), "text/csv")}, headers=headers
+                )
+                response.raise_for_status()
+                upload_latencies.append(time.perf_counter() - start)
+
+        async def lister():
+            while not stop.is_set():
+                start = time.perf_counter()
+                (await http.get("/files/", headers=headers)).raise_for_status()
+                list_latencies.append(time.perf_counter() - start)
+
+        tasks = [asyncio.create_task(uploader()) for _ in range(args.uploaders)]
+        tasks += [asyncio.create_task(lister()) for _ in range(args.listers)]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    print(f"journal_mode={settings.sqlite_journal_mode} synchronous={settings.sqlite_synchronous} "
+          f"mmap={settings.sqlite_mmap_size} pool={settings.db_pool_size}+{settings.db_max_overflow} "
+          f"uploaders={args.uploaders} listers={args.listers} duration={args.duration}s")
+    for name, values in (("upload", upload_latencies), ("list", list_latencies)):
+        print(f"{name:<7} {len(values) / args.duration:7.1f} /s  p50={_ms(values, 50):7.1f} ms  "
+              f"p99={_ms(values, 99):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploaders", type=int, default=8)
+    parser.add_argument("--listers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--baseline", action="store_true", help="Eski SQLite varsayılanlarıyla çalıştır")
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_downsampling.py
+"""
+Downsampling algoritmalarının hız ve hata ölçümü.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_downsampling --rows 10000000 --points 2000
+
+Her yöntem için süre ve tam seriye göre hata raporlanır (hepsi Y aralığına
+oranla normalize):
+- nRMSE / nMaxErr: seçilen noktaların doğrusal interpolasyonunun tüm X
+  değerlerindeki sapması
+- envErr: grafik genişliğindeki her piksel sütununda gerçek min/max zarfı
+  ile seçilen noktaların zarfı arasındaki ortalama fark (görsel şekil hatası)
+'head' satırı, eski davranışı (ilk N satır) karşılaştırma için gösterir;
+interpolasyon son seçilen noktadan sonra sabit kalır.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from core import downsampling
+
+
+def make_series(rows: int, seed: int = 42) -> tuple[np.ndarray, np.ndarray]:
+    """Gürültülü rastgele yürüyüş + seyrek ani sıçramalar içeren bir zaman serisi."""
+    rng = np.random.default_rng(seed)
+    x = np.arange(rows, dtype=float)
+    y = np.cumsum(rng.normal(0, 1, rows)) + rng.normal(0, 5, rows)
+    spikes = rng.choice(rows, size=max(rows // 100_000, 1), replace=False)
+    y[spikes] += rng.choice([-1, 1], size=len(spikes)) * 500
+    return x, y
+
+
+def series_error(x: np.ndarray, y: np.ndarray, selected: np.ndarray) -> tuple[float, float]:
+    """(normalize RMSE, normalize max hata) döndürür."""
+    approx = np.interp(x, x[selected], y[selected])
+    y_range = float(y.max() - y.min()) or 1.0
+    diff = np.abs(approx - y)
+    return float(np.sqrt(np.mean(diff ** 2))) / y_range, float(diff.max()) / y_range
+
+
+def envelope_error(y: np.ndarray, selected: np.ndarray, columns: int) -> float:
+    """Piksel sütunu başına min/max zarf farkının ortalaması."""
+    bounds = np.linspace(0, len(y), columns + 1).astype(np.int64)[:-1]
+    true_min = np.minimum.reduceat(y, bounds)
+    true_max = np.maximum.reduceat(y, bounds)
+
+    column_of = np.searchsorted(bounds, selected, side="right") - 1
+    sel_min = np.full(columns, np.nan)
+    sel_max = np.full(columns, np.nan)
+    np.fmin.at(sel_min, column_of, y[selected])
+    np.fmax.at(sel_max, column_of, y[selected])
+    # Hiç nokta düşmeyen sütunlarda grafik komşu noktaları birleştirir; o sütunu atla
+    covered = ~np.isnan(sel_min)
+    y_range = float(y.max() - y.min()) or 1.0
+    diff = np.abs(true_min - sel_min)[covered] + np.abs(true_max - sel_max)[covered]
+    missing = (~covered).sum() * 2 * y_range
+    return float((diff.sum() + missing) / (2 * columns)) / y_range
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--points", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--width", type=int, default=1000, help="Grafik genişliği (piksel sütunu)")
+    args = parser.parse_args()
+
+    x, y = make_series(args.rows)
+    print(f"rows={args.rows:,} points={args.points:,}")
+    print(f"{'method':<8} {'best ms':>10} {'selected':>9} {'nRMSE':>9} {'nMaxErr':>9} {'envErr':>9}")
+
+    candidates = {method: None for method in downsampling.METHODS}
+    candidates["head"] = lambda _x, _y, n: np.arange(min(n, len(_x)))
+
+    for method, func in candidates.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            if func is None:
+                selected = downsampling.downsample(x, y, method, args.points)
+            else:
+                selected = func(x, y, args.points)
+            timings.append(time.perf_counter() - start)
+
+        rmse, max_err = series_error(x, y, selected)
+        env_err = envelope_error(y, selected, args.width)
+        print(f"{method:<8} {min(timings) * 1000:>10.1f} {len(selected):>9,} "
+              f"{rmse:>9.4f} {max_err:>9.4f} {env_err:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/bench_http_cache.py
+"""
+Grafik ve meta veri endpoint'lerinde aktarılan bayt miktarını ölçer:
+
+- identity: sıkıştırmasız cevap
+- gzip / zstd: Accept-Encoding ile sıkıştırılmış cevap
+- 304: aynı isteğin ETag ile (If-None-Match) tekrarı; grafik değiştirip geri
+  dönen bir istemcinin dosya değişmediğinde indirdiği miktar
+
+Bayt sayıları ağdan gelen ham gövdedir (açılmadan önce); süre, isteğin
+uygulama içindeki toplam süresidir. Uygulama geçici bir SQLite dosyasıyla
+süreç içinde çalışır.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_http_cache --rows 100000
+"""
+import argparse
+import asyncio
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _csv(n: int) -> bytes:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=n, freq="min").strftime("%Y-%m-%d %H:%M:%S"),
+        "category": rng.choice(["north", "south", "east", "west"], n),
+        "value": rng.normal(size=n).round(4),
+        "count": rng.integers(0, 1000, n),
+    })
+    return df.to_csv(index=False).encode()
+
+
+async def _fetch(http, url: str, headers: dict):
+    start = time.perf_counter()
+    async with http.stream("GET", url, headers=headers) as response:
+        size = 0
+        async for chunk in response.aiter_raw():
+            size += len(chunk)
+    return response, size, time.perf_counter() - start
+
+
+async def _run(args):
+    import httpx
+
+    from benchmarks.load_ai_latency import _setup_app
+    app, _ = _setup_app()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        await http.post("/users/", json={"email": "bench@example.com", "password": "benchmark-password"})
+        token = (await http.post(
+            "/auth/token", data={"username": "bench@example.com", "password": "benchmark-password"}
+        )).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+        upload = await http.post(
+            "/files/upload", files={"file": ("bench.csv", io.BytesIO(_csv(args.rows)), "text/csv")}, headers=auth
+        )
+        upload.raise_for_status()
+        file_id = upload.json()["id"]
+
+        arrow = {"Accept": "application/vnd.apache.arrow.stream"}
+        endpoints = [
+            ("data records 10k", f"/visualize/{file_id}/data?limit=10000", {}),
+            ("data columnar 10k", f"/visualize/{file_id}/data?limit=10000&format=columnar", {}),
+            ("data arrow 100k", f"/visualize/{file_id}/data?limit=100000", arrow),
+            ("aggregate", f"/visualize/{file_id}/aggregate?chartType=bar&xColumn=category&yColumn=value", {}),
+            ("series", f"/visualize/{file_id}/series?xColumn=count&yColumn=value&points=2000", {}),
+            ("profile", f"/files/{file_id}/profile", {}),
+            ("analyze (local)", f"/ai/analyze_file/{file_id}?mode=local", {}),
+        ]
+
+        print(f"rows={args.rows}")
+        print(f"{'endpoint':<20} {'identity':>10} {'gzip':>10} {'zstd':>10} {'304':>6} {'saved':>7} "
+              f"{'200 time':>9} {'304 time':>9}")
+        for name, url, extra in endpoints:
+            sizes = {}
+            for encoding in ("identity", "gzip", "zstd"):
+                response, sizes[encoding], elapsed = await _fetch(
+                    http, url, {**auth, **extra, "Accept-Encoding": encoding}
+                )
+                response.raise_for_status()
+                if encoding == "zstd":
+                    full_time, etag = elapsed, response.headers["etag"]
+            response, not_modified, revalidate_time = await _fetch(
+                http, url, {**auth, **extra, "Accept-Encoding": "zstd", "If-None-Match": etag}
+            )
+            assert response.status_code == 304, response.status_code
+            saved = 1 - min(sizes.values()) / sizes["identity"]
+            print(f"{name:<20} {sizes['identity']:>10} {sizes['gzip']:>10} {sizes['zstd']:>10} {not_modified:>6} "
+                  f"{saved:6.1%} {full_time * 1000:7.1f}ms {revalidate_time * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_json_encoding.py
+"""
+/visualize/{id}/data cevabının kodlanmasını karşılaştırır: yük boyutu ve
+serileştirme süresi.
+
+- records: mevcut yol; astype(object).where(...) + to_dict("records") +
+  FastAPI'nin jsonable_encoder'ı + stdlib json (JSONResponse ayarlarıyla)
+- columnar: json_encoding.dumps_columnar (NumPy dizilerinden orjson)
+- arrow: arrow_encoding.iter_ipc_stream (Parquet'ten okunan Arrow tablosundan
+  IPC stream; 'Accept: application/vnd.apache.arrow.stream' yolu)
+
+Veri; tarih, kategori, boşluklu ondalık ve tamsayı sütunlarından oluşur.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_json_encoding --rows 1000 100000 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    value = rng.normal(size=n)
+    value[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=n, freq="min"),
+        "category": rng.choice(["north", "south", "east", "west"], n),
+        "value": value,
+        "count": rng.integers(0, 1000, n),
+    })
+
+
+def _records(df: pd.DataFrame) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+
+    cleaned = df.astype(object).where(pd.notnull(df), None)
+    payload = {"columns": list(cleaned.columns), "data": cleaned.to_dict(orient="records")}
+    # starlette.responses.JSONResponse.render ile aynı ayarlar
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _columnar(df: pd.DataFrame) -> bytes:
+    from core.json_encoding import dumps_columnar
+
+    return dumps_columnar(df)
+
+
+def _arrow(table) -> bytes:
+    from core.arrow_encoding import iter_ipc_stream
+
+    return b"".join(iter_ipc_stream(table))
+
+
+def _time(func, data, repeat: int):
+    best, content = float("inf"), b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = func(data)
+        best = min(best, time.perf_counter() - start)
+    return best, len(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3, help="En iyi süre için tekrar (1M satırda 1)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'encoding':<9} {'time':>10} {'size':>10} {'speedup':>8} {'size ratio':>10}")
+    for n in args.rows:
+        df = _frame(n)
+        repeat = 1 if n >= 1_000_000 else args.repeat
+        base_time, base_size = _time(_records, df, repeat)
+        print(f"{n:>9} {'records':<9} {base_time * 1000:8.1f}ms {base_size / 1e6:8.2f}MB")
+        # Endpoint Arrow tablosunu Parquet'ten okur; dönüşüm ölçüme dahil değil
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for name, func, data in (("columnar", _columnar, df), ("arrow", _arrow, table)):
+            fast_time, fast_size = _time(func, data, repeat)
+            print(f"{n:>9} {name:<9} {fast_time * 1000:8.1f}ms {fast_size / 1e6:8.2f}MB "
+                  f"{base_time / fast_time:7.1f}x {fast_size / base_size:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
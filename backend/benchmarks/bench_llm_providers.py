@@ -0,0 +1,104 @@
+# benchmarks/bench_llm_providers.py
+"""
+LLM sağlayıcılarının verimini (istek/saniye) ağ erişimi olmadan ölçer.
+
+- stub: ağ kullanmayan sağlayıcı ('--stub-delay' yapay gecikmesiyle)
+- local: süreç içinde uvicorn ile başlatılan OpenAI uyumlu sahte sunucu
+  (fake_llm_server) üzerinden; bağlantı havuzu, eşzamanlılık sınırı ve
+  HTTP/JSON maliyeti dahil
+
+Her sağlayıcıya '--requests' istek, '--clients' eşzamanlı istemciyle
+gönderilir; toplam süre, istek/saniye ve p50/p95 gecikme raporlanır.
+'--max-concurrency' sağlayıcının aynı anda upstream'e gönderdiği istek
+sayısıdır (llm_max_concurrency).
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_llm_providers --requests 200 --clients 32 --max-concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MESSAGES = [{"role": "user", "content": "Which chart should I use?"}]
+
+
+async def _measure(provider, requests: int, clients: int, stream: bool):
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def one():
+        if stream:
+            async for _ in provider.stream(MESSAGES, model="bench"):
+                pass
+        else:
+            await provider.complete(MESSAGES, model="bench")
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            await one()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return time.perf_counter() - start, latencies
+
+
+def _report(name: str, total: float, latencies):
+    p50, p95 = (float(np.percentile(latencies, q)) * 1000 for q in (50, 95))
+    print(f"{name:<14} n={len(latencies):<5} {len(latencies) / total:8.1f} istek/s  "
+          f"p50={p50:8.1f} ms  p95={p95:8.1f} ms")
+
+
+async def _run(args):
+    from benchmarks.bench_chat_stream import _free_port, _serve
+    from benchmarks.fake_llm_server import create_app
+    # Ayarlar import anında okunur; veritabanı bu ölçümde kullanılmaz
+    os.environ.setdefault("database_url", "sqlite://")
+    os.environ.setdefault("llm_provider", "stub")
+    from core import llm
+
+    port = _free_port()
+    server = _serve(create_app(args.first_token_delay, args.token_delay), port)
+
+    providers = [
+        ("stub", llm.StubProvider(delay=args.stub_delay)),
+        ("local", llm.LocalProvider(
+            base_url=f"http://127.0.0.1:{port}/v1",
+            max_concurrency=args.max_concurrency,
+            max_connections=args.max_concurrency,
+        )),
+    ]
+    print(f"requests={args.requests} clients={args.clients} max_concurrency={args.max_concurrency} "
+          f"first_token_delay={args.first_token_delay}s token_delay={args.token_delay}s")
+    for name, provider in providers:
+        for stream in (False, True):
+            total, latencies = await _measure(provider, args.requests, args.clients, stream)
+            _report(f"{name}{' stream' if stream else ''}", total, latencies)
+        await provider.aclose()
+    server.should_exit = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--stub-delay", type=float, default=0.0)
+    parser.add_argument("--first-token-delay", type=float, default=0.05)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_login.py
+"""
+Eşzamanlı giriş (POST /auth/token) yükü altında saniyedeki başarılı giriş
+sayısını, giriş gecikmesini (p50/p99) ve reddedilen (503) istekleri ölçer.
+Aynı sürede '/' ucuna düzenli istek atılarak giriş dalgasının diğer
+endpoint'lere etkisi (p99) de raporlanır.
+
+Argon2 parametreleri ve şifre havuzu ortam değişkenleriyle verilebilir:
+    argon2_time_cost=2 argon2_memory_cost=32768 password_hash_workers=4 \\
+        python -m benchmarks.bench_login --clients 32 --duration 10
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_login --clients 16 --duration 10
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+
+def _ms(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else float("nan")
+
+
+async def _run(args):
+    import httpx
+
+    from benchmarks.load_ai_latency import _setup_app
+    app, _ = _setup_app()
+    from core.config import settings
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        credentials = {"username": "bench@example.com", "password": "benchmark-password"}
+        await http.post("/users/", json={"email": credentials["username"], "password": credentials["password"]})
+
+        stop = asyncio.Event()
+        login_latencies, probe_latencies = [], []
+        rejected = 0
+
+        async def login_worker():
+            nonlocal rejected
+            while not stop.is_set():
+                start = time.perf_counter()
+                response = await http.post("/auth/token", data=credentials)
+                if response.status_code == 503:
+                    rejected += 1
+                    # İstemci Retry-After'a uyar gibi kısa bir süre bekler
+                    await asyncio.sleep(0.05)
+                    continue
+                response.raise_for_status()
+                login_latencies.append(time.perf_counter() - start)
+
+        async def probe():
+            while not stop.is_set():
+                start = time.perf_counter()
+                await http.get("/")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        tasks = [asyncio.create_task(login_worker()) for _ in range(args.clients)]
+        tasks.append(asyncio.create_task(probe()))
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    print(f"clients={args.clients} duration={args.duration}s "
+          f"argon2(t={settings.argon2_time_cost}, m={settings.argon2_memory_cost} KiB, p={settings.argon2_parallelism}) "
+          f"workers={settings.password_hash_workers} queue_limit={settings.password_hash_queue_limit}")
+    print(f"giriş: {len(login_latencies) / args.duration:6.1f} /s  "
+          f"p50={_ms(login_latencies, 50):8.1f} ms  p99={_ms(login_latencies, 99):8.1f} ms  reddedilen(503)={rejected}")
+    print(f"'/':   n={len(probe_latencies):<5}      p50={_ms(probe_latencies, 50):8.1f} ms  "
+          f"p99={_ms(probe_latencies, 99):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
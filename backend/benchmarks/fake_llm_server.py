@@ -0,0 +1,105 @@
+# benchmarks/fake_llm_server.py
+"""
+Ağ erişimi olmadan AI uçlarını denemek için OpenAI uyumlu sahte LLM sunucusu.
+
+Sadece '/v1/chat/completions' desteklenir. Cevap sabittir ve kelime kelime
+üretilir; '--first-token-delay' ilk parçadan önceki bekleme, '--token-delay'
+parçalar arasındaki beklemedir. 'stream=true' ile istenirse OpenAI'nin SSE
+biçiminde ('data: {...}' ... 'data: [DONE]') parça parça gönderir.
+'response_format' json_object ise geçerli bir grafik önerisi JSON'u döner.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.fake_llm_server --port 8001 --token-delay 0.02
+    # .env: openai_base_url=http://127.0.0.1:8001/v1  openai_api_key=fake
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+DEFAULT_REPLY = (
+    "Based on the columns in your file, a line chart with the date column on the X-axis "
+    "and the main numeric column on the Y-axis shows the trend best. A bar chart grouped by "
+    "the categorical column is a good second option for comparing totals."
+)
+
+
+def create_app(first_token_delay: float = 0.2, token_delay: float = 0.02, reply: str = DEFAULT_REPLY) -> FastAPI:
+    app = FastAPI()
+
+    def _content(body: dict) -> str:
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            return json.dumps({"chartType": "bar", "xColumn": "", "yColumn": "", "reason": "fake llm"})
+        return reply
+
+    def _pieces(text: str, max_tokens: int | None) -> list[str]:
+        words = text.split(" ")
+        if max_tokens:
+            words = words[:max_tokens]
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake")
+        pieces = _pieces(_content(body), body.get("max_tokens"))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(first_token_delay + token_delay * len(pieces))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(pieces)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(pieces), "total_tokens": len(pieces)},
+            }
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events():
+            await asyncio.sleep(first_token_delay)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                yield chunk({"content": piece})
+                await asyncio.sleep(token_delay)
+            yield chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--first-token-delay", type=float, default=0.2, help="İlk parçadan önceki bekleme (saniye)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Parçalar arası bekleme (saniye)")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.first_token_delay, args.token_delay), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
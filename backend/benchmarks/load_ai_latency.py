@@ -0,0 +1,135 @@
+# benchmarks/load_ai_latency.py
+"""
+AI çağrıları sürerken diğer endpoint'lerin gecikmesini ölçen yük testi.
+
+Uygulama, geçici bir SQLite veritabanı ve sahte (yavaş) bir LLM sağlayıcısı ile
+süreç içinde çalıştırılır. Belirtilen sayıda /ai/analyze_file isteği sürekli
+havadayken '/' ve '/visualize/{id}/data' uçlarına istek atılır ve p50/p99
+gecikmeleri raporlanır.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.load_ai_latency --llm-delay 2 --ai-concurrency 8
+    python -m benchmarks.load_ai_latency --blocking   # eski senkron istemciyi taklit eder
+
+'--blocking' modunda sahte LLM, eski 'OpenAI().chat.completions.create'
+gibi event loop'u time.sleep ile bloklar; karşılaştırma için kullanılır.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _setup_app():
+    """Geçici bir çalışma klasöründe uygulamayı içe aktarır."""
+    work_dir = tempfile.mkdtemp(prefix="visdata-bench-")
+    os.chdir(work_dir)
+    os.makedirs("uploaded_files", exist_ok=True)
+    os.environ["database_url"] = f"sqlite:///{work_dir}/bench.db"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import main
+    from routers import ai
+    return main.app, ai
+
+
+def _fake_llm(delay: float, blocking: bool):
+    """Sabit gecikmeyle JSON cevap veren sahte LLM sağlayıcısı."""
+    from core import llm
+
+    content = json.dumps({"chartType": "bar", "xColumn": "cat", "yColumn": "value", "reason": "bench"})
+
+    class FakeProvider(llm.LLMProvider):
+        name = "bench"
+
+        async def complete(self, messages, model, temperature=0.7, max_tokens=None, json_mode=False):
+            if blocking:
+                time.sleep(delay)
+            else:
+                await asyncio.sleep(delay)
+            return content
+
+    return FakeProvider()
+
+
+def _percentile(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else float("nan")
+
+
+async def _run(args):
+    import httpx
+
+    app, _ = _setup_app()
+    from core import llm
+    llm.provider = _fake_llm(args.llm_delay, args.blocking)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        await http.post("/users/", json={"email": "bench@example.com", "password": "benchmark-password"})
+        token = (await http.post(
+            "/auth/token", data={"username": "bench@example.com", "password": "benchmark-password"}
+        )).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        n = args.rows
+        df = pd.DataFrame({"cat": np.random.choice(list("abcdef"), n), "value": np.random.randn(n)})
+        upload = await http.post(
+            "/files/upload",
+            files={"file": ("bench.csv", io.BytesIO(df.to_csv(index=False).encode()), "text/csv")},
+            headers=headers,
+        )
+        file_id = upload.json()["id"]
+
+        stop = asyncio.Event()
+        ai_done = 0
+
+        async def ai_worker():
+            nonlocal ai_done
+            while not stop.is_set():
+                await http.get(f"/ai/analyze_file/{file_id}", headers=headers)
+                ai_done += 1
+
+        async def probe(path, latencies):
+            while not stop.is_set():
+                start = time.perf_counter()
+                await http.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(args.probe_interval)
+
+        root_latencies, data_latencies = [], []
+        tasks = [asyncio.create_task(ai_worker()) for _ in range(args.ai_concurrency)]
+        tasks.append(asyncio.create_task(probe("/", root_latencies)))
+        tasks.append(asyncio.create_task(probe(f"/visualize/{file_id}/data?limit=100", data_latencies)))
+
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    mode = "blocking (eski senkron istemci)" if args.blocking else "async"
+    print(f"mode={mode} llm_delay={args.llm_delay}s ai_concurrency={args.ai_concurrency} duration={args.duration}s")
+    print(f"tamamlanan AI isteği: {ai_done}")
+    for name, values in (("/", root_latencies), ("/visualize/{id}/data", data_latencies)):
+        median = statistics.median(values) * 1000 if values else float("nan")
+        print(f"{name:<22} n={len(values):<5} p50={median:8.1f} ms  p99={_percentile(values, 99):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-delay", type=float, default=2.0, help="Sahte LLM cevap süresi (saniye)")
+    parser.add_argument("--ai-concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--blocking", action="store_true")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
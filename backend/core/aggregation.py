@@ -0,0 +1,153 @@
+# app/core/aggregation.py
+"""
+Grafik verisi için sunucu tarafı toplama (aggregation) motoru.
+
+Tarayıcıya ham satırlar yerine sadece grafiğin çizeceği seri gönderilir:
+kategoriye göre group-by, sayısal X için histogram (binning) ya da tarih X
+için zaman kovaları (time bucketing). Tüm hesaplar vektörel pandas/NumPy
+işlemleriyle yapılır.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+CHART_TYPES = ("bar", "line", "pie", "scatter", "area")
+AGGREGATIONS = ("sum", "mean", "count", "min", "max")
+
+# API'deki kova adı -> pandas Period frekansı
+TIME_BUCKETS = {
+    "hour": "h",
+    "day": "D",
+    "week": "W",
+    "month": "M",
+    "quarter": "Q",
+    "year": "Y",
+}
+
+MAX_BINS = 500
+# Bar/pie grafiklerde gösterilecek en fazla kategori; kalanlar tek dilimde toplanır
+MAX_CATEGORIES = 50
+OTHER_LABEL = "Diğer"
+
+
+class AggregationError(ValueError):
+    """Geçersiz parametre kombinasyonlarında fırlatılır."""
+
+
+def _numeric(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series
+    return pd.to_numeric(series, errors="coerce")
+
+
+def _group_keys(
+        x: pd.Series,
+        bins: Optional[int],
+        time_bucket: Optional[str]
+) -> tuple[pd.Series, bool]:
+    """
+    Gruplama anahtarlarını üretir. İkinci değer, sonucun X sırasına
+    göre mi (histogram/zaman) yoksa değere göre mi sıralanacağını söyler.
+    """
+    if bins is not None:
+        x_num = _numeric(x)
+        if x_num.notna().sum() == 0:
+            raise AggregationError("Histogram için X sütunu sayısal olmalı.")
+        edges = np.histogram_bin_edges(x_num.dropna().to_numpy(dtype=float), bins=bins)
+        return pd.cut(x_num, edges, include_lowest=True), True
+
+    if time_bucket is not None:
+        if time_bucket not in TIME_BUCKETS:
+            raise AggregationError(f"Geçersiz zaman kovası: {time_bucket}")
+        x_time = x if pd.api.types.is_datetime64_any_dtype(x) else pd.to_datetime(x, errors="coerce")
+        if x_time.notna().sum() == 0:
+            raise AggregationError("Zaman kovası için X sütunu tarih olmalı.")
+        if getattr(x_time.dt, "tz", None) is not None:
+            x_time = x_time.dt.tz_localize(None)
+        return x_time.dt.to_period(TIME_BUCKETS[time_bucket]).dt.start_time, True
+
+    return x, False
+
+
+def _label(value) -> object:
+    if isinstance(value, pd.Interval):
+        return f"{value.left:g} – {value.right:g}"
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def aggregate(
+        df: pd.DataFrame,
+        chart_type: str,
+        x_column: str,
+        y_column: Optional[str],
+        aggregation: str = "sum",
+        bins: Optional[int] = None,
+        time_bucket: Optional[str] = None
+) -> dict:
+    """
+    X sütununa göre gruplayıp Y sütununu toplar ve
+    {"label": ..., "value": ...} listesini döndürür.
+    'count' için Y sütunu gerekmez.
+    """
+    if chart_type not in CHART_TYPES:
+        raise AggregationError(f"Geçersiz grafik tipi: {chart_type}")
+    if aggregation not in AGGREGATIONS:
+        raise AggregationError(f"Geçersiz toplama fonksiyonu: {aggregation}")
+    if bins is not None and time_bucket is not None:
+        raise AggregationError("'bins' ve 'timeBucket' birlikte kullanılamaz.")
+    if bins is not None and not 1 <= bins <= MAX_BINS:
+        raise AggregationError(f"'bins' 1 ile {MAX_BINS} arasında olmalı.")
+    if y_column is None and aggregation != "count":
+        raise AggregationError("'count' dışındaki toplamalar için Y sütunu gerekli.")
+
+    keys, ordered_by_x = _group_keys(df[x_column], bins, time_bucket)
+
+    if y_column is None:
+        values = pd.Series(1, index=df.index)
+    else:
+        values = _numeric(df[y_column])
+
+    grouped = values.groupby(keys, observed=bins is None, sort=True, dropna=True)
+    if aggregation == "count":
+        # Y verilmişse boş olmayan değerleri, verilmemişse satırları say
+        result = grouped.count()
+    else:
+        result = grouped.agg(aggregation)
+
+    # Line/area grafikleri ve histogram/zaman kovaları X sırasını korur,
+    # bar/pie grafiklerinde en büyük değerler öne alınır.
+    truncated = False
+    if not ordered_by_x and chart_type in ("bar", "pie"):
+        result = result.sort_values(ascending=False, kind="stable")
+        if len(result) > MAX_CATEGORIES:
+            head = result.iloc[:MAX_CATEGORIES - 1]
+            rest_values = values[keys.isin(result.index[MAX_CATEGORIES - 1:])]
+            other = rest_values.agg(aggregation)
+            result = pd.concat([head, pd.Series([other], index=[OTHER_LABEL])])
+            truncated = True
+
+    if aggregation == "count":
+        result_values = result.astype("int64")
+    else:
+        result_values = result.astype(float).replace([np.inf, -np.inf], np.nan)
+    data = [
+        {"label": _label(label), "value": None if pd.isna(value) else value}
+        for label, value in zip(result.index, result_values.tolist())
+    ]
+
+    return {
+        "chartType": chart_type,
+        "xColumn": x_column,
+        "yColumn": y_column,
+        "aggregation": aggregation,
+        "bins": bins,
+        "timeBucket": time_bucket,
+        "truncated": truncated,
+        "total_rows": len(df),
+        "data": data
+    }
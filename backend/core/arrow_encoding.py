@@ -0,0 +1,53 @@
+# app/core/arrow_encoding.py
+"""
+Grafik verileri için Apache Arrow IPC (stream) çıktısı.
+
+Tablo, Parquet'ten okunan (veya önbellekteki sütunlardan kurulan) Arrow
+bellek düzeniyle olduğu gibi yazılır; satır başına Python nesnesi üretilmez.
+İstemci (ör. apache-arrow JS) kayıt grupları geldikçe okuyabilir.
+"""
+import io
+from typing import Dict, Iterator, Optional
+
+import pyarrow as pa
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Bir kayıt grubundaki satır sayısı; her grup ayrı bir parça olarak gönderilir
+BATCH_SIZE = 65_536
+
+
+def accepts_arrow(accept: Optional[str]) -> bool:
+    """Accept başlığı Arrow IPC stream istiyor mu?"""
+    if not accept:
+        return False
+    return any(part.split(";")[0].strip().lower() == ARROW_STREAM_MEDIA_TYPE for part in accept.split(","))
+
+
+def iter_ipc_stream(
+        table: pa.Table,
+        metadata: Optional[Dict[str, str]] = None,
+        batch_size: int = BATCH_SIZE
+) -> Iterator[bytes]:
+    """
+    Tabloyu Arrow IPC stream biçiminde parça parça üretir: önce şema
+    ('metadata' şemaya eklenir), sonra her kayıt grubu, en sonda bitiş işareti.
+    """
+    schema = table.schema
+    if metadata:
+        schema = schema.with_metadata({**(schema.metadata or {}), **metadata})
+        table = table.replace_schema_metadata(schema.metadata)
+
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in table.to_batches(max_chunksize=batch_size):
+            writer.write_batch(batch)
+            yield _drain(sink)
+    yield _drain(sink)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
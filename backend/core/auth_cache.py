@@ -0,0 +1,111 @@
+# app/core/auth_cache.py
+"""
+Kimlik doğrulama için kısa ömürlü, boyutu sınırlı süreç içi önbellekler.
+
+- token_cache: token -> doğrulanmış claim'ler. İmza ve süre kontrolü her
+  istekte tekrarlanmaz; kayıt token'ın süresi dolunca kullanılmaz.
+- user_cache: kullanıcı id'si -> kullanıcı satırının sütun değerleri.
+  Korumalı her istekte veritabanına gidilmez.
+
+Kullanıcı bu süreçte değiştirildiğinde veya silindiğinde (ORM üzerinden)
+kaydı SQLAlchemy olaylarıyla hemen ve commit'ten sonra bir kez daha silinir
+(aradaki sürede eski satırı okuyup önbelleğe yazan istek olabilir). Diğer worker'lardaki kopyalar
+en fazla 'auth_cache_ttl_seconds' kadar eski kalabilir.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from core.config import settings
+from database import models
+
+
+class TTLCache:
+    """Kayıt sayısı sınırlı, süreli, thread-safe LRU önbellek. ttl <= 0 ise kapalıdır."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # anahtar -> (son geçerlilik zamanı, değer); en eski kullanılan başta
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Kaydı ekler; 'ttl' verilirse önbelleğin süresinden kısa olanı kullanılır."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+token_cache = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+user_cache = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+
+
+def user_snapshot(user: models.UserDB) -> dict:
+    """Önbellekte tutulan, oturumdan bağımsız sütun değerleri."""
+    return {"id": user.id, "email": user.email, "hashed_password": user.hashed_password}
+
+
+@event.listens_for(models.UserDB, "after_update")
+@event.listens_for(models.UserDB, "after_delete")
+def _invalidate_user(mapper, connection, target: models.UserDB) -> None:
+    user_id = target.id
+    user_cache.pop(user_id)
+    session = object_session(target)
+    if session is not None:
+        event.listen(session, "after_commit", lambda _session: user_cache.pop(user_id), once=True)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_bulk(orm_execute_state) -> None:
+    # query(UserDB).update()/delete() gibi toplu işlemler satır bazlı olay üretmez
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is models.UserDB:
+            user_cache.clear()
+
+
+def stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
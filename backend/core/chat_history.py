@@ -0,0 +1,175 @@
+# app/core/chat_history.py
+"""
+AI sohbet geçmişi için değiştirilebilir depolar.
+
+- MemoryChatHistoryStore: süreç içi LRU. Tek worker'lı geliştirme ortamı için;
+  kullanıcı sayısı ve kullanıcı başına mesaj sayısı sınırlıdır.
+- SqlChatHistoryStore: 'chat_messages' tablosu. Tüm uvicorn worker'ları aynı
+  geçmişi görür ve yeniden başlatmada geçmiş kaybolmaz.
+
+İki depo da kullanıcı başına en fazla 'max_messages' mesaj tutar ve
+'idle_seconds' boyunca yeni mesaj yazılmayan geçmişi siler. Modele
+gönderilecek kısım 'trim_to_budget' ile token bütçesine göre kırpılır.
+Depo metotları senkrondur; async endpoint'lerden 'run_blocking' ile çağrılır.
+"""
+import datetime
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List
+
+from core.config import settings
+from core.prompts import MESSAGE_TOKEN_OVERHEAD, estimate_tokens
+from database import connection, models
+
+
+def trim_to_budget(messages: List[dict], max_tokens: int) -> List[dict]:
+    """Toplamı 'max_tokens'ı aşmayacak şekilde en yeni mesajları (sırasıyla) döndürür."""
+    kept = []
+    used = 0
+    for message in reversed(messages):
+        cost = estimate_tokens(message["content"]) + MESSAGE_TOKEN_OVERHEAD
+        if used + cost > max_tokens:
+            break
+        kept.append(message)
+        used += cost
+    kept.reverse()
+    return kept
+
+
+class ChatHistoryStore(ABC):
+    """Sohbet geçmişi deposu arayüzü."""
+
+    @abstractmethod
+    def load(self, user_id: int) -> List[dict]:
+        """Kullanıcının geçmişini eskiden yeniye [{"role", "content"}] olarak döndürür."""
+
+    @abstractmethod
+    def append(self, user_id: int, messages: List[dict]) -> None:
+        """Mesajları geçmişin sonuna ekler ve sınırları uygular."""
+
+    @abstractmethod
+    def clear(self, user_id: int) -> None:
+        """Kullanıcının geçmişini siler."""
+
+
+class MemoryChatHistoryStore(ChatHistoryStore):
+    """Kullanıcı sayısı ve mesaj sayısı sınırlı, thread-safe süreç içi depo."""
+
+    def __init__(self, max_users: int, max_messages: int, idle_seconds: int):
+        self.max_users = max_users
+        self.max_messages = max_messages
+        self.idle_seconds = idle_seconds
+        # user_id -> (son yazma zamanı, mesajlar); en eski kullanılan başta
+        self._sessions: "OrderedDict[int, tuple[float, List[dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_idle(self, now: float) -> None:
+        cutoff = now - self.idle_seconds
+        for user_id in [uid for uid, (written, _) in self._sessions.items() if written < cutoff]:
+            del self._sessions[user_id]
+
+    def load(self, user_id: int) -> List[dict]:
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            entry = self._sessions.get(user_id)
+            if entry is None:
+                return []
+            self._sessions.move_to_end(user_id)
+            return list(entry[1])
+
+    def append(self, user_id: int, messages: List[dict]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            _, history = self._sessions.pop(user_id, (now, []))
+            history = (history + [dict(m) for m in messages])[-self.max_messages:]
+            self._sessions[user_id] = (now, history)
+            while len(self._sessions) > self.max_users:
+                self._sessions.popitem(last=False)
+
+    def clear(self, user_id: int) -> None:
+        with self._lock:
+            self._sessions.pop(user_id, None)
+
+
+class SqlChatHistoryStore(ChatHistoryStore):
+    """'chat_messages' tablosunda tutulan, worker'lar arasında paylaşılan depo."""
+
+    def __init__(self, max_messages: int, idle_seconds: int, session_factory=connection.Sessionlocal):
+        self.max_messages = max_messages
+        self.idle_seconds = idle_seconds
+        self.session_factory = session_factory
+
+    def _cutoff(self) -> datetime.datetime:
+        return datetime.datetime.utcnow() - datetime.timedelta(seconds=self.idle_seconds)
+
+    def load(self, user_id: int) -> List[dict]:
+        db = self.session_factory()
+        try:
+            rows = db.query(models.ChatMessageDB).filter(
+                models.ChatMessageDB.user_id == user_id
+            ).order_by(models.ChatMessageDB.id.desc()).limit(self.max_messages).all()
+            # Son mesaj boşta kalma süresinden eskiyse oturum bitmiş sayılır
+            if not rows or rows[0].created_at < self._cutoff():
+                return []
+            return [{"role": row.role, "content": row.content} for row in reversed(rows)]
+        finally:
+            db.close()
+
+    def append(self, user_id: int, messages: List[dict]) -> None:
+        db = self.session_factory()
+        try:
+            db.add_all([
+                models.ChatMessageDB(user_id=user_id, role=m["role"], content=m["content"])
+                for m in messages
+            ])
+            db.flush()
+
+            # Kullanıcı başına sadece en yeni 'max_messages' mesaj kalır
+            newest = db.query(models.ChatMessageDB.id).filter(
+                models.ChatMessageDB.user_id == user_id
+            ).order_by(models.ChatMessageDB.id.desc()).limit(self.max_messages)
+            db.query(models.ChatMessageDB).filter(
+                models.ChatMessageDB.user_id == user_id,
+                models.ChatMessageDB.id.not_in(newest.scalar_subquery())
+            ).delete(synchronize_session=False)
+
+            # Boşta kalmış (tüm kullanıcıların) eski mesajlarını temizle
+            db.query(models.ChatMessageDB).filter(
+                models.ChatMessageDB.created_at < self._cutoff()
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def clear(self, user_id: int) -> None:
+        db = self.session_factory()
+        try:
+            db.query(models.ChatMessageDB).filter(
+                models.ChatMessageDB.user_id == user_id
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+def create_store() -> ChatHistoryStore:
+    """Ayarlardaki 'chat_history_backend' değerine göre depoyu oluşturur."""
+    if settings.chat_history_backend == "memory":
+        return MemoryChatHistoryStore(
+            max_users=settings.chat_history_max_users,
+            max_messages=settings.chat_history_max_messages,
+            idle_seconds=settings.chat_history_idle_seconds,
+        )
+    if settings.chat_history_backend == "sql":
+        return SqlChatHistoryStore(
+            max_messages=settings.chat_history_max_messages,
+            idle_seconds=settings.chat_history_idle_seconds,
+        )
+    raise ValueError(f"Bilinmeyen chat_history_backend: {settings.chat_history_backend}")
+
+
+# Tüm istekler tarafından paylaşılan depo
+chat_history = create_store()
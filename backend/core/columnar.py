@@ -0,0 +1,261 @@
+# app/core/columnar.py
+"""
+Yüklenen CSV/XLSX dosyalarının sütun tabanlı (Parquet) kopyalarını yönetir.
+
+Ham dosya her zaman asıl kaynaktır. Yükleme sırasında bir kez tiplenmiş bir
+Parquet "sidecar" dosyası üretilir; okuyucular ham dosyayı yeniden
+ayrıştırmak yerine bu dosyadan sadece ihtiyaç duydukları sütunları okur.
+Sidecar eksikse ya da ham dosyadan eskiyse yeniden üretilir.
+"""
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy.orm import Session
+
+from core.frame_cache import frame_cache
+from core.parsing import parse_pool
+from database import models
+
+SIDECAR_SUFFIX = ".parquet"
+
+# Satır grupları sabit boyutlu tutulur; böylece sayfalı okumalar
+# dosyanın tamamını değil sadece ilgili grupları açar.
+ROW_GROUP_SIZE = 65_536
+
+
+class UnsupportedFileFormat(ValueError):
+    """Dosya uzantısı CSV veya XLSX değilse fırlatılır."""
+
+
+class UnknownColumns(KeyError):
+    """İstenen sütunlardan biri veya birkaçı dosyada yoksa fırlatılır."""
+
+
+def read_raw_file(file_path: str) -> pd.DataFrame:
+    """Ham CSV/XLSX dosyasını (uzantısına göre) pandas ile okur."""
+    if file_path.endswith(".csv"):
+        return pd.read_csv(file_path)
+    if file_path.endswith(".xlsx"):
+        return pd.read_excel(file_path)
+    raise UnsupportedFileFormat("Desteklenmeyen dosya formatı.")
+
+
+def sidecar_path_for(file_path: str) -> str:
+    """Ham dosyanın yanındaki Parquet dosyasının yolunu döndürür."""
+    return f"{file_path}{SIDECAR_SUFFIX}"
+
+
+def _column_to_arrow(series: pd.Series) -> pa.Array:
+    """
+    Tek bir sütunu Arrow dizisine çevirir. Excel'den gelen karışık tipli
+    (örn: sayı + metin) 'object' sütunlar Arrow'a sığmaz; bunlar metne çevrilir.
+    """
+    try:
+        return pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        as_text = series.where(series.isna(), series.astype(str))
+        return pa.array(as_text, type=pa.string(), from_pandas=True)
+
+
+def frame_to_table(df: pd.DataFrame) -> pa.Table:
+    """DataFrame'i (index olmadan) Arrow tablosuna çevirir."""
+    names = [str(col) for col in df.columns]
+    arrays = [_column_to_arrow(df.iloc[:, i]) for i in range(df.shape[1])]
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def build_sidecar(file_path: str) -> str:
+    """Ham dosyayı bir kez ayrıştırır ve Parquet sidecar dosyasını yazar."""
+    return write_sidecar(read_raw_file(file_path), file_path)
+
+
+def temp_path_for(sidecar_path: str) -> str:
+    """
+    Sidecar'ın yanında, bu yazara özel boş bir geçici dosya oluşturur. Aynı
+    içeriği aynı anda yazan işler (başka worker'lar dahil) birbirinin geçici
+    dosyasını ezmez; her biri hazır dosyayı atomik olarak yerine taşır.
+    """
+    directory, name = os.path.split(sidecar_path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory or ".")
+    os.close(fd)
+    return tmp_path
+
+
+def write_sidecar(df: pd.DataFrame, file_path: str) -> str:
+    """
+    Ayrıştırılmış DataFrame'i ham dosyanın sidecar'ı olarak yazar.
+    Yarım kalmış bir dosya okunmasın diye önce geçici dosyaya yazılır.
+    """
+    table = frame_to_table(df)
+
+    sidecar_path = sidecar_path_for(file_path)
+    tmp_path = temp_path_for(sidecar_path)
+    try:
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_path, sidecar_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return sidecar_path
+
+
+def is_sidecar_fresh(sidecar_path: Optional[str], file_path: str) -> bool:
+    """Sidecar mevcut ve ham dosyadan daha yeni mi?"""
+    if not sidecar_path or not os.path.exists(sidecar_path):
+        return False
+    return os.path.getmtime(sidecar_path) >= os.path.getmtime(file_path)
+
+
+def ensure_sidecar(blob: models.BlobDB, db: Session) -> str:
+    """
+    Sidecar eksik veya eskiyse yeniden üretir ve yolunu BlobDB'ye kaydeder.
+    Ayrıştırma süreç havuzunda yapılır; aynı içerik için aynı anda tek iş
+    kabul edilir. Kuyruk doluysa parsing.ParseQueueFull (503), süre aşılırsa
+    parsing.ParseTimeout (504) fırlatılır.
+    """
+    if is_sidecar_fresh(blob.sidecar_path, blob.blob_path):
+        return blob.sidecar_path
+
+    sidecar_path = parse_pool.run(build_sidecar, blob.blob_path, key=blob.content_hash)
+    if blob.sidecar_path != sidecar_path:
+        blob.sidecar_path = sidecar_path
+        db.commit()
+    return sidecar_path
+
+
+def _check_columns(schema: pa.Schema, columns: Optional[List[str]]) -> None:
+    if columns is None:
+        return
+    missing = [col for col in columns if col not in schema.names]
+    if missing:
+        raise UnknownColumns(missing)
+
+
+def load_dataframe(
+        blob: models.BlobDB,
+        db: Session,
+        columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Dosya içeriğini okur. 'columns' verilirse sadece o sütunlar okunur
+    (column projection). Sütunlar önce paylaşılan önbellekte aranır; sadece
+    eksik olanlar sidecar'dan tek seferde okunup önbelleğe eklenir.
+    Dönen DataFrame önbellekteki verileri paylaşır; yerinde değiştirilmemelidir.
+    """
+    sidecar_path = ensure_sidecar(blob, db)
+    schema = pq.read_schema(sidecar_path)
+    _check_columns(schema, columns)
+    if columns is None:
+        columns = list(schema.names)
+
+    found = frame_cache.get_many(blob.content_hash, columns)
+    missing = [col for col in columns if col not in found]
+    if missing:
+        # split_blocks: her sütun kendi bellek bloğuna sahip olur. Aynı tipteki
+        # sütunlar ortak 2 boyutlu bir blokta kalsaydı, önbellekten atılan bir
+        # sütun, kardeşleri önbellekteyken belleği boşaltmazdı.
+        loaded = pq.read_table(sidecar_path, columns=missing).to_pandas(split_blocks=True, self_destruct=True)
+        for col in missing:
+            found[col] = loaded[col]
+            frame_cache.put((blob.content_hash, col), loaded[col])
+
+    return pd.DataFrame({col: found[col] for col in columns}, copy=False)
+
+
+def _cached_window(
+        blob: models.BlobDB,
+        parquet_file: pq.ParquetFile,
+        offset: int,
+        limit: int,
+        columns: Optional[List[str]]
+) -> Optional[pd.DataFrame]:
+    """İstenen sütunların hepsi önbellekteyse pencereyi diske gitmeden dilimler."""
+    requested = columns if columns is not None else list(parquet_file.schema_arrow.names)
+    cached = frame_cache.get_all(blob.content_hash, requested)
+    if cached is None:
+        return None
+    window = pd.DataFrame({col: cached[col].iloc[offset:offset + limit] for col in requested})
+    return window.reset_index(drop=True)
+
+
+def _read_row_window(
+        parquet_file: pq.ParquetFile,
+        offset: int,
+        limit: int,
+        columns: Optional[List[str]]
+) -> pa.Table:
+    """Sadece pencereyle kesişen satır gruplarını okur (kopyasız dilimlenir)."""
+    metadata = parquet_file.metadata
+    total_rows = metadata.num_rows
+    end = min(offset + limit, total_rows)
+
+    groups = []
+    window_start = None  # Okunan ilk grubun dosyadaki ilk satırı
+    group_start = 0
+    for i in range(metadata.num_row_groups):
+        group_rows = metadata.row_group(i).num_rows
+        if group_start < end and group_start + group_rows > offset:
+            groups.append(i)
+            if window_start is None:
+                window_start = group_start
+        group_start += group_rows
+
+    if not groups:
+        schema = parquet_file.schema_arrow
+        if columns is not None:
+            schema = pa.schema([schema.field(col) for col in columns])
+        return schema.empty_table()
+
+    table = parquet_file.read_row_groups(groups, columns=columns)
+    return table.slice(offset - window_start, end - offset)
+
+
+def read_window(
+        blob: models.BlobDB,
+        db: Session,
+        offset: int,
+        limit: int,
+        columns: Optional[List[str]] = None
+) -> Tuple[pd.DataFrame, int]:
+    """
+    [offset, offset + limit) satır aralığını ve istenen sütunları okur.
+    Toplam satır sayısı Parquet metadata'sından gelir; sadece pencereyle
+    kesişen satır grupları diskten okunur. (DataFrame, toplam_satır) döner.
+    """
+    sidecar_path = ensure_sidecar(blob, db)
+    parquet_file = pq.ParquetFile(sidecar_path)
+    _check_columns(parquet_file.schema_arrow, columns)
+    total_rows = parquet_file.metadata.num_rows
+
+    window = _cached_window(blob, parquet_file, offset, limit, columns)
+    if window is not None:
+        return window, total_rows
+    return _read_row_window(parquet_file, offset, limit, columns).to_pandas(), total_rows
+
+
+def read_window_table(
+        blob: models.BlobDB,
+        db: Session,
+        offset: int,
+        limit: int,
+        columns: Optional[List[str]] = None
+) -> Tuple[pa.Table, int]:
+    """
+    'read_window' ile aynı, ancak pandas'a çevirmeden Arrow tablosu döndürür
+    (Arrow IPC cevapları için). Önbellekteki sütunlar Arrow'a dönüştürülür;
+    diskten okunan satır grupları olduğu gibi dilimlenir.
+    """
+    sidecar_path = ensure_sidecar(blob, db)
+    parquet_file = pq.ParquetFile(sidecar_path)
+    _check_columns(parquet_file.schema_arrow, columns)
+    total_rows = parquet_file.metadata.num_rows
+
+    window = _cached_window(blob, parquet_file, offset, limit, columns)
+    if window is not None:
+        return pa.Table.from_pandas(window, preserve_index=False), total_rows
+    return _read_row_window(parquet_file, offset, limit, columns), total_rows
@@ -0,0 +1,153 @@
+# app/core/compression.py
+"""
+Cevap sıkıştırma (gzip / zstd) ASGI middleware'i.
+
+İstemcinin Accept-Encoding başlığına göre zstd (zstandard kuruluysa) veya
+gzip seçilir. Akış (streaming) cevaplarında her parça ayrı ayrı sıkıştırılıp
+hemen gönderilir. Server-Sent Events (text/event-stream), küçük cevaplar,
+zaten kodlanmış cevaplar ve gövdesiz (204/304) cevaplar olduğu gibi geçer.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # zstd isteğe bağlı; yoksa sadece gzip sunulur
+    zstandard = None
+
+# Sıkıştırılacak içerik tipleri (önek eşleşmesi)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/vnd.apache.arrow.stream",
+    "text/plain",
+    "text/csv",
+    "text/html",
+)
+# Akış halinde olsa da sıkıştırılmayacak tipler (tamponlama olayları geciktirir)
+SKIPPED_TYPES = ("text/event-stream",)
+
+
+def supported_encodings() -> tuple:
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding başlığından kullanılacak kodlamayı seçer (yoksa None)."""
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        offered[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = offered.get(encoding, offered.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, zstd_level: int):
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+            self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            self._obj = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._flush_block = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.compress(data)
+        # Ara parçalar blok sonuna kadar boşaltılır ki istemci hemen okuyabilsin
+        return out + (self._obj.flush() if final else self._obj.flush(self._flush_block))
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        # None: henüz karar verilmedi, True: sıkıştır, False: olduğu gibi geçir
+        self.compress: Optional[bool] = None
+        self.compressor: Optional[_Compressor] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compress is None:
+            self.compress = self._should_compress(body, more_body)
+            await self._send_start()
+        if not self.compress:
+            await self.send(message)
+            return
+
+        data = self.compressor.compress(body, final=not more_body)
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=self.start_message["headers"])
+        status = self.start_message["status"]
+        content_type = headers.get("content-type", "").lower()
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        if content_type.startswith(SKIPPED_TYPES) or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        # Tek parçalı küçük cevaplarda sıkıştırma kazandırmaz
+        return more_body or len(body) >= self.middleware.minimum_size
+
+    async def _send_start(self) -> None:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith(COMPRESSIBLE_TYPES):
+            headers.add_vary_header("Accept-Encoding")
+        if self.compress:
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.zstd_level)
+            headers["Content-Encoding"] = self.encoding
+            if "content-length" in headers:
+                del headers["content-length"]
+            # Sıkıştırılmış temsil farklı bir ETag taşır (bkz. core.http_cache)
+            etag = headers.get("etag")
+            if etag and etag.endswith('"'):
+                headers["ETag"] = f'{etag[:-1]}-{self.encoding}"'
+        await self.send(self.start_message)
@@ -2,12 +2,107 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str
+    # Bağlantı havuzu (SQLite bellek içi veritabanında kullanılmaz)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800  # Bağlantılar bu süreden sonra yenilenir
+    db_pool_pre_ping: bool = True  # Kopmuş bağlantıları kullanmadan önce yakala
+    # Tek bir SQL ifadesinin en uzun süresi (PostgreSQL: statement_timeout,
+    # SQLite: kilit için bekleme süresi); 0 ise sınırsız
+    db_statement_timeout_ms: int = 30000
+    # SQLite bağlantı ayarları (PRAGMA). WAL okurların yazarı beklemesini önler
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"  # WAL ile güvenli ve 'full'dan hızlı
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # Bayt
+    sqlite_cache_size_kib: int = 64 * 1024
+
     SECRET_KEY: str = "cok_gizli_bir_anahtar_buraya_yazin"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
     # --- YENİ SATIRI BURAYA EKLEYİN ---
     openai_api_key: str | None = None
+    # OpenAI uyumlu başka bir sunucu (örn: benchmarks/fake_llm_server.py) için adres
+    openai_base_url: str | None = None
+    # Tek bir LLM isteği için üst süre (saniye) ve tekrar deneme sayısı
+    # (OpenAI ve yerel sunucu sağlayıcıları için)
+    openai_timeout_seconds: float = 30.0
+    openai_max_retries: int = 2
+
+    # LLM sağlayıcısı: "openai", "local" (OpenAI uyumlu yerel sunucu) veya "stub" (çevrimdışı)
+    llm_provider: str = "openai"
+    llm_base_url: str = "http://127.0.0.1:11434/v1"  # "local" için (Ollama varsayılanı)
+    llm_model: str | None = None  # Verilirse endpoint'lerin model adları yerine kullanılır
+    llm_max_concurrency: int = 8  # Sağlayıcıya aynı anda gönderilen en fazla istek
+    llm_max_connections: int = 20  # Sağlayıcının HTTP bağlantı havuzu
+    llm_retry_backoff_seconds: float = 0.5  # İlk tekrar denemeden önceki bekleme (üstel artar)
+    llm_stub_delay_seconds: float = 0.0  # "stub" cevabının yapay gecikmesi
+    # Saklanan AI grafik önerilerinin geçerlilik süresi (saniye)
+    ai_cache_ttl_seconds: int = 7 * 24 * 60 * 60
+    # Prompt'lara eklenen veri seti özetinin yaklaşık token bütçesi
+    prompt_token_budget: int = 1500
+
+    # Sohbet geçmişi: "sql" (tüm worker'lar paylaşır) veya "memory" (süreç içi LRU).
+    # Kullanıcı başına en fazla mesaj, bellek deposunda en fazla kullanıcı,
+    # bu süre (saniye) boyunca yazılmayan geçmişin silinmesi ve modele
+    # gönderilen geçmişin yaklaşık token bütçesi
+    chat_history_backend: str = "sql"
+    chat_history_max_messages: int = 20
+    chat_history_max_users: int = 1000
+    chat_history_idle_seconds: int = 24 * 60 * 60
+    chat_history_token_budget: int = 2000
+
+    # Argon2 maliyet parametreleri (süre: tur sayısı, bellek: KiB). Değiştirildiğinde
+    # mevcut hash'ler kullanıcı bir sonraki girişinde yeni parametrelerle güncellenir
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 64 * 1024
+    argon2_parallelism: int = 4
+    # Şifre hash'leme havuzu: thread sayısı ve sırada bekleyebilecek en fazla iş
+    password_hash_workers: int = 2
+    password_hash_queue_limit: int = 8
+
+    # Doğrulanmış token'lar ve kullanıcı satırları için önbellek (0: kapalı)
+    auth_cache_ttl_seconds: float = 30.0
+    auth_cache_max_entries: int = 10000
+
+    # Arka plan işleri: aynı anda çalışan iş sayısı, kuyruğun yoklanma aralığı
+    # (saniye), deneme sayısı, tekrar denemeler arasındaki ilk bekleme (her
+    # denemede iki katına çıkar) ve bu süreden (saniye) uzun 'running' kalan
+    # işlerin (örn: süreç çöktüyse) yeniden sıraya alınması
+    job_workers: int = 2
+    job_poll_interval_seconds: float = 2.0
+    job_max_attempts: int = 3
+    job_retry_backoff_seconds: float = 5.0
+    job_stale_seconds: int = 60 * 60
+    # Yüklemeden sonra grafik önerisini arka planda hazırla (gerekirse LLM'e sorar)
+    ai_preanalyze_on_upload: bool = False
+
+    # Parçalı yükleme: önerilen ve izin verilen en büyük parça boyutu (bayt) ve
+    # bu süre (saniye) boyunca parça gelmeyen yükleme oturumlarının silinmesi
+    upload_chunk_size: int = 8 * 1024 * 1024
+    upload_chunk_max_bytes: int = 64 * 1024 * 1024
+    upload_session_ttl_seconds: int = 24 * 60 * 60
+
+    # Cevap sıkıştırma: bu boyuttan (bayt) küçük cevaplar sıkıştırılmaz;
+    # gzip (1-9) ve zstd (1-22) seviyeleri
+    compression_minimum_size: int = 1024
+    gzip_level: int = 6
+    zstd_level: int = 3
+
+    # Ayrıştırılmış sütunlar için bellek içi önbelleğin bayt bütçesi
+    dataframe_cache_max_bytes: int = 512 * 1024 * 1024
+    # Async endpoint'lerde dosya okuma/DB işleri için thread sayısı
+    data_loader_workers: int = 4
+
+    # CSV/XLSX ayrıştırma süreç havuzu: süreç sayısı (0 = aynı süreçte),
+    # sırada bekleyebilecek iş sayısı, tek bir dosya içeriğinin aynı anda
+    # tutabileceği iş sayısı (1: aynı içerik aynı anda iki kez ayrıştırılmaz)
+    # ve tek bir ayrıştırma için üst süre (saniye)
+    parse_workers: int = 2
+    parse_queue_limit: int = 8
+    parse_max_per_key: int = 1
+    parse_timeout_seconds: float = 600.0
 
     class Config:
         env_file = ".env"
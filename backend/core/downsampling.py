@@ -0,0 +1,109 @@
+# app/core/downsampling.py
+"""
+Line, area ve scatter grafikler için görsel şekli koruyan örnek azaltma
+(downsampling) algoritmaları.
+
+Milyonlarca noktalı bir seriden ilk N satırı almak yerine serinin tamamını
+temsil eden N nokta seçilir:
+- lttb:   Largest-Triangle-Three-Buckets (tepe/çukurları korur)
+- minmax: Her kovadan en küçük ve en büyük noktayı alır (aykırı değerleri korur)
+- random: Sıralı, tekrarsız rastgele örnekleme
+
+Tüm fonksiyonlar X'e göre sıralı, NaN içermeyen float dizileri bekler ve
+seçilen noktaların indekslerini (artan sırada) döndürür.
+"""
+import numpy as np
+
+METHODS = ("lttb", "minmax", "random")
+
+
+def _bucket_bounds(n: int, buckets: int) -> np.ndarray:
+    """[0, n) aralığını 'buckets' adet yaklaşık eşit kovaya böler."""
+    return np.linspace(0, n, buckets + 1).astype(np.int64)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets. İlk ve son nokta her zaman seçilir;
+    aradaki her kovadan, önceki seçilen nokta ile sonraki kovanın ortalaması
+    arasında en büyük üçgeni oluşturan nokta alınır.
+    Kova içi hesaplar vektöreldir; Python döngüsü sadece kova sayısı kadardır.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    bounds = _bucket_bounds(n - 2, points - 2) + 1
+    starts, ends = bounds[:-1], bounds[1:]
+
+    # Her kovanın ortalaması tek seferde (reduceat) hesaplanır
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[1:n - 1], starts - 1) / counts
+    avg_y = np.add.reduceat(y[1:n - 1], starts - 1) / counts
+    # Son kovanın "sonraki kovası" son noktadır
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(points - 2):
+        start, end = starts[i], ends[i]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - next_x[i]) * (by - y[a]) - (x[a] - bx) * (next_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    İlk ve son nokta her zaman seçilir; aradaki noktalar (points - 2) // 2
+    kovaya bölünür ve her kovadan en küçük ve en büyük Y değerine sahip
+    noktalar seçilir. Sonuç hiçbir zaman 'points'ten fazla nokta içermez.
+    Tamamen vektöreldir.
+    """
+    n = len(y)
+    if points >= n or points < 2:
+        return np.arange(n)
+
+    buckets = (points - 2) // 2
+    if buckets == 0:
+        return np.array([0, n - 1])
+
+    inner = y[1:n - 1]
+    starts = _bucket_bounds(len(inner), buckets)[:-1]
+    lengths = np.diff(np.append(starts, len(inner)))
+    segment = np.repeat(np.arange(buckets), lengths)
+
+    mins = np.minimum.reduceat(inner, starts)
+    maxs = np.maximum.reduceat(inner, starts)
+
+    # Her kovada min/max değerine eşit olan ilk indeks
+    min_hits = np.flatnonzero(inner == mins[segment])
+    max_hits = np.flatnonzero(inner == maxs[segment])
+    argmins = min_hits[np.searchsorted(segment[min_hits], np.arange(buckets))]
+    argmaxs = max_hits[np.searchsorted(segment[max_hits], np.arange(buckets))]
+
+    return np.unique(np.concatenate([argmins + 1, argmaxs + 1, [0, n - 1]]))
+
+
+def random(x: np.ndarray, y: np.ndarray, points: int, seed: int = 0) -> np.ndarray:
+    """Tekrarsız rastgele örnekleme; aynı seed ile aynı noktalar seçilir."""
+    n = len(x)
+    if points >= n:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(n, size=points, replace=False))
+
+
+def downsample(x: np.ndarray, y: np.ndarray, method: str, points: int) -> np.ndarray:
+    """'method' adına göre uygun algoritmayı çağırır."""
+    if method == "lttb":
+        return lttb(x, y, points)
+    if method == "minmax":
+        return minmax(x, y, points)
+    if method == "random":
+        return random(x, y, points)
+    raise ValueError(f"Geçersiz downsampling yöntemi: {method}")
@@ -0,0 +1,105 @@
+# app/core/executors.py
+"""
+Bloklayan (senkron) işleri event loop dışında çalıştırmak için havuzlar.
+
+'async def' endpoint'ler içinde pandas/pyarrow ile dosya okumak veya senkron
+SQLAlchemy oturumu kullanmak event loop'u durdurur ve aynı worker'daki tüm
+istekleri bekletir. Bu işler sınırlı sayıda thread'i olan ayrı bir havuzda
+çalıştırılır; böylece yavaş bir okuma diğer istekleri etkilemez ve aynı anda
+çalışan okuma sayısı sınırlı kalır.
+
+Şifre hash'leme (Argon2) bilerek yavaş ve bellek yoğundur; ayrı, kuyruğu
+sınırlı bir havuzda çalışır. Kuyruk doluysa istek beklemeden 503 ile
+reddedilir; böylece bir giriş (login) dalgası diğer endpoint'leri bekletmez.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+
+data_executor = ThreadPoolExecutor(
+    max_workers=settings.data_loader_workers,
+    thread_name_prefix="data-loader"
+)
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """'func'u veri havuzunda çalıştırır ve sonucunu bekler (await)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(data_executor, functools.partial(func, *args, **kwargs))
+
+
+class ExecutorBusy(HTTPException):
+    """Havuzun kuyruğu dolu; istemci daha sonra tekrar denemeli."""
+
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": "1"},
+        )
+
+
+class BoundedExecutor:
+    """
+    Aynı anda çalışan + sırada bekleyen iş sayısı 'workers + queue_limit'
+    ile sınırlı thread havuzu.
+    """
+
+    def __init__(self, name: str, workers: int, queue_limit: int, busy_detail: str):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.busy_detail = busy_detail
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise ExecutorBusy(self.busy_detail)
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """'func'u havuzda çalıştırır; kuyruk doluysa ExecutorBusy (503) fırlatır."""
+        self._admit()
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # Bekleyen istek iptal edilse de iş bitene kadar kuyrukta sayılır
+        future.add_done_callback(lambda _: self._release())
+        return await future
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_executor = BoundedExecutor(
+    "password-hash",
+    workers=settings.password_hash_workers,
+    queue_limit=settings.password_hash_queue_limit,
+    busy_detail="Sunucu şu anda çok fazla giriş isteği işliyor. Lütfen biraz sonra tekrar deneyin.",
+)
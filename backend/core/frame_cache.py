@@ -0,0 +1,119 @@
+# app/core/frame_cache.py
+"""
+Ayrıştırılmış sütunlar için süreç içi (in-process) LRU önbellek.
+
+Önbellek sütun bazlıdır: anahtar (içerik hash'i, sütun adı), değer bir
+pandas Series'tir. Böylece aynı dosyanın farklı sütun projeksiyonları
+aynı veriyi iki kez tutmaz. Toplam boyut 'Series.memory_usage(deep=True)'
+ile ölçülür ve ayarlanan bayt bütçesini aşınca en eski kullanılan
+sütunlar atılır. Bütçenin gerçekten uygulanması için her Series kendi
+belleğine sahip olmalıdır (başka sütunlarla ortak bir bloğun görünümü
+olmamalı); bkz. columnar.load_dataframe. İçerik hash'i değişmez olduğundan kayıtlar eskimez;
+sadece içerik silindiğinde geçersiz kılınır.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from core.config import settings
+
+CacheKey = Tuple[str, Hashable]
+
+
+class FrameCache:
+    """Bayt bütçeli, thread-safe LRU önbellek."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, Tuple[pd.Series, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: CacheKey) -> Optional[pd.Series]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_many(self, content_hash: str, columns: Iterable[Hashable]) -> Dict[Hashable, pd.Series]:
+        """Önbellekte bulunan sütunları döndürür; bulunmayanlar sonuçta yer almaz."""
+        found = {}
+        for column in columns:
+            series = self.get((content_hash, column))
+            if series is not None:
+                found[column] = series
+        return found
+
+    def get_all(self, content_hash: str, columns: Iterable[Hashable]) -> Optional[Dict[Hashable, pd.Series]]:
+        """
+        Sütunların hepsi önbellekteyse döndürür, değilse None. Eksik durumda
+        kayıtlar doldurulmayacağı için ıskalama (miss) sayılmaz.
+        """
+        columns = list(columns)
+        with self._lock:
+            if not all((content_hash, column) in self._entries for column in columns):
+                return None
+            found = {}
+            for column in columns:
+                key = (content_hash, column)
+                self._entries.move_to_end(key)
+                found[column] = self._entries[key][0]
+            self.hits += len(columns)
+            return found
+
+    def put(self, key: CacheKey, series: pd.Series) -> None:
+        size = int(series.memory_usage(deep=True, index=True))
+        if size > self.max_bytes:
+            return  # Bütçeden büyük tek bir sütun önbelleğe alınmaz
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (series, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, content_hash: str) -> int:
+        """Bir içeriğe ait tüm sütunları önbellekten atar; atılan kayıt sayısını döndürür."""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == content_hash]
+            for key in keys:
+                _, size = self._entries.pop(key)
+                self.current_bytes -= size
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Tüm router'ların paylaştığı önbellek
+frame_cache = FrameCache(settings.dataframe_cache_max_bytes)
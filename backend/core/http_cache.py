@@ -0,0 +1,99 @@
+# app/core/http_cache.py
+"""
+Koşullu GET (ETag / If-None-Match) yardımcıları.
+
+Dosya içeriği değişmedikçe aynı içerik özeti (content_hash) ve aynı sorgu
+parametreleri her zaman aynı cevabı üretir; bu yüzden ETag cevap üretilmeden
+önce hesaplanabilir ve istemcideki kopya güncelse veri hiç okunmadan
+304 Not Modified döndürülür.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+# Cevap biçimi değiştiğinde artırın; istemcilerdeki eski kopyalar geçersizleşir
+ETAG_VERSION = "v1"
+
+# Sıkıştırma katmanının ETag'e eklediği son ekler (bkz. core.compression)
+ENCODING_SUFFIXES = ("-gzip", "-zstd")
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Verilen parçalardan güçlü (strong) bir ETag üretir."""
+    raw = "\x1f".join(str(part) for part in (ETAG_VERSION, *parts))
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def request_etag(content_hash: str, request: Request, *extra: Any) -> str:
+    """
+    İçerik özeti ve sorgu parametrelerinden ETag. Parametreler ada göre
+    sıralanır; aynı addaki değerlerin sırası (ör. 'columns') korunur.
+    """
+    params = sorted(request.query_params.multi_items(), key=lambda item: item[0])
+    return make_etag(content_hash, request.url.path, json.dumps(params), *extra)
+
+
+def body_etag(payload: Any) -> str:
+    """Önceden bilinemeyen cevaplar (ör. yapay zeka sonuçları) için içerikten ETag."""
+    return make_etag(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str))
+
+
+def _strip_tag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def matching_tag(request: Request, etag: str) -> Optional[str]:
+    """
+    İstemcinin If-None-Match başlığında bu ETag'e (herhangi bir sıkıştırılmış
+    temsiline) karşılık gelen etiketi, istemcinin gönderdiği haliyle döndürür.
+    Eşleşme yoksa None.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return etag
+    for tag in header.split(","):
+        if _strip_tag(tag) == etag:
+            return tag.strip()
+    return None
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """İstemcinin If-None-Match başlığı bu ETag'i içeriyor mu?"""
+    return matching_tag(request, etag) is not None
+
+
+def cache_headers(etag: str, vary: Optional[str] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if vary:
+        headers["Vary"] = vary
+    return headers
+
+
+def not_modified(etag: str, vary: Optional[str] = None) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, vary))
+
+
+def conditional(request: Request, response: Response, etag: str, vary: Optional[str] = None) -> Optional[Response]:
+    """
+    ETag başlıklarını endpoint'in cevabına ekler. İstemcideki kopya güncelse
+    döndürülmesi gereken 304 cevabını, değilse None döner. 304 cevabı,
+    istemcinin elindeki temsilin etiketini (ör. sıkıştırılmış '-gzip' son ekli
+    hali) taşır; sıkıştırma katmanı 304 cevaplarına dokunmaz.
+    """
+    matched = matching_tag(request, etag)
+    if matched is not None:
+        return not_modified(matched, vary)
+    response.headers.update(cache_headers(etag, vary))
+    return None
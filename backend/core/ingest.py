@@ -0,0 +1,141 @@
+# app/core/ingest.py
+"""
+Yeni bir dosya içeriğini tek geçişte işler.
+
+CSV dosyaları parça parça (chunk) okunur; her parça hem sütun profiline
+eklenir hem de Parquet sidecar'a yeni bir satır grubu olarak yazılır.
+Böylece bellek kullanımı dosya boyutundan bağımsız kalır. XLSX dosyaları
+parça parça okunamadığından bir kez bütün olarak ayrıştırılır.
+"""
+import logging
+import os
+import zipfile
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core import columnar, profiling
+
+logger = logging.getLogger(__name__)
+
+# CSV'den her seferde okunan satır sayısı
+CSV_CHUNK_ROWS = 100_000
+
+# Dosyanın kendisinden kaynaklanan hatalar. pandas ayrıştırma hataları
+# (ParserError, EmptyDataError, UnicodeDecodeError), UnsupportedFileFormat ve
+# ArrowInvalid ValueError'dır; bozuk XLSX BadZipFile fırlatır.
+PARSE_ERRORS = (ValueError, zipfile.BadZipFile, pa.ArrowException)
+
+
+@dataclass
+class IngestResult:
+    sidecar_path: Optional[str]
+    profile: Optional[dict]
+
+
+_NUMERIC_TYPES = (pa.types.is_integer, pa.types.is_floating)
+
+
+def _is_number(data_type: pa.DataType) -> bool:
+    return any(check(data_type) for check in _NUMERIC_TYPES)
+
+
+def _widen_type(current: pa.DataType, new: pa.DataType) -> pa.DataType:
+    """İki parçadaki sütun tiplerini kapsayan en dar tip (profiling._merge_types gibi)."""
+    if current == new or pa.types.is_null(new):
+        return current
+    if pa.types.is_null(current):
+        return new
+    if _is_number(current) and _is_number(new):
+        return pa.float64()
+    return pa.string()
+
+
+def _widen_schema(current: pa.Schema, new: pa.Schema) -> pa.Schema:
+    if current.names != new.names:
+        raise ValueError("CSV parçalarının sütunları farklı.")
+    return pa.schema([
+        pa.field(name, _widen_type(current.field(name).type, new.field(name).type))
+        for name in current.names
+    ])
+
+
+def _rewrite(source_path: str, target_path: str, schema: pa.Schema) -> pq.ParquetWriter:
+    """
+    Yazılmış satır gruplarını, satır grubu satır grubu genişletilmiş şemaya
+    çevirerek yeni dosyaya kopyalar ve yazmaya devam edecek yazıcıyı döndürür.
+    """
+    writer = pq.ParquetWriter(target_path, schema)
+    try:
+        source = pq.ParquetFile(source_path)
+        for i in range(source.num_row_groups):
+            writer.write_table(source.read_row_group(i).cast(schema), row_group_size=columnar.ROW_GROUP_SIZE)
+    except BaseException:
+        writer.close()
+        raise
+    return writer
+
+
+def _stream_csv(reader: BinaryIO, sidecar_path: str) -> IngestResult:
+    """
+    CSV'yi parça parça okuyup profili ve Parquet dosyasını aynı anda üretir.
+    Bir parçada sütun tipi değişirse (örn: int -> float ya da metin) şema
+    genişletilir ve önceki satır grupları yeni şemayla yeniden yazılır;
+    bellek kullanımı yine bir satır grubuyla sınırlı kalır.
+    """
+    profiler = profiling.DatasetProfiler()
+    tmp_path = columnar.temp_path_for(sidecar_path)
+    writer = None
+
+    try:
+        try:
+            for chunk in pd.read_csv(reader, chunksize=CSV_CHUNK_ROWS):
+                profiler.update(chunk)
+                table = columnar.frame_to_table(chunk)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                schema = _widen_schema(writer.schema, table.schema)
+                if schema != writer.schema:
+                    writer.close()
+                    writer = None
+                    old_path, tmp_path = tmp_path, columnar.temp_path_for(sidecar_path)
+                    try:
+                        writer = _rewrite(old_path, tmp_path, schema)
+                    finally:
+                        os.remove(old_path)
+                writer.write_table(table.cast(writer.schema), row_group_size=columnar.ROW_GROUP_SIZE)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if writer is None:
+            return IngestResult(sidecar_path=None, profile=profiler.result())
+
+        os.replace(tmp_path, sidecar_path)
+        return IngestResult(sidecar_path=sidecar_path, profile=profiler.result())
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def ingest_file(file_path: str) -> IngestResult:
+    """
+    Diskteki ham dosyanın profilini ve sidecar'ını üretir.
+    Dosya ayrıştırılamazsa hata kaydedilir ve sonuç alanları None döner;
+    diğer hatalar (programlama hataları dahil) çağırana iletilir.
+    """
+    sidecar_path = columnar.sidecar_path_for(file_path)
+    try:
+        if file_path.endswith(".csv"):
+            with open(file_path, "rb") as reader:
+                return _stream_csv(reader, sidecar_path)
+
+        df = columnar.read_raw_file(file_path)
+        sidecar_path = columnar.write_sidecar(df, file_path)
+        return IngestResult(sidecar_path=sidecar_path, profile=profiling.profile_dataframe(df))
+    except PARSE_ERRORS as e:
+        logger.warning("Dosya ayrıştırılamadı (%s): %s", file_path, e)
+        return IngestResult(sidecar_path=None, profile=None)
@@ -0,0 +1,298 @@
+# app/core/jobs.py
+"""
+Veritabanında saklanan, süreç içi arka plan iş kuyruğu.
+
+Yükleme sonrası ayrıştırma, profil çıkarma ve AI ön analizi gibi her dosya
+için bir kez yapılması gereken ağır işler istek içinde değil, burada çalışır.
+İşler 'jobs' tablosuna yazılır; uygulama açılırken başlatılan asyncio
+worker'ları sıradaki işi atomik olarak sahiplenir (queued -> running) ve
+kayıtlı işleyiciyi çalıştırır. Aynı veritabanını kullanan birden fazla
+uygulama süreci aynı kuyruğu paylaşabilir.
+
+- Eşzamanlılık: en fazla 'job_workers' iş aynı anda çalışır.
+- Tekrar deneme: hata veren iş 'job_max_attempts'a kadar, her seferinde iki
+  katına çıkan bir beklemeyle yeniden sıraya girer. JobFailed tekrar denenmez.
+- Senkron işleyiciler ayrı bir thread havuzunda, async işleyiciler event
+  loop'ta çalışır. İşleyici JSON'a çevrilebilir bir sonuç döndürür.
+"""
+import asyncio
+import datetime
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.executors import run_blocking
+from database import connection, models
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+Handler = Callable[[dict], Union[Any, Awaitable[Any]]]
+
+
+class JobFailed(Exception):
+    """Tekrar denenmesi anlamsız hata (ör. desteklenmeyen dosya)."""
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+
+class JobQueue:
+    def __init__(
+            self,
+            workers: int,
+            poll_interval: float,
+            max_attempts: int,
+            retry_backoff: float,
+            stale_seconds: int
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.stale_seconds = stale_seconds
+        self._handlers: Dict[str, Handler] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: list = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock = threading.Lock()
+        self._running = set()  # Bu süreçte çalışan işlerin kimlikleri
+        self._counters = {"succeeded": 0, "failed": 0, "retried": 0}
+
+    def register(self, kind: str, handler: Handler) -> None:
+        """'kind' türündeki işleri çalıştıracak fonksiyonu kaydeder."""
+        self._handlers[kind] = handler
+
+    # --- Kuyruğa ekleme ---
+
+    def enqueue(
+            self,
+            db: Session,
+            kind: str,
+            payload: dict,
+            owner_id: Optional[int] = None,
+            file_id: Optional[int] = None,
+            max_attempts: Optional[int] = None
+    ) -> models.JobDB:
+        """
+        İşi çağıranın oturumuna ekler (commit etmez). Oturum commit edilince
+        bu süreçteki worker'lar yoklama aralığını beklemeden uyandırılır.
+        """
+        job = models.JobDB(
+            kind=kind,
+            status=QUEUED,
+            payload=payload,
+            attempts=0,
+            max_attempts=max_attempts or self.max_attempts,
+            owner_id=owner_id,
+            file_id=file_id,
+            run_after=_now()
+        )
+        db.add(job)
+        db.flush()
+        event.listen(db, "after_commit", self._notify_after_commit, once=True)
+        return job
+
+    def _notify_after_commit(self, session: Session) -> None:
+        self.notify()
+
+    def notify(self) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            wakeup.set()
+        else:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    # --- Veritabanı işlemleri (worker thread'lerinde) ---
+
+    def _claim(self) -> Optional[tuple]:
+        """Sıradaki çalıştırılabilir işi sahiplenir: (id, tür, veri) ya da None."""
+        db = connection.Sessionlocal()
+        try:
+            while True:
+                job = db.query(models.JobDB).filter(
+                    models.JobDB.status == QUEUED,
+                    models.JobDB.run_after <= _now()
+                ).order_by(models.JobDB.id).first()
+                if job is None:
+                    return None
+                claim = (job.id, job.kind, job.payload)
+                # Başka bir worker/süreç aynı işi aldıysa güncelleme 0 satır döner
+                claimed = db.query(models.JobDB).filter(
+                    models.JobDB.id == job.id,
+                    models.JobDB.status == QUEUED
+                ).update({
+                    models.JobDB.status: RUNNING,
+                    models.JobDB.attempts: models.JobDB.attempts + 1,
+                    models.JobDB.started_at: _now(),
+                    models.JobDB.error: None,
+                }, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    return claim
+        finally:
+            db.close()
+
+    def _finish(self, job_id: int, result: Any = None, error: Optional[str] = None, retry: bool = True) -> str:
+        """Denemenin sonucunu yazar; gerekirse işi tekrar sıraya alır. Yeni durumu döndürür."""
+        db = connection.Sessionlocal()
+        try:
+            job = db.get(models.JobDB, job_id)
+            if job is None:
+                return FAILED
+            if error is None:
+                job.status, job.result = SUCCEEDED, result
+                job.finished_at = _now()
+            elif retry and job.attempts < job.max_attempts:
+                job.status, job.error = QUEUED, error
+                job.run_after = _now() + datetime.timedelta(
+                    seconds=self.retry_backoff * 2 ** (job.attempts - 1)
+                )
+            else:
+                job.status, job.error = FAILED, error
+                job.finished_at = _now()
+            db.commit()
+            return job.status
+        finally:
+            db.close()
+
+    def _requeue(self, job_ids: list) -> None:
+        """Yarıda bırakılan işleri deneme hakkını harcamadan tekrar sıraya alır."""
+        db = connection.Sessionlocal()
+        try:
+            db.query(models.JobDB).filter(
+                models.JobDB.id.in_(job_ids),
+                models.JobDB.status == RUNNING
+            ).update({
+                models.JobDB.status: QUEUED,
+                models.JobDB.attempts: models.JobDB.attempts - 1,
+                models.JobDB.run_after: _now(),
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _requeue_stale(self) -> int:
+        """Çok uzun süredir 'running' kalan (sahibi çökmüş) işleri tekrar sıraya alır."""
+        db = connection.Sessionlocal()
+        try:
+            cutoff = _now() - datetime.timedelta(seconds=self.stale_seconds)
+            count = db.query(models.JobDB).filter(
+                models.JobDB.status == RUNNING,
+                models.JobDB.started_at < cutoff
+            ).update({models.JobDB.status: QUEUED, models.JobDB.run_after: _now()}, synchronize_session=False)
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    # --- Worker'lar ---
+
+    async def _run(self, job_id: int, kind: str, payload: dict) -> None:
+        handler = self._handlers.get(kind)
+        if handler is None:
+            await run_blocking(self._finish, job_id, error=f"Bilinmeyen iş türü: {kind}", retry=False)
+            return
+
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            if asyncio.iscoroutinefunction(handler):
+                result = await handler(payload)
+            else:
+                result = await self._loop.run_in_executor(self._executor, handler, payload)
+        except JobFailed as e:
+            status = await run_blocking(self._finish, job_id, error=str(e), retry=False)
+        except Exception as e:
+            logger.warning("İş %s (%s) başarısız oldu: %s", job_id, kind, e)
+            status = await run_blocking(self._finish, job_id, error=f"{type(e).__name__}: {e}")
+        else:
+            status = await run_blocking(self._finish, job_id, result=result)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+        with self._lock:
+            if status == SUCCEEDED:
+                self._counters["succeeded"] += 1
+            elif status == FAILED:
+                self._counters["failed"] += 1
+            else:
+                self._counters["retried"] += 1
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                claimed = await run_blocking(self._claim)
+            except Exception as e:
+                logger.warning("İş kuyruğu okunamadı: %s", e)
+                claimed = None
+            if claimed is not None:
+                await self._run(*claimed)
+                continue
+            # Kuyruk boş: yeni iş eklenene ya da yoklama aralığı dolana kadar bekle
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        """Worker'ları başlatır (uygulama açılırken). Birden fazla çağrı etkisizdir."""
+        if self._tasks or self.workers <= 0:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+        await run_blocking(self._requeue_stale)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+        Worker'ları durdurur ve yarıda kalan işleri tekrar sıraya alır. Süreç
+        kapanamadan çökerse işler 'job_stale_seconds' sonra tekrar çalıştırılır.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        with self._lock:
+            interrupted = list(self._running)
+            self._running.clear()
+        if interrupted:
+            await run_blocking(self._requeue, interrupted)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._loop = self._wakeup = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": len(self._tasks),
+                "running": len(self._running),
+                **self._counters,
+            }
+
+
+job_queue = JobQueue(
+    workers=settings.job_workers,
+    poll_interval=settings.job_poll_interval_seconds,
+    max_attempts=settings.job_max_attempts,
+    retry_backoff=settings.job_retry_backoff_seconds,
+    stale_seconds=settings.job_stale_seconds,
+)
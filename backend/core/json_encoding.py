@@ -0,0 +1,72 @@
+# app/core/json_encoding.py
+"""
+Büyük grafik verileri için hızlı, sütun tabanlı JSON.
+
+Satır bazlı JSON ('to_dict(orient="records")') her satırda tüm sütun
+adlarını tekrarlar ve her hücre için bir Python nesnesi üretir. Burada veri
+sütun sütun '{"columns": [...], "values": [[sütun0...], [sütun1...]]}'
+biçiminde, orjson ile doğrudan NumPy dizilerinden yazılır. NaN/inf değerleri
+kodlama sırasında null olur; 'astype(object).where(...)' ile kopya alınmaz.
+"""
+import datetime
+import decimal
+from typing import Any, List, Union
+
+import numpy as np
+import orjson
+import pandas as pd
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+# Tarihler satır bazlı cevaptakiyle (jsonable_encoder -> isoformat) aynı biçimde yazılır
+_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def _default(value: Any) -> Any:
+    """orjson'ın doğrudan yazamadığı hücreler (nesne sütunlarında)."""
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def column_values(series: pd.Series) -> Union[np.ndarray, List[Any]]:
+    """
+    Sütunu orjson'ın kopyasız yazabileceği bir NumPy dizisine (sayısal,
+    boolean, boşsuz tarih) ya da gerekirse listeye çevirir.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        if isinstance(dtype, np.dtype) and not series.hasnans:
+            return np.ascontiguousarray(series.to_numpy())
+        # Boş (NaT) veya saat dilimli tarihler: NaT -> NaN -> null
+        return series.dt.strftime(_DATETIME_FORMAT).tolist()
+    if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+        return np.ascontiguousarray(series.to_numpy())
+    if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+        # Nesne/metin ve boş değer içerebilen boolean sütunları; NaN/NA null olur
+        return series.tolist()
+    # Boş değer içerebilen sayısal uzantı tipleri (Int64, Float64)
+    if pd.api.types.is_integer_dtype(dtype):
+        if not series.hasnans:
+            return series.to_numpy(dtype=np.int64)
+        return series.to_numpy(dtype=object, na_value=None).tolist()
+    return series.to_numpy(dtype=float, na_value=np.nan)
+
+
+def dumps_columnar(df: pd.DataFrame, **fields: Any) -> bytes:
+    """
+    DataFrame'i '{"columns", "values", **fields}' biçiminde JSON'a çevirir.
+    'values[i]' i. sütunun tüm değerleridir.
+    """
+    payload = {
+        "columns": [str(column) for column in df.columns],
+        "values": [column_values(df.iloc[:, i]) for i in range(df.shape[1])],
+        **fields,
+    }
+    return orjson.dumps(payload, default=_default, option=_OPTIONS)
@@ -0,0 +1,339 @@
+# app/core/llm.py
+"""
+Değiştirilebilir LLM sağlayıcıları.
+
+- OpenAIProvider: OpenAI API'si.
+- LocalProvider: OpenAI uyumlu yerel bir sunucu (llama.cpp server, Ollama,
+  vLLM ya da benchmarks/fake_llm_server.py). API anahtarı gerekmez.
+- StubProvider: ağ kullanmayan, her zaman aynı cevabı veren sağlayıcı.
+  Ağ erişimi olmayan ortamlar ve ölçümler içindir.
+
+HTTP sağlayıcılarının her birinin kendi bağlantı havuzu (httpx), zaman
+aşımı, üstel bekleme ile tekrar denemesi ve aynı anda en fazla
+'llm_max_concurrency' istek sınırı vardır. Sağlayıcı 'llm_provider'
+ayarıyla seçilir. Sağlayıcılar SDK hatalarını LLMError alt sınıflarına
+çevirir; çağıranlar hata mesajını değil hata tipini kontrol eder.
+"""
+import asyncio
+import logging
+import random
+import threading
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tekrar denemeye değer (geçici) hatalar
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,  # APITimeoutError da bunun alt sınıfı
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+# Üstel beklemenin üst sınırı (saniye)
+MAX_BACKOFF_SECONDS = 8.0
+
+
+class LLMNotConfigured(RuntimeError):
+    """Seçilen sağlayıcı için gerekli ayar (örn: API anahtarı) eksik."""
+
+
+class LLMError(RuntimeError):
+    """Sağlayıcı isteği başarısız oldu. 'status_code' upstream'in HTTP kodudur (varsa)."""
+
+    status_code: Optional[int] = None
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        if status_code is not None:
+            self.status_code = status_code
+
+
+class LLMQuotaExceeded(LLMError):
+    """Kota veya istek sınırı aşıldı (429)."""
+
+    status_code = 429
+
+
+class LLMAuthError(LLMError):
+    """API anahtarı geçersiz ya da yetkisiz (401/403)."""
+
+    status_code = 401
+
+
+class LLMUnavailable(LLMError):
+    """Sağlayıcıya ulaşılamadı veya sunucu hatası verdi (bağlantı, zaman aşımı, 5xx)."""
+
+    status_code = 503
+
+
+def _translate_error(error: openai.OpenAIError) -> LLMError:
+    """OpenAI SDK hatasını sağlayıcıdan bağımsız LLMError tipine çevirir."""
+    status_code = getattr(error, "status_code", None)
+    if isinstance(error, openai.RateLimitError):
+        return LLMQuotaExceeded(str(error))
+    if isinstance(error, (openai.AuthenticationError, openai.PermissionDeniedError)):
+        return LLMAuthError(str(error), status_code)
+    if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        return LLMUnavailable(str(error), status_code)
+    return LLMError(str(error), status_code)
+
+
+class _Stats:
+    """Süreç içi istek sayaçları (/metrics için)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight = 0
+
+    def add(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "in_flight": self.in_flight,
+            }
+
+
+class LLMProvider(ABC):
+    """LLM sağlayıcı arayüzü."""
+
+    name = "base"
+
+    def __init__(self, model_override: Optional[str] = None):
+        self.model_override = model_override
+        self.stats = _Stats()
+
+    def model_for(self, model: str) -> str:
+        """Endpoint'in istediği model yerine ayarlarda verilen model kullanılır (varsa)."""
+        return self.model_override or model
+
+    @abstractmethod
+    async def complete(
+            self,
+            messages: List[dict],
+            model: str,
+            temperature: float = 0.7,
+            max_tokens: Optional[int] = None,
+            json_mode: bool = False
+    ) -> str:
+        """Cevabın tamamını döndürür."""
+
+    @abstractmethod
+    def stream(
+            self,
+            messages: List[dict],
+            model: str,
+            temperature: float = 0.7,
+            max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Cevabı model ürettikçe parça parça döndüren async generator."""
+
+    async def aclose(self) -> None:
+        pass
+
+    def info(self) -> dict:
+        return {"provider": self.name, "model_override": self.model_override, **self.stats.snapshot()}
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI API'si (veya OpenAI uyumlu herhangi bir sunucu)."""
+
+    name = "openai"
+
+    def __init__(
+            self,
+            api_key: Optional[str],
+            base_url: Optional[str] = None,
+            timeout: float = 30.0,
+            max_retries: int = 2,
+            backoff: float = 0.5,
+            max_concurrency: int = 8,
+            max_connections: int = 20,
+            model_override: Optional[str] = None
+    ):
+        super().__init__(model_override)
+        if not api_key:
+            raise LLMNotConfigured("OpenAI API anahtarı yapılandırılmamış.")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Sağlayıcıya özel bağlantı havuzu; bağlantılar istekler arasında yeniden kullanılır
+        self._http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        # Tekrar denemeler burada (bekleme süresi ve sayaçlarla) yapılır; SDK'nınki kapalı
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=0,
+            http_client=self._http
+        )
+
+    async def _sleep_before_retry(self, attempt: int) -> None:
+        delay = min(self.backoff * (2 ** attempt), MAX_BACKOFF_SECONDS)
+        await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+        self.stats.add("retries")
+
+    async def _create(self, **kwargs):
+        """
+        İsteği gönderir; geçici hatalarda üstel bekleme ile tekrar dener.
+        Son hata LLMError olarak yükseltilir.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self.client.chat.completions.create(**kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    self.stats.add("failures")
+                    raise _translate_error(e) from e
+                await self._sleep_before_retry(attempt)
+                attempt += 1
+            except openai.OpenAIError as e:
+                self.stats.add("failures")
+                raise _translate_error(e) from e
+            except Exception:
+                self.stats.add("failures")
+                raise
+
+    async def complete(self, messages, model, temperature=0.7, max_tokens=None, json_mode=False) -> str:
+        kwargs = {"model": self.model_for(model), "messages": messages, "temperature": temperature}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        async with self._semaphore:
+            self.stats.add("requests")
+            self.stats.add("in_flight")
+            try:
+                completion = await self._create(**kwargs)
+            finally:
+                self.stats.add("in_flight", -1)
+        return completion.choices[0].message.content or ""
+
+    async def stream(self, messages, model, temperature=0.7, max_tokens=None) -> AsyncIterator[str]:
+        kwargs = {"model": self.model_for(model), "messages": messages, "temperature": temperature, "stream": True}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+
+        async with self._semaphore:
+            self.stats.add("requests")
+            self.stats.add("in_flight")
+            response = None
+            try:
+                # Sadece akışın açılması tekrar denenir; parça gelmeye başladıktan sonra denenmez
+                response = await self._create(**kwargs)
+                async for chunk in response:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield delta
+            except openai.OpenAIError as e:
+                # Akış sırasında kopan bağlantı vb.
+                self.stats.add("failures")
+                raise _translate_error(e) from e
+            finally:
+                self.stats.add("in_flight", -1)
+                if response is not None:
+                    # İptal edildiğinde (istemci bağlantıyı kestiğinde) upstream akışı kapat
+                    await response.close()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    def info(self) -> dict:
+        return {**super().info(), "max_concurrency": self.max_concurrency}
+
+
+class LocalProvider(OpenAIProvider):
+    """OpenAI uyumlu yerel sunucu (llama.cpp, Ollama vb.). Anahtar gerekmez."""
+
+    name = "local"
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, **kwargs):
+        if not base_url:
+            raise LLMNotConfigured("Yerel LLM sunucusunun adresi (llm_base_url) yapılandırılmamış.")
+        # Çoğu yerel sunucu anahtarı kontrol etmez ama SDK boş anahtar kabul etmez
+        super().__init__(api_key=api_key or "local", base_url=base_url, **kwargs)
+
+
+class StubProvider(LLMProvider):
+    """Ağ kullanmayan, deterministik sağlayıcı."""
+
+    name = "stub"
+
+    REPLY = (
+        "This is an offline stub reply. Use a line chart for date columns with a numeric value, "
+        "a bar chart for categories, and a scatter plot for two related numeric columns."
+    )
+    JSON_REPLY = '{"chartType": "table", "xColumn": "", "yColumn": "", "reason": "Çevrimdışı sağlayıcı (stub) cevabı."}'
+
+    def __init__(self, delay: float = 0.0, model_override: Optional[str] = None):
+        super().__init__(model_override)
+        self.delay = delay
+
+    async def complete(self, messages, model, temperature=0.7, max_tokens=None, json_mode=False) -> str:
+        self.stats.add("requests")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.JSON_REPLY if json_mode else self.REPLY
+
+    async def stream(self, messages, model, temperature=0.7, max_tokens=None) -> AsyncIterator[str]:
+        self.stats.add("requests")
+        words = self.REPLY.split(" ")
+        for i, word in enumerate(words):
+            if self.delay:
+                await asyncio.sleep(self.delay / len(words))
+            yield word if i == 0 else " " + word
+
+
+def create_provider() -> Optional[LLMProvider]:
+    """
+    Ayarlardaki 'llm_provider' değerine göre sağlayıcıyı oluşturur. Gerekli
+    ayar eksikse None döner; AI endpoint'leri bu durumda LLM'siz çalışır
+    (kural tabanlı öneri) veya hata döndürür.
+    """
+    http_options = dict(
+        timeout=settings.openai_timeout_seconds,
+        max_retries=settings.openai_max_retries,
+        backoff=settings.llm_retry_backoff_seconds,
+        max_concurrency=settings.llm_max_concurrency,
+        max_connections=settings.llm_max_connections,
+        model_override=settings.llm_model,
+    )
+    try:
+        if settings.llm_provider == "openai":
+            return OpenAIProvider(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
+                **http_options
+            )
+        if settings.llm_provider == "local":
+            return LocalProvider(base_url=settings.llm_base_url, api_key=settings.openai_api_key, **http_options)
+        if settings.llm_provider == "stub":
+            return StubProvider(delay=settings.llm_stub_delay_seconds, model_override=settings.llm_model)
+        raise LLMNotConfigured(f"Bilinmeyen llm_provider: {settings.llm_provider}")
+    except LLMNotConfigured as e:
+        logger.warning("LLM sağlayıcısı başlatılamadı: %s", e)
+        return None
+
+
+# Tüm istekler tarafından paylaşılan sağlayıcı (yapılandırılmamışsa None)
+provider = create_provider()
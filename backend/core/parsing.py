@@ -0,0 +1,143 @@
+# app/core/parsing.py
+"""
+CSV/XLSX ayrıştırma için ayrı süreçlerden (process pool) oluşan servis.
+
+openpyxl saf Python'dur ve CPU'ya bağlıdır; istek içinde çalıştığında GIL'i
+tutar ve aynı worker'daki diğer her işi durdurur. Ayrıştırma bu yüzden
+ayrı süreçlerde yapılır. Sonuçlar DataFrame olarak pickle'lanıp geri
+gönderilmez: worker Parquet sidecar'ı diske yazar ve sadece yolunu (ve
+küçük profil sözlüğünü) döndürür.
+
+Kabul kontrolü (admission control): aynı anda çalışan + sırada bekleyen iş
+sayısı 'parse_workers + parse_queue_limit' ile, tek bir anahtarın (dosya
+içeriğinin hash'i) aynı anda tutabileceği iş sayısı 'parse_max_per_key' ile
+sınırlıdır. Sınır aşılırsa istek beklemeden 503 ile reddedilir.
+
+Zaman aşımında istek 504 ile döner, ancak worker'da başlamış iş süreç
+sonlandırılmadan durdurulamaz. Bu yüzden iş ve anahtarın kotası, worker
+gerçekten bitene kadar meşgul sayılır; kabul kontrolü sadece bekleyen
+isteklere değil, havuzda fiilen çalışan işlere göre yapılır.
+"""
+import functools
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+
+
+class ParseQueueFull(HTTPException):
+    """Ayrıştırma kuyruğu dolu; istemci daha sonra tekrar denemeli."""
+
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": "5"},
+        )
+
+
+class ParseTimeout(HTTPException):
+    """Ayrıştırma süre sınırını aştı."""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=detail)
+
+
+class ParsingService:
+    """Sınırlı kuyruklu process pool."""
+
+    def __init__(self, workers: int, queue_limit: int, max_per_key: int, timeout: float):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.max_per_key = max_per_key
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pending_by_key: Counter = Counter()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Havuz ilk kullanımda açılır. 'spawn', uvicorn'un thread'lerini
+        # fork ile kopyalamamak için tercih edilir.
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _admit(self, key: Optional[Hashable]) -> None:
+        with self._lock:
+            if self._pending >= self.workers + self.queue_limit:
+                raise ParseQueueFull("Sunucu şu anda çok fazla dosya işliyor. Lütfen biraz sonra tekrar deneyin.")
+            if key is not None and self._pending_by_key[key] >= self.max_per_key:
+                raise ParseQueueFull("Bu dosya/kullanıcı için zaten işlenen dosyalar var. Lütfen biraz sonra tekrar deneyin.")
+            self._pending += 1
+            if key is not None:
+                self._pending_by_key[key] += 1
+
+    def _release(self, key: Optional[Hashable]) -> None:
+        with self._lock:
+            self._pending -= 1
+            if key is not None:
+                self._pending_by_key[key] -= 1
+                if self._pending_by_key[key] <= 0:
+                    del self._pending_by_key[key]
+
+    def _on_done(self, key: Optional[Hashable], future: Future) -> None:
+        self._release(key)
+
+    def run(self, func: Callable[..., Any], *args, key: Optional[Hashable] = None) -> Any:
+        """
+        'func(*args)'u bir worker süreçte çalıştırır ve sonucunu bekler.
+        'func' modül seviyesinde tanımlı (pickle'lanabilir) olmalıdır.
+        Kuyruk doluysa ParseQueueFull, süre aşılırsa ParseTimeout fırlatır.
+        'parse_workers=0' ise iş aynı süreçte çalışır (geliştirme/test için).
+        """
+        self._admit(key)
+        if self.workers <= 0:
+            try:
+                return func(*args)
+            finally:
+                self._release(key)
+
+        try:
+            future = self._get_pool().submit(func, *args)
+        except BaseException:
+            self._release(key)
+            raise
+        # Kota, worker işi bitirdiğinde (ya da iş iptal edildiğinde) bırakılır
+        future.add_done_callback(functools.partial(self._on_done, key))
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Henüz başlamadıysa iptal edilir; başladıysa bitene kadar kotayı tutar
+            future.cancel()
+            raise ParseTimeout("Dosyanın işlenmesi çok uzun sürdü. Dosya çok büyük ya da karmaşık olabilir.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "pending": self._pending,
+                "pending_keys": len(self._pending_by_key),
+            }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+parse_pool = ParsingService(
+    workers=settings.parse_workers,
+    queue_limit=settings.parse_queue_limit,
+    max_per_key=settings.parse_max_per_key,
+    timeout=settings.parse_timeout_seconds,
+)
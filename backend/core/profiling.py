@@ -0,0 +1,414 @@
+# app/core/profiling.py
+"""
+Parça parça (chunk) gelen veriden artımlı sütun profili çıkarır.
+
+Her sütun için: çıkarılan tip, boş hücre sayısı, min/max, yaklaşık farklı
+değer sayısı (KMV sketch), değerlerin sıralı (artan) olup olmadığı ve küçük
+bir rastgele örnek (reservoir sample) tutulur. Sayısal sütun çiftleri için
+Pearson korelasyonu toplamlardan artımlı hesaplanır. Bellek kullanımı dosya
+boyutundan bağımsızdır; her sütun için sabit boyutlu durum saklanır.
+"""
+import datetime
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core import columnar
+from database import connection, models
+
+# Farklı değer tahmini için tutulan en küçük hash sayısı (KMV sketch)
+DISTINCT_SKETCH_SIZE = 1024
+# Sütun başına saklanan örnek değer sayısı
+SAMPLE_SIZE = 10
+# Metin sütunlarının tarih olup olmadığına karar vermek için bakılan değer sayısı
+DATE_PROBE_SIZE = 50
+DATE_PROBE_RATIO = 0.9
+
+_HASH_SPACE = float(2 ** 64)
+
+# Sütun adında geçiyorsa metin sütunu tarih kabul edilir
+DATE_NAME_KEYWORDS = ("date", "tarih", "time", "zaman", "year", "yıl")
+# Bu kadar veya daha az farklı değeri olan metin sütunları kategoriktir
+CATEGORICAL_MAX_DISTINCT = 50
+CATEGORICAL_MAX_RATIO = 0.05
+
+# Korelasyonu hesaplanan en fazla sayısal sütun sayısı (ilk N sütun)
+CORRELATION_MAX_COLUMNS = 20
+# Bir çiftin korelasyonu için gereken en az ortak (ikisi de dolu) satır sayısı
+CORRELATION_MIN_ROWS = 10
+# Profilde saklanan en güçlü korelasyon sayısı
+CORRELATION_TOP_N = 20
+
+
+def _chunk_type(series: pd.Series) -> str:
+    """Bir parçadaki boş olmayan değerlere bakarak sütun tipini çıkarır."""
+    if series.empty:
+        return "empty"
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(series):
+        return "integer"
+    if pd.api.types.is_float_dtype(series):
+        return "float"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime"
+
+    probe = series.head(DATE_PROBE_SIZE).astype(str)
+    parsed = pd.to_datetime(probe, errors="coerce", format="mixed")
+    if parsed.notna().mean() >= DATE_PROBE_RATIO and not probe.str.fullmatch(r"-?\d+(\.\d+)?").any():
+        return "datetime"
+    return "string"
+
+
+def _merge_types(current: str, new: str) -> str:
+    """İki parçanın tiplerini birleştirir; uyuşmazlıkta daha genel olan kazanır."""
+    if current == new:
+        return current
+    if "empty" in (current, new):
+        return new if current == "empty" else current
+    if {current, new} <= {"integer", "float", "boolean"}:
+        return "float" if "float" in (current, new) else "integer"
+    return "string"
+
+
+def _json_value(value):
+    """numpy/pandas skalerlerini JSON'a yazılabilir Python değerlerine çevirir."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, np.datetime64):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (int, float, bool, str)):
+        return value
+    return str(value)
+
+
+def semantic_type(name: str, dtype: str, count: int, distinct_count: int) -> str:
+    """
+    Grafik önerileri için anlamsal tip: numeric, datetime, categorical,
+    text, boolean veya empty.
+    """
+    if dtype == "empty" or count == 0:
+        return "empty"
+    if dtype == "boolean":
+        return "boolean"
+    if dtype in ("integer", "float"):
+        return "numeric"
+    if dtype == "datetime" or any(keyword in name.lower() for keyword in DATE_NAME_KEYWORDS):
+        return "datetime"
+    if distinct_count <= max(CATEGORICAL_MAX_DISTINCT, CATEGORICAL_MAX_RATIO * count):
+        return "categorical"
+    return "text"
+
+
+class ColumnProfiler:
+    """Tek bir sütun için artımlı istatistikler."""
+
+    def __init__(self, name: str, rng: np.random.Generator):
+        self.name = name
+        self.rng = rng
+        self.inferred_type = "empty"
+        self.count = 0          # Boş olmayan değer sayısı
+        self.null_count = 0
+        self.min = None
+        self.max = None
+        self.min_time = None    # Tarih olarak algılanan metin sütunları için
+        self.max_time = None
+        self.sketch = np.empty(0, dtype=np.uint64)
+        self.sample: list = []
+        self.monotonic: Optional[bool] = None  # Değerler şimdiye kadar artan sırada mı?
+        self.last_value = None
+
+    def update(self, series: pd.Series) -> None:
+        non_null = series.dropna()
+        self.null_count += len(series) - len(non_null)
+        if non_null.empty:
+            return
+
+        chunk_type = _chunk_type(non_null)
+        self.inferred_type = _merge_types(self.inferred_type, chunk_type)
+        ordered = self._update_range(non_null, chunk_type)
+        self._update_order(ordered)
+        self._update_sketch(non_null)
+        self._update_sample(non_null)
+        self.count += len(non_null)
+
+    def _update_range(self, values: pd.Series, chunk_type: str) -> Optional[pd.Series]:
+        """
+        Min/max'ı günceller. Sıralama kontrolü için karşılaştırılabilir
+        değerleri (sayılar veya ayrıştırılmış tarihler) döndürür, yoksa None.
+        """
+        ordered = None
+        if chunk_type in ("integer", "float", "boolean") or pd.api.types.is_datetime64_any_dtype(values):
+            lo, hi = values.min(), values.max()
+            if chunk_type != "boolean":
+                ordered = values
+        else:
+            as_text = values.astype(str)
+            lo, hi = as_text.min(), as_text.max()
+            if chunk_type == "datetime":
+                parsed = pd.to_datetime(as_text, errors="coerce", format="mixed")
+                ordered = parsed.dropna()
+                if parsed.notna().any():
+                    t_lo, t_hi = parsed.min(), parsed.max()
+                    self.min_time = t_lo if self.min_time is None else min(self.min_time, t_lo)
+                    self.max_time = t_hi if self.max_time is None else max(self.max_time, t_hi)
+
+        try:
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        except TypeError:
+            # Parçalar arasında tip değiştiyse (sayı -> metin) metin karşılaştırmasına geç
+            self.min = min(str(self.min), str(lo))
+            self.max = max(str(self.max), str(hi))
+        return ordered
+
+    def _update_order(self, ordered: Optional[pd.Series]) -> None:
+        """Değerlerin (parçalar arasında da) azalmayan sırada gelip gelmediğini izler."""
+        if self.monotonic is False:
+            return
+        if ordered is None or ordered.empty:
+            self.monotonic = False
+            return
+        try:
+            in_order = ordered.is_monotonic_increasing and (
+                self.last_value is None or ordered.iloc[0] >= self.last_value
+            )
+        except TypeError:
+            in_order = False
+        self.monotonic = bool(in_order)
+        self.last_value = ordered.iloc[-1]
+
+    def _update_sketch(self, values: pd.Series) -> None:
+        """K-Minimum-Values: hash'lerin en küçük K tanesini saklar."""
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        merged = np.unique(np.concatenate([self.sketch, hashes]))
+        self.sketch = merged[:DISTINCT_SKETCH_SIZE]
+
+    def _update_sample(self, values: pd.Series) -> None:
+        """
+        Algorithm R ile sabit boyutlu rastgele örnek (vektörel). Değerler
+        pandas skalerleri olarak (örn: tarihler Timestamp) saklanır; numpy
+        dizisine çevrilirse tarihler nanosaniye tamsayılarına dönüşür.
+        """
+        items = values
+        free = SAMPLE_SIZE - len(self.sample)
+        if free > 0:
+            self.sample.extend(items.iloc[:free].tolist())
+            items = items.iloc[free:]
+            seen = self.count + free
+        else:
+            seen = self.count
+        if len(items) == 0:
+            return
+
+        # i. eleman (toplamda 'seen + i + 1'. değer) k/(seen+i+1) olasılıkla bir yuvaya yazılır
+        slots = self.rng.integers(0, seen + np.arange(1, len(items) + 1))
+        accepted = np.flatnonzero(slots < SAMPLE_SIZE)
+        for i in accepted:
+            self.sample[slots[i]] = items.iloc[i]
+
+    @property
+    def distinct_count(self) -> int:
+        if len(self.sketch) < DISTINCT_SKETCH_SIZE:
+            return int(len(self.sketch))
+        kth = float(self.sketch[-1]) / _HASH_SPACE
+        return int(round((DISTINCT_SKETCH_SIZE - 1) / kth))
+
+    def result(self) -> dict:
+        if self.inferred_type == "datetime" and self.min_time is not None:
+            lo, hi = self.min_time, self.max_time
+        else:
+            lo, hi = self.min, self.max
+        distinct_count = min(self.distinct_count, self.count)
+        return {
+            "name": self.name,
+            "dtype": self.inferred_type,
+            "semantic_type": semantic_type(self.name, self.inferred_type, self.count, distinct_count),
+            "count": self.count,
+            "null_count": self.null_count,
+            "min": _json_value(lo),
+            "max": _json_value(hi),
+            "distinct_count": distinct_count,
+            "is_monotonic": bool(self.monotonic),
+            "sample": [_json_value(v) for v in self.sample],
+        }
+
+
+class CorrelationAccumulator:
+    """
+    Sayısal sütun çiftleri için Pearson korelasyonunu parça parça hesaplar.
+    Her çift için sadece ikisinin de dolu olduğu satırlar kullanılır. Büyük
+    değerlerde hassasiyet kaybını önlemek için değerler ilk parçanın
+    ortalamasına göre kaydırılır.
+    """
+
+    def __init__(self):
+        self.shift: dict[str, float] = {}
+        # (x, y) -> [n, Σx, Σy, Σxy, Σx², Σy²]
+        self.sums: dict[tuple[str, str], np.ndarray] = {}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        names = []
+        for i, name in enumerate(chunk.columns):
+            series = chunk.iloc[:, i]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                names.append((i, str(name)))
+        names = names[:CORRELATION_MAX_COLUMNS]
+        if len(names) < 2:
+            return
+
+        for i, name in names:
+            if name not in self.shift:
+                mean = chunk.iloc[:, i].mean()
+                self.shift[name] = 0.0 if pd.isna(mean) else float(mean)
+
+        values = np.column_stack([
+            chunk.iloc[:, i].to_numpy(dtype=float, na_value=np.nan) - self.shift[name] for i, name in names
+        ])
+        present = ~np.isnan(values)
+        x = np.where(present, values, 0.0)
+        mask = present.astype(float)
+
+        n = mask.T @ mask           # n[i, j]: i ve j'nin birlikte dolu olduğu satır sayısı
+        sum_x = x.T @ mask          # Σx_i (j de doluyken)
+        sum_xy = x.T @ x
+        sum_xx = (x * x).T @ mask   # Σx_i² (j de doluyken)
+
+        for a in range(len(names)):
+            for b in range(a + 1, len(names)):
+                key = (names[a][1], names[b][1])
+                delta = np.array([n[a, b], sum_x[a, b], sum_x[b, a], sum_xy[a, b], sum_xx[a, b], sum_xx[b, a]])
+                if key in self.sums:
+                    self.sums[key] += delta
+                else:
+                    self.sums[key] = delta
+
+    def result(self, numeric_columns: set) -> list:
+        """En güçlü korelasyonlar: [{"x", "y", "r"}], |r|'ye göre azalan sırada."""
+        correlations = []
+        for (x, y), (n, sx, sy, sxy, sxx, syy) in self.sums.items():
+            if x not in numeric_columns or y not in numeric_columns or n < CORRELATION_MIN_ROWS:
+                continue
+            cov = sxy - sx * sy / n
+            var_x = sxx - sx * sx / n
+            var_y = syy - sy * sy / n
+            if var_x <= 0 or var_y <= 0:
+                continue
+            r = float(np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0))
+            correlations.append({"x": x, "y": y, "r": round(r, 4)})
+        correlations.sort(key=lambda item: abs(item["r"]), reverse=True)
+        return correlations[:CORRELATION_TOP_N]
+
+
+class DatasetProfiler:
+    """Bir veri setinin tüm sütunları için artımlı profil."""
+
+    def __init__(self, seed: Optional[int] = 0):
+        self.rng = np.random.default_rng(seed)
+        self.row_count = 0
+        self.columns: dict[str, ColumnProfiler] = {}
+        self.correlations = CorrelationAccumulator()
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        self.row_count += len(chunk)
+        self.correlations.update(chunk)
+        for i, name in enumerate(chunk.columns):
+            name = str(name)
+            if name not in self.columns:
+                self.columns[name] = ColumnProfiler(name, self.rng)
+            self.columns[name].update(chunk.iloc[:, i])
+
+    def result(self) -> dict:
+        columns = [profiler.result() for profiler in self.columns.values()]
+        numeric_columns = {column["name"] for column in columns if column["semantic_type"] == "numeric"}
+        return {
+            "row_count": self.row_count,
+            "columns": columns,
+            "correlations": self.correlations.result(numeric_columns),
+        }
+
+
+def profile_dataframe(df: pd.DataFrame) -> dict:
+    """Bellekteki bir DataFrame'in profilini tek parça olarak çıkarır."""
+    profiler = DatasetProfiler()
+    profiler.update(df)
+    return profiler.result()
+
+
+def profile_sidecar(sidecar_path: str) -> dict:
+    """Sidecar'ı satır grubu satır grubu okuyarak profil çıkarır (bellek sınırlı)."""
+    profiler = DatasetProfiler()
+    parquet_file = pq.ParquetFile(sidecar_path)
+    for i in range(parquet_file.num_row_groups):
+        profiler.update(parquet_file.read_row_group(i).to_pandas())
+    return profiler.result()
+
+
+def save_profile(blob: models.BlobDB, profile: dict) -> None:
+    """Profil sonucunu BlobDB'ye ve ColumnProfileDB satırlarına yazar (commit etmez)."""
+    blob.row_count = profile["row_count"]
+    blob.correlations = profile["correlations"]
+    blob.column_profiles = [
+        models.ColumnProfileDB(
+            position=position,
+            name=column["name"],
+            dtype=column["dtype"],
+            semantic_type=column["semantic_type"],
+            count=column["count"],
+            null_count=column["null_count"],
+            distinct_count=column["distinct_count"],
+            is_monotonic=column["is_monotonic"],
+            min_value=column["min"],
+            max_value=column["max"],
+            sample=column["sample"],
+        )
+        for position, column in enumerate(profile["columns"])
+    ]
+
+
+def store_profile(blob: models.BlobDB, db: Session, profile: dict) -> None:
+    """
+    Profili kaydeder ve commit eder. Başka bir istek/iş aynı profili önce
+    kaydettiyse (content_hash, position) tekilliği ihlal edilir; bu durumda
+    değişiklikler geri alınır ve kayıtlı profil okunur.
+    """
+    save_profile(blob, profile)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        db.refresh(blob)
+
+
+def ensure_profile(blob: models.BlobDB, db: Session) -> List[models.ColumnProfileDB]:
+    """
+    İçeriğin kayıtlı profilini döndürür. Profil yoksa (örn: yükleme anında
+    ayrıştırılamadıysa) sidecar üzerinden bir kez hesaplanıp kaydedilir.
+    Profil içerik hash'ine bağlı olduğundan aynı içerikli dosyalar paylaşır.
+    """
+    if blob.row_count is None:
+        store_profile(blob, db, profile_sidecar(columnar.ensure_sidecar(blob, db)))
+    return blob.column_profiles
+
+
+def build_profile(content_hash: str) -> None:
+    """
+    'ensure_profile'ın kendi veritabanı oturumunu açan hali. Birden fazla
+    isteğin paylaştığı (single-flight) işlerde kullanılır; sonuç veritabanına
+    yazılır, her istek kendi oturumundan okur.
+    """
+    db = connection.Sessionlocal()
+    try:
+        blob = db.get(models.BlobDB, content_hash)
+        if blob is not None:
+            ensure_profile(blob, db)
+    finally:
+        db.close()
@@ -0,0 +1,174 @@
+# app/core/prompts.py
+"""
+LLM prompt'ları için token bütçeli, sıkıştırılmış veri seti özetleri.
+
+Özet ham veriden değil kayıtlı sütun profilinden üretilir: her sütun için
+tip, boş/farklı değer sayısı, min/max ve birkaç örnek değer. Uzun hücreler
+kısaltılır; çok sütunlu tablolarda farklı tiplerden sırayla sütun seçilir
+ve bütçe dolunca kalan sütunlar sadece sayı olarak belirtilir. Örnek satırlar
+sadece seçilen sütunlarla ve bütçede yer kaldıkça eklenir. Sonuçla birlikte
+kullanılan (yaklaşık) token sayısı döner.
+"""
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from database import models
+
+# Ortalama bir token'ın karakter sayısı (tokenizer olmadan kaba tahmin)
+CHARS_PER_TOKEN = 4
+# Mesaj başına rol/biçim için eklenen yaklaşık token sayısı
+MESSAGE_TOKEN_OVERHEAD = 4
+
+# Bir hücre/örnek değerin prompt'ta gösterilen en fazla karakter sayısı
+MAX_CELL_CHARS = 40
+# Sütun başına gösterilen örnek değer sayısı
+MAX_COLUMN_EXAMPLES = 3
+# Gösterilen en güçlü korelasyon sayısı
+MAX_CORRELATIONS = 3
+# Bütçenin sütun açıklamalarına ayrılan payı; kalanı örnek satırlar içindir
+COLUMN_BUDGET_SHARE = 0.7
+
+# Çok sütunlu tablolarda sütunlar bu tip sırasıyla dönüşümlü seçilir
+_TYPE_ORDER = ("datetime", "numeric", "categorical", "boolean", "text", "empty")
+
+
+def estimate_tokens(text: str) -> int:
+    """Metnin yaklaşık token sayısı."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class PromptSummary:
+    text: str
+    tokens: int
+    columns_shown: int
+    columns_total: int
+    rows_shown: int
+
+
+def truncate_value(value, max_chars: int = MAX_CELL_CHARS) -> str:
+    """Değeri tek satırlık, en fazla 'max_chars' karakterlik metne çevirir."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return "null"
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    text = " ".join(str(value).split())
+    if len(text) > max_chars:
+        text = text[:max_chars - 1] + "…"
+    return text
+
+
+def _interleave_by_type(columns: List[models.ColumnProfileDB]) -> List[models.ColumnProfileDB]:
+    """Sütunları tiplerine göre gruplar ve gruplardan sırayla birer tane alır."""
+    groups = {semantic: [] for semantic in _TYPE_ORDER}
+    for column in columns:
+        groups.setdefault(column.semantic_type, []).append(column)
+    ordered = []
+    queues = [group for group in groups.values() if group]
+    while queues:
+        for group in queues:
+            ordered.append(group.pop(0))
+        queues = [group for group in queues if group]
+    return ordered
+
+
+def _column_line(column: models.ColumnProfileDB) -> str:
+    # Sütun adları kısaltılmaz; model cevabında adı birebir kullanmalıdır
+    parts = [f"- {column.name} ({column.semantic_type}/{column.dtype})"]
+    parts.append(f"nulls={column.null_count}")
+    parts.append(f"distinct≈{column.distinct_count}")
+    if column.min_value is not None:
+        parts.append(f"min={truncate_value(column.min_value)}")
+    if column.max_value is not None:
+        parts.append(f"max={truncate_value(column.max_value)}")
+    if column.is_monotonic:
+        parts.append("sorted")
+    examples = [truncate_value(value) for value in (column.sample or [])[:MAX_COLUMN_EXAMPLES]]
+    if examples:
+        parts.append(f"e.g. [{', '.join(examples)}]")
+    return ", ".join(parts)
+
+
+def fit_lines(lines: Iterable[str], budget: int) -> tuple[List[str], int]:
+    """Bütçeye sığan ilk satırları ve kullanılan token sayısını döndürür."""
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return kept, used
+
+
+def build_dataset_summary(
+        column_profiles: Iterable[models.ColumnProfileDB],
+        budget: int,
+        row_count: Optional[int] = None,
+        correlations: Optional[List[dict]] = None,
+        sample_rows: Optional[pd.DataFrame] = None
+) -> PromptSummary:
+    """
+    Profilden 'budget' token'ı aşmayan bir veri seti özeti üretir.
+    'sample_rows' verilirse bütçede yer kaldıkça örnek satırlar eklenir.
+    """
+    columns = list(column_profiles)
+    header = f"rows: {row_count if row_count is not None else '?'}, columns: {len(columns)}"
+    more_line = f"(+{len(columns)} more columns not shown)"
+    # Başlık, "columns:" satırı ve gerekirse "gösterilmeyen sütunlar" satırı için yer ayır
+    used = estimate_tokens(header) + 3
+    reserved = estimate_tokens(more_line) + 1
+
+    column_budget = int(budget * COLUMN_BUDGET_SHARE) if sample_rows is not None else budget
+    ordered = _interleave_by_type(columns)
+    column_lines, column_tokens = fit_lines((_column_line(c) for c in ordered), column_budget - used - reserved)
+    used += column_tokens
+    shown = ordered[:len(column_lines)]
+    # Seçilen sütunlar dosyadaki sıralarıyla gösterilir
+    position = {column.name: i for i, column in enumerate(columns)}
+    shown.sort(key=lambda column: position[column.name])
+    column_lines = [_column_line(column) for column in shown]
+
+    lines = [header, "columns:"] + column_lines
+    if len(shown) < len(columns):
+        lines.append(f"(+{len(columns) - len(shown)} more columns not shown)")
+        used += estimate_tokens(lines[-1]) + 1
+
+    shown_names = {column.name for column in shown}
+    pairs = [item for item in correlations or [] if item["x"] in shown_names and item["y"] in shown_names]
+    if pairs:
+        correlation_line = "correlations: " + ", ".join(
+            f"{item['x']}~{item['y']} r={item['r']:.2f}"
+            for item in pairs[:MAX_CORRELATIONS]
+        )
+        if used + estimate_tokens(correlation_line) + 1 <= budget:
+            lines.append(correlation_line)
+            used += estimate_tokens(correlation_line) + 1
+
+    rows_shown = 0
+    if sample_rows is not None and shown and not sample_rows.empty:
+        names = [column.name for column in shown if column.name in sample_rows.columns]
+        row_header = "sample rows (" + " | ".join(names) + "):"
+        row_lines = (
+            " | ".join(truncate_value(value) for value in row)
+            for row in sample_rows[names].itertuples(index=False, name=None)
+        )
+        header_cost = estimate_tokens(row_header) + 1
+        if used + header_cost < budget:
+            kept, row_tokens = fit_lines(row_lines, budget - used - header_cost)
+            if kept:
+                lines.append(row_header)
+                lines.extend(kept)
+                used += header_cost + row_tokens
+                rows_shown = len(kept)
+
+    text = "\n".join(lines)
+    return PromptSummary(
+        text=text,
+        tokens=estimate_tokens(text),
+        columns_shown=len(shown),
+        columns_total=len(columns),
+        rows_shown=rows_shown,
+    )
@@ -0,0 +1,131 @@
+# app/core/recommendation_cache.py
+"""
+LLM grafik önerileri için veritabanı tabanlı önbellek.
+
+Aynı içerik (içerik hash'i) ve aynı sütun şeması için aynı model ve aynı
+prompt sürümüyle daha önce alınmış bir cevap varsa OpenAI'ye tekrar
+gidilmez. Kayıtlar 'ai_cache_ttl_seconds' sonra geçersiz olur; bir içeriğin
+kayıtları 'invalidate' ile elle de silinebilir. Prompt şablonu değiştiğinde
+sürümü artırılmalıdır; eski kayıtlar böylece kendiliğinden kullanılmaz.
+"""
+import datetime
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from database import models
+
+
+@dataclass(frozen=True)
+class RecommendationKey:
+    content_hash: str
+    kind: str
+    schema_hash: str
+    model: str
+    prompt_version: str
+
+
+class _Counters:
+    """Süreç içi isabet/ıskalama sayaçları (/metrics için)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    def add(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+counters = _Counters()
+
+
+def schema_fingerprint(column_profiles: Iterable[models.ColumnProfileDB]) -> str:
+    """Sütun adları ve tiplerinden kısa bir hash üretir."""
+    schema = [[c.name, c.dtype, c.semantic_type] for c in column_profiles]
+    raw = json.dumps(schema, ensure_ascii=False).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _query(db: Session, key: RecommendationKey):
+    return db.query(models.AIRecommendationDB).filter(
+        models.AIRecommendationDB.content_hash == key.content_hash,
+        models.AIRecommendationDB.kind == key.kind,
+        models.AIRecommendationDB.schema_hash == key.schema_hash,
+        models.AIRecommendationDB.model == key.model,
+        models.AIRecommendationDB.prompt_version == key.prompt_version,
+    )
+
+
+def get(db: Session, key: RecommendationKey) -> Optional[dict]:
+    """Geçerli bir kayıt varsa saklanan cevabı, yoksa None döndürür."""
+    entry = _query(db, key).first()
+    if entry is not None and entry.expires_at <= datetime.datetime.utcnow():
+        db.delete(entry)
+        db.commit()
+        entry = None
+
+    if entry is None:
+        counters.add("misses")
+        return None
+    counters.add("hits")
+    return entry.response
+
+
+def put(db: Session, key: RecommendationKey, response: dict) -> None:
+    """Cevabı saklar; aynı anahtarlı eski kayıt varsa üzerine yazar."""
+    expires_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=settings.ai_cache_ttl_seconds)
+    entry = _query(db, key).first()
+    if entry is None:
+        entry = models.AIRecommendationDB(
+            content_hash=key.content_hash,
+            kind=key.kind,
+            schema_hash=key.schema_hash,
+            model=key.model,
+            prompt_version=key.prompt_version,
+        )
+        db.add(entry)
+    entry.response = response
+    entry.created_at = datetime.datetime.utcnow()
+    entry.expires_at = expires_at
+    try:
+        db.commit()
+    except IntegrityError:
+        # Aynı anahtar eşzamanlı başka bir istekte yazıldı; o kayıt yeterli
+        db.rollback()
+        return
+    counters.add("stores")
+
+
+def invalidate(db: Session, content_hash: str) -> int:
+    """Bir içeriğe ait tüm kayıtları siler; silinen kayıt sayısını döndürür."""
+    deleted = db.query(models.AIRecommendationDB).filter(
+        models.AIRecommendationDB.content_hash == content_hash
+    ).delete(synchronize_session=False)
+    db.commit()
+    counters.add("invalidations", deleted)
+    return deleted
+
+
+def stats() -> dict:
+    return counters.stats()
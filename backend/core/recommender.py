@@ -0,0 +1,146 @@
+# app/core/recommender.py
+"""
+Kayıtlı sütun profilinden kural tabanlı grafik önerisi.
+
+LLM'e gitmeden, sadece profildeki bilgilerle (anlamsal tip, farklı değer
+sayısı, tarihlerin sıralı olması, sayısal sütunlar arası korelasyon) aday
+grafikler üretilir ve her birine bir güven puanı verilir. En yüksek puanlı
+aday döner. 'auto' modunda puan CONFIDENCE_THRESHOLD'un altındaysa LLM'e
+sorulur.
+"""
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from database import models
+
+# Bu puanın altındaki öneriler 'auto' modunda LLM'e danışılır
+CONFIDENCE_THRESHOLD = 0.7
+# Bu orandan fazla farklı değeri olan sıralı tamsayı sütunları kimlik (ID) sayılır
+ID_DISTINCT_RATIO = 0.95
+# Pasta grafik için en fazla dilim sayısı
+PIE_MAX_CATEGORIES = 6
+# Dağılım grafiği için "güçlü" sayılan korelasyon
+STRONG_CORRELATION = 0.5
+
+
+@dataclass
+class Recommendation:
+    chart_type: str
+    x_column: str
+    y_column: str
+    reason: str
+    confidence: float
+
+    def as_dict(self) -> dict:
+        return {
+            "chartType": self.chart_type,
+            "xColumn": self.x_column,
+            "yColumn": self.y_column,
+            "reason": self.reason,
+            "confidence": round(self.confidence, 2),
+        }
+
+
+def _is_id_like(column: models.ColumnProfileDB) -> bool:
+    """Sıralı ve (neredeyse) tüm değerleri farklı tamsayı sütunu: satır numarası/ID."""
+    return (
+        column.dtype == "integer"
+        and bool(column.is_monotonic)
+        and column.count > 0
+        and column.distinct_count >= ID_DISTINCT_RATIO * column.count
+    )
+
+
+def _best_measure(numeric: List[models.ColumnProfileDB]) -> Optional[models.ColumnProfileDB]:
+    """Y ekseni için sayısal sütun: önce ondalıklı olanlar, sonra en dolu olan."""
+    if not numeric:
+        return None
+    return max(numeric, key=lambda c: (c.dtype == "float", c.count))
+
+
+def _candidates(
+        columns: List[models.ColumnProfileDB],
+        correlations: List[dict]
+) -> List[Recommendation]:
+    numeric = [c for c in columns if c.semantic_type == "numeric" and not _is_id_like(c)]
+    dates = [c for c in columns if c.semantic_type == "datetime"]
+    categories = [c for c in columns if c.semantic_type in ("categorical", "boolean") and c.distinct_count >= 2]
+    measure = _best_measure(numeric)
+    candidates = []
+
+    # 1. Tarih + sayı: zaman serisi. Tarihler sıralıysa veri zaten bir zaman serisidir.
+    if dates and measure is not None:
+        date = max(dates, key=lambda c: (bool(c.is_monotonic), c.distinct_count))
+        if date.is_monotonic:
+            candidates.append(Recommendation(
+                "line", date.name, measure.name,
+                f"'{date.name}' sıralı bir tarih sütunu; '{measure.name}' değerinin zaman içindeki değişimi çizgi grafikle izlenebilir.",
+                0.9
+            ))
+        else:
+            candidates.append(Recommendation(
+                "line", date.name, measure.name,
+                f"'{date.name}' bir tarih sütunu; '{measure.name}' için zaman içindeki eğilim çizgi grafikle gösterilebilir.",
+                0.75
+            ))
+
+    # 2. Kategori + sayı: karşılaştırma. Az kategori varsa pasta grafik de uygun.
+    if categories and measure is not None:
+        category = min(categories, key=lambda c: (c.distinct_count > 20, -c.count, c.distinct_count))
+        non_negative = isinstance(measure.min_value, (int, float)) and measure.min_value >= 0
+        if category.distinct_count <= PIE_MAX_CATEGORIES and non_negative:
+            candidates.append(Recommendation(
+                "pie", category.name, measure.name,
+                f"'{category.name}' sadece {category.distinct_count} farklı değer içeriyor; '{measure.name}' toplamının dağılımı pasta grafikle gösterilebilir.",
+                0.7
+            ))
+        confidence = 0.8 if category.distinct_count <= 20 else 0.6
+        candidates.append(Recommendation(
+            "bar", category.name, measure.name,
+            f"'{category.name}' kategorileri arasında '{measure.name}' değeri çubuk grafikle karşılaştırılabilir.",
+            confidence
+        ))
+
+    # 3. İki sayı: ilişki. Korelasyon güçlüyse dağılım grafiği öne çıkar.
+    numeric_names = {c.name for c in numeric}
+    pairs = [item for item in correlations or [] if item["x"] in numeric_names and item["y"] in numeric_names]
+    if pairs:
+        strongest = pairs[0]  # Profilde |r|'ye göre sıralı
+        strong = abs(strongest["r"]) >= STRONG_CORRELATION
+        candidates.append(Recommendation(
+            "scatter", strongest["x"], strongest["y"],
+            f"'{strongest['x']}' ile '{strongest['y']}' arasında "
+            f"{'güçlü' if strong else 'zayıf'} bir ilişki var (r = {strongest['r']:.2f}); dağılım grafiği uygun.",
+            0.85 if strong else 0.5
+        ))
+
+    # 4. Sadece sayı varsa: sıra/ID ekseninde çizgi grafik
+    if measure is not None and not candidates:
+        ids = [c for c in columns if c.semantic_type == "numeric" and _is_id_like(c)]
+        x_column = ids[0].name if ids else measure.name
+        candidates.append(Recommendation(
+            "line", x_column, measure.name,
+            f"Veride tarih veya kategori sütunu yok; '{measure.name}' değerleri sırayla çizgi grafikle gösterilebilir.",
+            0.4
+        ))
+
+    return candidates
+
+
+def recommend(
+        column_profiles: Iterable[models.ColumnProfileDB],
+        correlations: Optional[List[dict]] = None
+) -> Recommendation:
+    """Profilden en uygun grafik önerisini üretir; hiç aday yoksa tablo önerir."""
+    columns = [c for c in column_profiles if c.semantic_type != "empty"]
+    candidates = _candidates(columns, correlations or [])
+    if candidates:
+        return max(candidates, key=lambda candidate: candidate.confidence)
+
+    x_column = columns[0].name if columns else ""
+    y_column = columns[1].name if len(columns) > 1 else x_column
+    return Recommendation(
+        "table", x_column, y_column,
+        "Veride grafik için uygun bir sayısal sütun bulunamadı; veri tablo olarak gösterilebilir.",
+        0.3
+    )
@@ -1,17 +1,27 @@
 # app/core/security.py
+import time
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from core.config import settings
+from core.auth_cache import token_cache, user_cache, user_snapshot
+from core.executors import password_executor
 from database import connection, models
 from schemas import token as token_schema
 
-# Şifreleme bağlamı (artık argon2 kullan)
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Şifreleme bağlamı (artık argon2 kullan). Parametreleri ayarlardakinden farklı
+# olan hash'ler 'needs_update' ile eski sayılır ve girişte yeniden hash'lenir.
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.argon2_time_cost,
+    argon2__memory_cost=settings.argon2_memory_cost,
+    argon2__parallelism=settings.argon2_parallelism,
+)
 # Token'ın alınacağı URL (auth.py'daki login endpoint'i)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
@@ -26,6 +36,19 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
+async def hash_password(password: str) -> str:
+    """get_password_hash'in şifre havuzunda çalışan hali (kuyruk doluysa 503)."""
+    return await password_executor.run(get_password_hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Şifreyi şifre havuzunda doğrular (kuyruk doluysa 503). Hash eski
+    parametrelerle üretilmişse ikinci değer yeni hash'tir, değilse None.
+    """
+    return await password_executor.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """Yeni bir JWT erişim token'ı oluşturur."""
     to_encode = data.copy()
@@ -43,6 +66,56 @@ def get_user_by_email(db: Session, email: str):
     return db.query(models.UserDB).filter(models.UserDB.email == email).first()
 
 
+def decode_token(token: str) -> token_schema.TokenData | None:
+    """
+    Token'ı doğrular ve claim'lerini döndürür (geçersizse None). Doğrulanmış
+    claim'ler token'ın süresi dolana kadar (en fazla önbellek süresi) saklanır.
+    """
+    token_data = token_cache.get(token)
+    if token_data is not None:
+        # Önbellek süresi token'ın süresine göre kısaltılır; yine de kontrol et
+        return token_data if token_data.expires_at > time.time() else None
+
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("sub") is None:
+        return None
+    token_data = token_schema.TokenData(
+        email=payload["sub"],
+        user_id=payload.get("uid"),
+        expires_at=payload.get("exp", 0)
+    )
+    token_cache.put(token, token_data, ttl=token_data.expires_at - time.time())
+    return token_data
+
+
+def get_user_by_token(db: Session, token_data: token_schema.TokenData):
+    """
+    Claim'lerdeki kullanıcıyı döndürür. Önbellekteyse veritabanına gidilmez;
+    kullanıcı bu oturuma SQL çalıştırmadan eklenir (merge, load=False).
+    'uid' claim'i olmayan eski token'larda kullanıcı e-postayla aranır.
+    """
+    if token_data.user_id is not None:
+        cached = user_cache.get(token_data.user_id)
+        if cached is not None:
+            if cached["email"] != token_data.email:
+                return None
+            user = models.UserDB(**cached)
+            make_transient_to_detached(user)
+            return db.merge(user, load=False)
+        user = db.get(models.UserDB, token_data.user_id)
+    else:
+        user = get_user_by_email(db, email=token_data.email)
+
+    # Token'daki e-posta değiştiyse kullanıcı kabul edilmez (eski davranışla aynı)
+    if user is None or user.email != token_data.email:
+        return None
+    user_cache.put(user.id, user_snapshot(user))
+    return user
+
+
 def get_current_user(
         db: Session = Depends(connection.get_db),
         token: str = Depends(oauth2_scheme)
@@ -56,16 +129,11 @@ def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = token_schema.TokenData(email=email)
-    except JWTError:
+    token_data = decode_token(token)
+    if token_data is None:
         raise credentials_exception
 
-    user = get_user_by_email(db, email=token_data.email)
+    user = get_user_by_token(db, token_data)
     if user is None:
         raise credentials_exception
     return user
\ No newline at end of file
@@ -0,0 +1,69 @@
+# app/core/singleflight.py
+"""
+Aynı anda gelen özdeş işlerin birleştirilmesi (single-flight).
+
+Bir dosya açıldığında arayüz '/ai/analyze_file' çağırır, sohbet de aynı
+analizi 'chat_with_ai' üzerinden tekrar ister. Aynı anahtar için havada bir
+iş varsa yeni istek onu başlatmaz; aynı görevin sonucunu (veya hatasını)
+bekler. Anahtar, içerik hash'i ve işlemi içeren bir tuple'dır; örn:
+("profile", content_hash) veya ("llm", RecommendationKey).
+
+İş ayrı bir asyncio görevi olarak çalışır ve bekleyenlerden biri iptal
+edilirse (istemci bağlantıyı keserse) diğerleri için devam eder. Bu yüzden
+iş, isteğe ait kaynakları (örn: isteğin veritabanı oturumu) kullanmamalıdır.
+Sonuç saklanmaz; iş bitince anahtar silinir (kalıcı sonuçlar için önbellekler).
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Anahtar başına en fazla bir havadaki iş."""
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()  # Sadece sayaçlar için; görevler event loop'ta
+        self.leaders = 0  # İşi başlatan çağrılar
+        self.followers = 0  # Havadaki işe katılan çağrılar
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        'key' için havada bir iş varsa onun sonucunu bekler; yoksa 'func()'
+        ile yeni bir iş başlatır.
+        """
+        loop = asyncio.get_running_loop()
+        task = self._tasks.get(key)
+        # Başka bir event loop'a ait (örn: önceki bir test istemcisinin) görev kullanılmaz
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self._count("leaders")
+        else:
+            self._count("followers")
+        # shield: bekleyen iptal edilse de iş diğer bekleyenler için sürer
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Kimse beklemiyorsa "exception was never retrieved" uyarısını önle
+        if not task.cancelled():
+            task.exception()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "followers": self.followers,
+                "in_flight": len(self._tasks),
+            }
+
+
+# Tüm istekler tarafından paylaşılan örnek
+singleflight = SingleFlight()
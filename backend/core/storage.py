@@ -0,0 +1,190 @@
+# app/core/storage.py
+"""
+İçerik adresli (content-addressed) yükleme deposu.
+
+Yüklenen dosya diske yazılırken aynı akışta BLAKE2b ile hash'lenir ve
+'blobs/<ilk iki karakter>/<hash><uzantı>' yoluna taşınır. Aynı içerik
+(başka kullanıcıdan ya da aynı kullanıcıdan tekrar) geldiğinde diskteki
+kopya, sidecar ve profil yeniden kullanılır; sadece referans sayısı artar.
+Son referans silindiğinde içerik de diskten kaldırılır.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core import columnar
+from database import models
+
+BLOB_DIRECTORY_NAME = "blobs"
+TMP_DIRECTORY_NAME = "tmp"
+# Diske yazılırken her seferde okunan blok boyutu
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+@dataclass
+class StagedUpload:
+    """Hash'i hesaplanmış, henüz depoya alınmamış yükleme."""
+    content_hash: str
+    tmp_path: str
+    size: int
+
+
+def new_hasher():
+    return hashlib.blake2b(digest_size=32)
+
+
+def _adjust_ref_count(db: Session, blob: models.BlobDB, delta: int) -> None:
+    """Referans sayısını veritabanında atomik olarak günceller (eşzamanlı yüklemeler için)."""
+    db.query(models.BlobDB).filter(models.BlobDB.content_hash == blob.content_hash).update(
+        {models.BlobDB.ref_count: models.BlobDB.ref_count + delta},
+        synchronize_session=False
+    )
+    db.refresh(blob)
+
+
+def blob_path_for(upload_directory: str, content_hash: str, extension: str) -> str:
+    return os.path.join(upload_directory, BLOB_DIRECTORY_NAME, content_hash[:2], f"{content_hash}{extension}")
+
+
+def stage_upload(source: BinaryIO, upload_directory: str) -> StagedUpload:
+    """Akışı geçici bir dosyaya yazar ve yazarken hash'ini hesaplar."""
+    tmp_directory = os.path.join(upload_directory, TMP_DIRECTORY_NAME)
+    os.makedirs(tmp_directory, exist_ok=True)
+
+    hasher = new_hasher()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_directory)
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                block = source.read(COPY_BUFFER_SIZE)
+                if not block:
+                    break
+                hasher.update(block)
+                buffer.write(block)
+                size += len(block)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return StagedUpload(content_hash=hasher.hexdigest(), tmp_path=tmp_path, size=size)
+
+
+def acquire_blob(
+        db: Session,
+        staged: StagedUpload,
+        upload_directory: str,
+        extension: str
+) -> tuple[models.BlobDB, bool]:
+    """
+    Hazırlanan yüklemeyi depoya alır ve referans sayısını bir artırır.
+    İçerik zaten varsa geçici dosya silinir. (BlobDB, yeni_mi) döner.
+    Değişiklikler commit edilmez.
+    """
+    blob = db.get(models.BlobDB, staged.content_hash)
+    if blob is not None:
+        os.remove(staged.tmp_path)
+        _adjust_ref_count(db, blob, 1)
+        return blob, False
+
+    blob_path = blob_path_for(upload_directory, staged.content_hash, extension)
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    os.replace(staged.tmp_path, blob_path)
+
+    blob = models.BlobDB(
+        content_hash=staged.content_hash,
+        size=staged.size,
+        blob_path=blob_path,
+        ref_count=1
+    )
+    db.add(blob)
+    try:
+        db.flush()
+    except IntegrityError:
+        # Aynı içerik eşzamanlı başka bir istekte kaydedildi; onu kullan
+        db.rollback()
+        blob = db.get(models.BlobDB, staged.content_hash)
+        _adjust_ref_count(db, blob, 1)
+        return blob, False
+    return blob, True
+
+
+def release_blob(db: Session, blob: models.BlobDB) -> List[str]:
+    """
+    Referans sayısını bir azaltır. Son referanssa kaydı (ve profilini)
+    siler ve diskten kaldırılması gereken yolları döndürür. Dosyalar,
+    çağıran commit ettikten sonra 'remove_paths' ile silinmelidir.
+    """
+    _adjust_ref_count(db, blob, -1)
+    if blob.ref_count > 0:
+        return []
+    db.delete(blob)
+    return [blob.blob_path, columnar.sidecar_path_for(blob.blob_path)]
+
+
+def hash_file(path: str) -> str:
+    """Diskteki dosyanın içerik hash'i (BLAKE2b)."""
+    hasher = new_hasher()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(COPY_BUFFER_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def backfill_legacy_files(db: Session, upload_directory: str) -> dict:
+    """
+    İçerik deposundan önce yüklenmiş (content_hash'i boş) dosyaları depoya
+    taşır: ham dosya hash'lenir, 'blobs/' altına taşınır (içerik zaten
+    varsa silinir) ve FileDB satırları bu içeriğe bağlanır. Aynı yolu
+    paylaşan satırlar aynı içeriğe bağlanır. Diskte bulunamayan dosyalar
+    olduğu gibi bırakılır (kullanıcı yeniden yüklemelidir). Commit eder.
+    """
+    legacy = db.query(models.FileDB).filter(models.FileDB.content_hash.is_(None)).all()
+    by_path = {}
+    for db_file in legacy:
+        by_path.setdefault(db_file.file_path, []).append(db_file)
+
+    linked, missing = 0, 0
+    for path, files in by_path.items():
+        if not path or not os.path.isfile(path):
+            missing += len(files)
+            continue
+        content_hash = hash_file(path)
+        blob = db.get(models.BlobDB, content_hash)
+        if blob is None:
+            blob_path = blob_path_for(upload_directory, content_hash, extension_for(path))
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            size = os.path.getsize(path)
+            os.replace(path, blob_path)
+            blob = models.BlobDB(content_hash=content_hash, size=size, blob_path=blob_path, ref_count=0)
+            db.add(blob)
+            db.flush()
+        elif os.path.abspath(path) != os.path.abspath(blob.blob_path):
+            os.remove(path)
+        for db_file in files:
+            db_file.content_hash = content_hash
+            db_file.file_path = blob.blob_path
+        _adjust_ref_count(db, blob, len(files))
+        # Dosya taşındığı için her yol grubu ayrı commit edilir
+        db.commit()
+        linked += len(files)
+    return {"linked": linked, "missing": missing}
+
+
+def remove_paths(paths: List[str]) -> None:
+    for path in paths:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            # Disk silme başarısız olsa da veritabanı tutarlı kalır
+            pass
+
+
+def extension_for(filename: Optional[str]) -> str:
+    return os.path.splitext(filename or "")[1].lower()
+
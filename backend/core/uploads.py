@@ -0,0 +1,262 @@
+# app/core/uploads.py
+"""
+Devam ettirilebilir, parçalı dosya yükleme.
+
+Akış: oturum aç -> parçaları sırayla (offset ile) gönder -> tamamla.
+Parçalar yükleme klasöründeki geçici dosyaya doğrudan eklenir; tamamlanınca
+dosya kopyalanmadan (aynı disk üzerinde yeniden adlandırılarak) içerik
+deposuna taşınır. Her parça SHA-256 ile doğrulanır; bozuk parça yazılmaz.
+Bağlantı koparsa istemci oturumun 'received' değerinden devam eder.
+
+Bir oturuma aynı anda tek bir parça yazılabilir: yazıcı, dosyayı açmadan
+önce oturumu sahiplenir (süreç içi kayıt + dosya kilidi, diğer worker'lar
+için) ve onaylı offset'i kilit altında tekrar kontrol eder. Aynı anda gelen
+ikinci parça beklemeden ChunkInProgress ile reddedilir.
+
+İçerik hash'i (BLAKE2b) parçalar geldikçe bellekte güncellenir. Sunucu yeniden
+başlatıldıysa ya da parçalar başka bir worker'a geldiyse tamamlama sırasında
+dosya bir kez okunarak hesaplanır.
+"""
+import datetime
+import hashlib
+import os
+import secrets
+import threading
+from typing import Dict, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sadece süreç içi kilit kullanılır
+    fcntl = None
+
+from sqlalchemy.orm import Session
+
+from core import storage
+from core.config import settings
+from database import models
+
+
+class UploadError(Exception):
+    """Parçalı yükleme hatalarının temel sınıfı."""
+
+
+class OffsetConflict(UploadError):
+    """Parça, sunucunun beklediği offset'ten başlamıyor."""
+
+    def __init__(self, expected: int):
+        super().__init__(expected)
+        self.expected = expected
+
+
+class ChecksumMismatch(UploadError):
+    """Parçanın SHA-256 özeti istemcinin gönderdiğiyle uyuşmuyor."""
+
+
+class ChunkTooLarge(UploadError):
+    """Parça izin verilen boyutu ya da dosyanın bildirilen boyutunu aşıyor."""
+
+
+class ChunkInProgress(UploadError):
+    """Bu oturuma şu anda başka bir istek parça yazıyor."""
+
+
+# Oturum kimliği -> (hash'lenen bayt, BLAKE2b durumu)
+_running_hashes: Dict[str, Tuple[int, "hashlib._Hash"]] = {}
+_running_hashes_lock = threading.Lock()
+# Şu anda parça yazılan oturumlar
+_active_writers: Set[str] = set()
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+
+def _expiry() -> datetime.datetime:
+    return _now() + datetime.timedelta(seconds=settings.upload_session_ttl_seconds)
+
+
+def part_path_for(upload_directory: str, upload_id: str) -> str:
+    return os.path.join(upload_directory, storage.TMP_DIRECTORY_NAME, f"upload-{upload_id}.part")
+
+
+def create_session(
+        db: Session,
+        owner_id: int,
+        filename: str,
+        content_type: str,
+        size: int,
+        upload_directory: str
+) -> models.UploadSessionDB:
+    """Yeni bir yükleme oturumu ve boş parça dosyası oluşturur (commit eder)."""
+    purge_expired(db)
+
+    upload_id = secrets.token_urlsafe(24)
+    part_path = part_path_for(upload_directory, upload_id)
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+    open(part_path, "wb").close()
+
+    session = models.UploadSessionDB(
+        id=upload_id,
+        owner_id=owner_id,
+        filename=filename,
+        content_type=content_type,
+        size=size,
+        received=0,
+        part_path=part_path,
+        expires_at=_expiry()
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    with _running_hashes_lock:
+        _running_hashes[upload_id] = (0, storage.new_hasher())
+    return session
+
+
+class ChunkWriter:
+    """
+    Tek bir parçayı oturumun dosyasına, onaylanan son bayttan itibaren yazar.
+    Önceki kopuk bir denemeden kalan onaylanmamış baytlar önce kesilir.
+    'commit' çağrılmadan kapanırsa ('abort') dosya eski boyutuna döner.
+    """
+
+    def __init__(self, db: Session, upload_id: str, part_path: str, offset: int, size: int):
+        self.upload_id = upload_id
+        self.offset = offset
+        self.size = size
+        self.written = 0
+        self.checksum = hashlib.sha256()
+        with _running_hashes_lock:
+            if upload_id in _active_writers:
+                raise ChunkInProgress("Bu yüklemeye şu anda başka bir parça yazılıyor.")
+            _active_writers.add(upload_id)
+            running = _running_hashes.get(upload_id)
+        self.file = None
+        try:
+            self.file = open(part_path, "r+b")
+            if fcntl is not None:
+                try:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise ChunkInProgress("Bu yüklemeye şu anda başka bir parça yazılıyor.")
+            # Kilit alınmadan önce başka bir parça onaylanmış olabilir; onaylı
+            # baytlar kesilmeden önce offset tekrar kontrol edilir
+            current = db.get(models.UploadSessionDB, upload_id, populate_existing=True)
+            if current is None or current.received != offset:
+                raise OffsetConflict(current.received if current is not None else offset)
+        except BaseException:
+            self._release()
+            raise
+        # Bellekteki hash bu offset'e kadar ilerlemişse kopyasıyla devam et
+        self.hasher = running[1].copy() if running is not None and running[0] == offset else None
+        self.file.truncate(offset)
+        self.file.seek(offset)
+
+    def _release(self) -> None:
+        """Dosyayı kapatır (dosya kilidi de bırakılır) ve oturumu serbest bırakır."""
+        try:
+            if self.file is not None and not self.file.closed:
+                self.file.close()
+        finally:
+            with _running_hashes_lock:
+                _active_writers.discard(self.upload_id)
+
+    def write(self, data: bytes) -> None:
+        if self.offset + self.written + len(data) > self.size:
+            raise ChunkTooLarge("Parça, dosyanın bildirilen boyutunu aşıyor.")
+        if self.written + len(data) > settings.upload_chunk_max_bytes:
+            raise ChunkTooLarge(f"Parça en fazla {settings.upload_chunk_max_bytes} bayt olabilir.")
+        self.file.write(data)
+        self.checksum.update(data)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        self.written += len(data)
+
+    def commit(self, db: Session, expected_sha256: str) -> int:
+        """
+        Özeti doğrular ve yeni offset'i kaydeder. Oturum bu arada değiştiyse
+        (örn: silindi) koşullu güncelleme satır bulamaz; yazılan baytlar
+        geri alınır ve OffsetConflict fırlatılır.
+        """
+        if self.checksum.hexdigest() != expected_sha256.strip().lower():
+            raise ChecksumMismatch("Parçanın SHA-256 özeti uyuşmuyor.")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        new_offset = self.offset + self.written
+        updated = db.query(models.UploadSessionDB).filter(
+            models.UploadSessionDB.id == self.upload_id,
+            models.UploadSessionDB.received == self.offset
+        ).update(
+            {models.UploadSessionDB.received: new_offset, models.UploadSessionDB.expires_at: _expiry()},
+            synchronize_session=False
+        )
+        db.commit()
+        if not updated:
+            current = db.get(models.UploadSessionDB, self.upload_id, populate_existing=True)
+            self.abort()
+            raise OffsetConflict(current.received if current is not None else self.offset)
+
+        # Hash, sıradaki yazıcı oturumu sahiplenmeden önce güncellenir
+        with _running_hashes_lock:
+            if self.hasher is not None:
+                _running_hashes[self.upload_id] = (new_offset, self.hasher)
+            else:
+                _running_hashes.pop(self.upload_id, None)
+        self._release()
+        return new_offset
+
+    def abort(self) -> None:
+        """Onaylanmamış baytları atar."""
+        if self.file is None or self.file.closed:
+            return
+        try:
+            self.file.truncate(self.offset)
+        finally:
+            self._release()
+
+
+def stage_session(session: models.UploadSessionDB) -> storage.StagedUpload:
+    """Tüm parçaları alınmış oturumu depoya alınmaya hazır hale getirir."""
+    with _running_hashes_lock:
+        running = _running_hashes.get(session.id)
+    if running is not None and running[0] == session.size:
+        content_hash = running[1].hexdigest()
+    else:
+        hasher = storage.new_hasher()
+        with open(session.part_path, "rb") as part:
+            for block in iter(lambda: part.read(storage.COPY_BUFFER_SIZE), b""):
+                hasher.update(block)
+        content_hash = hasher.hexdigest()
+    return storage.StagedUpload(content_hash=content_hash, tmp_path=session.part_path, size=session.size)
+
+
+def is_expired(session: models.UploadSessionDB) -> bool:
+    return session.expires_at < _now()
+
+
+def forget(upload_id: str) -> None:
+    with _running_hashes_lock:
+        _running_hashes.pop(upload_id, None)
+
+
+def delete_session(db: Session, session: models.UploadSessionDB) -> None:
+    """Oturumu ve (tamamlanmadıysa) parça dosyasını siler. Commit etmez."""
+    if session.file_id is None:
+        storage.remove_paths([session.part_path])
+    forget(session.id)
+    db.delete(session)
+
+
+def purge_expired(db: Session) -> int:
+    """Süresi dolan oturumları temizler (commit eder). Silinen oturum sayısını döndürür."""
+    expired = db.query(models.UploadSessionDB).filter(models.UploadSessionDB.expires_at < _now()).all()
+    for session in expired:
+        delete_session(db, session)
+    if expired:
+        db.commit()
+    return len(expired)
+
+
+def get_session(db: Session, upload_id: str) -> Optional[models.UploadSessionDB]:
+    return db.get(models.UploadSessionDB, upload_id)
@@ -0,0 +1,62 @@
+# database/backfill_blobs.py
+"""
+İçerik adresli depodan (blobs) önceki bir veritabanını günceller.
+
+1. 'files' tablosunda 'content_hash' sütunu yoksa ekler (create_all mevcut
+   tabloları değiştirmez; yeni tablolar uygulama açılışında oluşturulur).
+2. 'column_profiles' tablosunda (content_hash, position) tekilliği yoksa
+   yinelenen satırları silip ekler.
+3. content_hash'i boş dosyaları hash'leyip 'blobs/' altına taşır ve bağlar.
+
+Diskte bulunamayan dosyalar bağlanamaz; bunlar için API 409 döndürür ve
+kullanıcının dosyayı yeniden yüklemesi gerekir.
+
+Kullanım (backend klasöründen, uygulama durdurulmuşken bir kez):
+    python -m database.backfill_blobs
+"""
+from sqlalchemy import inspect, text
+
+from core import storage
+from database import connection, models
+from routers.files import UPLOAD_DIRECTORY
+
+
+def add_missing_columns(engine) -> None:
+    columns = {column["name"] for column in inspect(engine).get_columns("files")}
+    if "content_hash" not in columns:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE files ADD COLUMN content_hash VARCHAR"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_files_content_hash ON files (content_hash)"))
+
+
+def add_missing_constraints(engine) -> None:
+    unique = {tuple(c["column_names"]) for c in inspect(engine).get_unique_constraints("column_profiles")}
+    indexes = {tuple(i["column_names"]) for i in inspect(engine).get_indexes("column_profiles") if i["unique"]}
+    if ("content_hash", "position") in unique | indexes:
+        return
+    with engine.begin() as conn:
+        # Eşzamanlı profil çıkarma yüzünden iki kez yazılmış profillerden ilki kalır
+        conn.execute(text(
+            "DELETE FROM column_profiles WHERE id NOT IN "
+            "(SELECT MIN(id) FROM column_profiles GROUP BY content_hash, position)"
+        ))
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_column_profiles_content_hash_position "
+            "ON column_profiles (content_hash, position)"
+        ))
+
+
+def main():
+    models.Base.metadata.create_all(bind=connection.engine)
+    add_missing_columns(connection.engine)
+    add_missing_constraints(connection.engine)
+    db = connection.Sessionlocal()
+    try:
+        result = storage.backfill_legacy_files(db, UPLOAD_DIRECTORY)
+    finally:
+        db.close()
+    print(f"Bağlanan dosya: {result['linked']}, diskte bulunamayan: {result['missing']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,66 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from core.config import settings
 
-engine = create_engine(settings.database_url)
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(database_url: str) -> dict:
+    """Veritabanı türüne göre havuz ve bağlantı ayarları."""
+    url = make_url(database_url)
+    options = {}
+    # Bellek içi SQLite tek bağlantıyla çalışır; havuz ayarları uygulanmaz
+    if not _is_memory_sqlite(url):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+
+    timeout_ms = settings.db_statement_timeout_ms
+    if timeout_ms > 0:
+        backend = url.get_backend_name()
+        if backend == "sqlite":
+            # Kilitli veritabanında hata vermeden önce beklenecek süre (saniye)
+            options["connect_args"] = {"timeout": timeout_ms / 1000}
+        elif backend == "postgresql":
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+
+
+def apply_sqlite_pragmas(engine) -> None:
+    """Her yeni SQLite bağlantısında PRAGMA ayarlarını uygular."""
+    if engine.url.get_backend_name() != "sqlite":
+        return
+    in_memory = _is_memory_sqlite(engine.url)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if not in_memory:
+                cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+                cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+            cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+            # Negatif değer: sayfa sayısı yerine KiB
+            cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+        finally:
+            cursor.close()
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+apply_sqlite_pragmas(engine)
 Sessionlocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
 def get_db():
     db = Sessionlocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship, declarative_base
 import datetime
 
@@ -16,14 +16,150 @@ class UserDB(Base):
     files = relationship("FileDB", back_populates="owner")
 
 
+class BlobDB(Base):
+    """
+    İçerik hash'i ile adreslenen, diskte tek kopya tutulan dosya içeriği.
+    Aynı içeriği yükleyen tüm FileDB satırları bu kaydı paylaşır.
+    """
+    __tablename__ = "blobs"
+    content_hash = Column(String, primary_key=True)  # BLAKE2b (hex)
+    size = Column(Integer, nullable=False)  # Bayt
+    blob_path = Column(String, nullable=False)  # İçeriğin diskteki yolu
+    sidecar_path = Column(String, nullable=True)  # Tiplenmiş Parquet kopyasının yolu
+    row_count = Column(Integer, nullable=True)  # Profil çıkarıldığında doldurulur
+    correlations = Column(JSON, nullable=True)  # Sayısal sütun çiftleri: [{"x", "y", "r"}]
+    ref_count = Column(Integer, nullable=False, default=0)  # Bu içeriğe bağlı FileDB sayısı
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    files = relationship("FileDB", back_populates="blob")
+
+    # İlişki: İçeriğin sütun profili (sütun sırasına göre)
+    column_profiles = relationship(
+        "ColumnProfileDB",
+        back_populates="blob",
+        order_by="ColumnProfileDB.position",
+        cascade="all, delete-orphan"
+    )
+
+    # İlişki: Bu içerik için saklanan AI önerileri (içerikle birlikte silinir)
+    ai_recommendations = relationship(
+        "AIRecommendationDB",
+        back_populates="blob",
+        cascade="all, delete-orphan"
+    )
+
+
 class FileDB(Base):
     """Yüklenen dosyaların bilgilerini (metadata) tutan model."""
     __tablename__ = "files"
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, index=True)
     upload_date = Column(DateTime, default=datetime.datetime.utcnow)
-    file_path = Column(String)  # Dosyanın sunucuda saklandığı yol
+    file_path = Column(String)  # Dosyanın sunucuda saklandığı yol (içerik deposundaki blob)
+
+    # İlişki: Dosyanın içeriği (aynı içerikli dosyalar paylaşır)
+    content_hash = Column(String, ForeignKey("blobs.content_hash"), index=True)
+    blob = relationship("BlobDB", back_populates="files")
 
     # İlişki: Bu dosyayı yükleyen kullanıcı
     owner_id = Column(Integer, ForeignKey("users.id"))
-    owner = relationship("UserDB", back_populates="files")
\ No newline at end of file
+    owner = relationship("UserDB", back_populates="files")
+
+
+class UploadSessionDB(Base):
+    """
+    Parça parça (devam ettirilebilir) yüklenen bir dosyanın durumu. Parçalar
+    'part_path' dosyasına sırayla eklenir; 'received' o ana kadar onaylanan
+    bayt sayısıdır ve istemci kopan bir yüklemeye buradan devam eder.
+    """
+    __tablename__ = "upload_sessions"
+    id = Column(String, primary_key=True)  # Rastgele, tahmin edilemez kimlik
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)  # Beklenen toplam bayt
+    received = Column(Integer, nullable=False, default=0)  # Onaylanan bayt
+    part_path = Column(String, nullable=False)  # Parçaların eklendiği geçici dosya
+    file_id = Column(Integer, ForeignKey("files.id", ondelete="SET NULL"), nullable=True)  # Tamamlanınca
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)  # Her parçada uzatılır
+
+
+class JobDB(Base):
+    """
+    Arka planda çalışan bir iş (ör. yüklenen dosyanın ayrıştırılması).
+    Durumlar: queued -> running -> succeeded | failed. Başarısız deneme
+    'max_attempts'a ulaşmadıysa iş 'run_after' zamanında tekrar sıraya girer.
+    """
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # İşleyici adı: ingest, analyze
+    status = Column(String, nullable=False, default="queued", index=True)
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)  # Son denemenin hatası
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=True)
+    file_id = Column(Integer, ForeignKey("files.id", ondelete="SET NULL"), index=True, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    run_after = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ColumnProfileDB(Base):
+    """Bir dosya içeriğindeki tek bir sütunun bir kez hesaplanıp saklanan istatistikleri."""
+    __tablename__ = "column_profiles"
+    __table_args__ = (
+        # Aynı içeriğin profili aynı anda iki kez kaydedilemez (bkz. profiling.store_profile)
+        UniqueConstraint("content_hash", "position"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, ForeignKey("blobs.content_hash"), index=True, nullable=False)
+    position = Column(Integer, nullable=False)  # Dosyadaki sütun sırası
+    name = Column(String, nullable=False)
+    dtype = Column(String, nullable=False)  # integer, float, boolean, datetime, string, empty
+    semantic_type = Column(String, nullable=False)  # numeric, datetime, categorical, text, boolean, empty
+    count = Column(Integer, nullable=False)  # Boş olmayan değer sayısı
+    null_count = Column(Integer, nullable=False)
+    distinct_count = Column(Integer, nullable=False)  # Yaklaşık
+    is_monotonic = Column(Boolean, nullable=True)  # Sayı/tarih değerleri artan sırada mı?
+    min_value = Column(JSON, nullable=True)
+    max_value = Column(JSON, nullable=True)
+    sample = Column(JSON, nullable=True)  # Küçük rastgele örnek
+
+    blob = relationship("BlobDB", back_populates="column_profiles")
+
+
+class AIRecommendationDB(Base):
+    """
+    Bir içerik için LLM'den alınmış grafik önerisi. Anahtar; içerik hash'i,
+    sütun şeması, model ve prompt şablonunun sürümüdür. Bunlardan biri
+    değişirse yeni bir kayıt oluşur; eskisi süresi dolunca temizlenir.
+    """
+    __tablename__ = "ai_recommendations"
+    __table_args__ = (
+        UniqueConstraint("content_hash", "kind", "schema_hash", "model", "prompt_version"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, ForeignKey("blobs.content_hash"), index=True, nullable=False)
+    kind = Column(String, nullable=False)  # Endpoint türü: analyze, recommend
+    schema_hash = Column(String, nullable=False)  # Sütun adları ve tiplerinden
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    response = Column(JSON, nullable=False)  # Endpoint'in döndürdüğü cevap
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    blob = relationship("BlobDB", back_populates="ai_recommendations")
+
+
+class ChatMessageDB(Base):
+    """Bir kullanıcının AI sohbet geçmişindeki tek bir mesaj."""
+    __tablename__ = "chat_messages"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    role = Column(String, nullable=False)  # user, assistant
+    content = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
@@ -2,7 +2,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from database import models, connection
-from routers import users, auth, files, visualize,ai
+from routers import users, auth, files, visualize, ai, jobs, metrics
+from core.config import settings
+from core.compression import CompressionMiddleware
+from core.jobs import job_queue
+from core.parsing import parse_pool
+from core import llm
 
 # Veritabanı tablolarını oluştur (eğer yoksa)
 # Artık UserDB ve FileDB tablolarını da oluşturacak
@@ -25,6 +30,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],         # Tüm metotlara (GET, POST, vb.) "İZİN VER"
     allow_headers=["*"],         # Tüm başlıklara (Authorization dahil) "İZİN VER"
+    # ETag (koşullu istekler için) ve Arrow IPC cevabındaki sayfa bilgisi tarayıcıda okunabilsin
+    expose_headers=["ETag", "X-Total-Rows", "X-Offset", "X-Next-Cursor"],
+)
+# JSON ve Arrow cevaplarını gzip/zstd ile sıkıştır (SSE akışları hariç)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.gzip_level,
+    zstd_level=settings.zstd_level,
 )
 # YENİ EKLENEN ROUTER'LAR
 app.include_router(
@@ -53,6 +67,40 @@ app.include_router(
     prefix="/visualize",
     tags=["Visualize"]
 )
+app.include_router(
+    jobs.router,
+    prefix="/jobs",
+    tags=["Jobs"]
+)
+app.include_router(
+    metrics.router,
+    prefix="/metrics",
+    tags=["Metrics"]
+)
+
+
+@app.on_event("startup")
+async def start_job_queue():
+    # Yükleme sonrası işleri (ayrıştırma, AI ön analizi) arka planda çalıştır
+    await job_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await job_queue.stop()
+
+
+@app.on_event("shutdown")
+def shutdown_parse_pool():
+    # Ayrıştırma süreçlerini uygulamayla birlikte kapat
+    parse_pool.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_llm_provider():
+    # LLM sağlayıcısının HTTP bağlantı havuzunu kapat
+    if llm.provider is not None:
+        await llm.provider.aclose()
 
 
 @app.get("/")
@@ -1,66 +1,129 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from database import connection, models
 from core.security import get_current_user
 from core.config import settings
+from core import columnar, http_cache, llm, profiling, prompts, recommendation_cache, recommender
+from core.executors import run_blocking
+from core.jobs import job_queue
+from core.chat_history import chat_history, trim_to_budget
+from core.singleflight import singleflight
+from routers.files import get_owned_file, get_readable_file
 import pandas as pd
-from openai import OpenAI
+import contextlib
 import json
 import re
-
-# --------------------------------------------------------------------------
-# OpenAI İstemcisini (Client) API Anahtarı ile Başlat
-# API anahtarı .env dosyasından -> config.py -> settings objesi aracılığıyla okunur
-# --------------------------------------------------------------------------
-try:
-    client = OpenAI(api_key=settings.openai_api_key)
-except Exception as e:
-    print(f"OpenAI istemcisi başlatılamadı: {e}")
-    client = None
+from dataclasses import dataclass
 
 router = APIRouter()
 
-# Chat history için basit bir storage (production'da Redis veya DB kullanılmalı)
-user_chat_history: dict[int, list[dict]] = {}
+# Kullanılan modeller ve prompt şablonlarının sürümleri. Bir prompt
+# değiştirildiğinde sürümünü artırın; önbellekteki eski cevaplar kullanılmaz.
+RECOMMEND_MODEL = "gpt-3.5-turbo"
+RECOMMEND_PROMPT_VERSION = "recommend-v2"
+ANALYZE_MODEL = "gpt-4o-mini"
+ANALYZE_PROMPT_VERSION = "analyze-v2"
+CHAT_MODEL = "gpt-4o-mini"
+# Sohbet cevabı için en fazla token
+CHAT_MAX_TOKENS = 500
+
+# Sohbet geçmişi 'core.chat_history' deposunda tutulur (varsayılan: veritabanı)
 
 
-def get_file_dataframe(file_id: int, db: Session, current_user: models.UserDB) -> pd.DataFrame:
+def get_file_profile(
+        file_id: int,
+        db: Session,
+        current_user: models.UserDB
+) -> tuple[models.FileDB, list[models.ColumnProfileDB] | None]:
     """
-    (Tekrarı önlemek için) Veritabanından dosyayı bulan
-    ve pandas DataFrame'ine yükleyen yardımcı fonksiyon.
+    (Tekrarı önlemek için) Dosyayı bulan, sahipliğini doğrulayan ve
+    kayıtlı sütun profilini döndüren yardımcı fonksiyon. Veri okunmaz;
+    profil henüz çıkarılmamışsa profil yerine None döner.
     """
+    db_file = get_readable_file(file_id, db, current_user)
+    if db_file.blob.row_count is None:
+        return db_file, None
+    return db_file, db_file.blob.column_profiles
 
-    # 1. Dosyayı veritabanında bul
-    db_file = db.query(models.FileDB).filter(models.FileDB.id == file_id).first()
-    if not db_file:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dosya bulunamadı.")
 
-    # 2. Güvenlik: Dosya bu kullanıcıya mı ait?
-    if db_file.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu dosyaya erişim yetkiniz yok.")
+async def load_file_profile(
+        file_id: int,
+        db: Session,
+        current_user: models.UserDB
+) -> tuple[models.FileDB, list[models.ColumnProfileDB]]:
+    """
+    Dosyayı ve sütun profilini döndürür. Profil yoksa (örn: yükleme anında
+    ayrıştırılamadıysa) dosya bir kez okunup profili kaydedilir; aynı içerik
+    için aynı anda gelen istekler (örn: dosya açılırken analiz ve sohbet) aynı
+    okumayı bekler.
+    """
+    db_file, column_profiles = await run_blocking(get_file_profile, file_id, db, current_user)
+    if column_profiles is not None:
+        return db_file, column_profiles
 
-    # 3. Dosyayı diskten oku (Pandas kullanarak)
+    content_hash = db_file.content_hash
     try:
-        file_path = db_file.file_path
-        if db_file.filename.endswith(".csv"):
-            df = pd.read_csv(file_path)
-        elif db_file.filename.endswith(".xlsx"):
-            df = pd.read_excel(file_path)
-        else:
-            raise HTTPException(status_code=400, detail="Desteklenmeyen dosya formatı.")
+        await singleflight.do(
+            ("profile", content_hash),
+            lambda: run_blocking(profiling.build_profile, content_hash)
+        )
+    except columnar.UnsupportedFileFormat as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dosya okunurken hata oluştu: {e}")
 
-        # NaN (boş hücre) sorununu burada da çözelim
-        df_cleaned = df.astype(object).where(pd.notnull(df), None)
-        return df_cleaned
+    # Profil başka bir oturumda yazıldı; bu oturumdaki kopyayı yenile
+    await run_blocking(db.refresh, db_file.blob)
+    return db_file, await run_blocking(lambda: db_file.blob.column_profiles)
 
+
+def get_sample_rows(blob: models.BlobDB, db: Session, n: int) -> pd.DataFrame:
+    """İçeriğin ilk 'n' satırını okur (sadece ilgili satır grubu diskten okunur)."""
+    try:
+        df, _ = columnar.read_window(blob, db, 0, n)
+    except HTTPException:
+        raise
     except Exception as e:
-        # Hata fırlatmak yerine, hatayı tetikleyene döndür
         raise HTTPException(status_code=500, detail=f"Dosya okunurken hata oluştu: {e}")
+    # NaN (boş hücre) değerlerini None'a çevir
+    return df.astype(object).where(pd.notnull(df), None)
+
+
+def recommendation_key(
+        db_file: models.FileDB | models.BlobDB,
+        column_profiles: list[models.ColumnProfileDB],
+        kind: str,
+        model: str,
+        prompt_version: str
+) -> recommendation_cache.RecommendationKey:
+    """Bu içerik, şema, model ve prompt sürümü için önbellek anahtarı."""
+    return recommendation_cache.RecommendationKey(
+        content_hash=db_file.content_hash,
+        kind=kind,
+        schema_hash=recommendation_cache.schema_fingerprint(column_profiles),
+        # Aynı model adı farklı sağlayıcılarda farklı cevaplar verir
+        model=f"{llm.provider.name}:{llm.provider.model_for(model)}" if llm.provider else model,
+        prompt_version=prompt_version
+    )
+
+
+def with_etag(request: Request, response: Response, result: dict):
+    """
+    Öneri sonucuna içerikten üretilen ETag ekler; istemcideki kopya aynıysa
+    304 döner (sonuç önbellekten geldiğinde gövde tekrar gönderilmez).
+    """
+    etag = http_cache.body_etag(result)
+    return http_cache.conditional(request, response, etag) or result
 
 
 @router.get("/recommend_chart/{file_id}")
 async def recommend_chart(
         file_id: int,
+        request: Request,
+        response: Response,
         db: Session = Depends(connection.get_db),
         current_user: models.UserDB = Depends(get_current_user)
 ):
@@ -69,21 +132,32 @@ async def recommend_chart(
     önermek için yapay zekaya (ChatBot) sorar.
     """
 
-    if client is None:
-        raise HTTPException(status_code=500, detail="OpenAI API anahtarı yapılandırılmamış veya istemci başlatılamadı.")
+    # 1. Dosyanın kayıtlı profilini al; aynı içerik için daha önce öneri
+    # alındıysa LLM'e gitmeden onu döndür (DB işleri event loop dışında).
+    # HTTP hataları (404, 403, işleniyor 409 vb.) olduğu gibi istemciye gider.
+    db_file, column_profiles = await load_file_profile(file_id, db, current_user)
+    cache_key = recommendation_key(
+        db_file, column_profiles, "recommend", RECOMMEND_MODEL, RECOMMEND_PROMPT_VERSION
+    )
+    cached = await run_blocking(recommendation_cache.get, db, cache_key)
+    if cached is not None:
+        return with_etag(request, response, cached)
 
-    # 1. Dosya verisini Pandas DataFrame olarak al
-    try:
-        df = get_file_dataframe(file_id, db, current_user)
-    except HTTPException as e:
-        return e  # Hata oluştuysa (örn: 404, 403) o hatayı döndür
+    if llm.provider is None:
+        raise HTTPException(status_code=500, detail="LLM sağlayıcısı yapılandırılmamış veya başlatılamadı.")
 
-    # 2. Yapay Zekaya sormak için "Prompt" (İstem) hazırla
-    # Tüm veriyi göndermeyiz, sadece veri hakkında özet bilgi (metadata) göndeririz.
+    first_rows = await run_blocking(get_sample_rows, db_file.blob, db, 5)
 
-    column_names = list(df.columns)
-    data_types = df.dtypes.to_string()  # Sütunların veri tipleri (örn: int64, object, float64)
-    first_5_rows = df.head().to_string()  # Verinin ilk 5 satırı (ki AI formatı anlasın)
+    # 2. Yapay Zekaya sormak için "Prompt" (İstem) hazırla
+    # Tüm veriyi göndermeyiz; profilden token bütçesine sığan bir özet göndeririz
+    # (geniş tablolarda sütun seçilir, uzun hücreler kısaltılır).
+    summary = prompts.build_dataset_summary(
+        column_profiles,
+        settings.prompt_token_budget,
+        row_count=db_file.blob.row_count,
+        correlations=db_file.blob.correlations,
+        sample_rows=first_rows
+    )
 
     prompt = f"""
     Sen bir veri analisti asistanısın. Sana bir veri setinin özetini vereceğim. 
@@ -94,20 +168,15 @@ async def recommend_chart(
     Cevabın kısa ve net olsun.
 
     İşte veri özeti:
-    Sütun İsimleri: {column_names}
-    Sütun Veri Tipleri:
-    {data_types}
-
-    Verinin İlk 5 Satırı:
-    {first_5_rows}
+    {summary.text}
 
     Bu verilere dayanarak en uygun grafik önerilerin (sütun bilgileriyle birlikte) nelerdir?
     """
 
-    # 3. OpenAI ChatBot'una isteği gönder
+    # 3. LLM'e isteği gönder
     try:
-        completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # Hızlı ve ucuz model
+        recommendation = await llm.provider.complete(
+            model=RECOMMEND_MODEL,  # Hızlı ve ucuz model
             messages=[
                 {"role": "system",
                  "content": "You are a helpful data analyst assisting a user with chart recommendations."},
@@ -115,78 +184,51 @@ async def recommend_chart(
             ],
             temperature=0.2  # Yaratıcılığı düşük tut, net cevap versin
         )
-
-        # API'den gelen cevabı al
-        recommendation = completion.choices[0].message.content.strip()
-
-        return {"recommendation": recommendation}
+        recommendation = recommendation.strip()
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Yapay zeka ile konuşurken hata oluştu: {e}")
 
+    result = {"recommendation": recommendation, "promptTokens": summary.tokens}
+    await run_blocking(recommendation_cache.put, db, cache_key, result)
+    return with_etag(request, response, result)
 
-@router.get("/analyze_file/{file_id}")
-async def analyze_file_for_chart(
-        file_id: int,
-        db: Session = Depends(connection.get_db),
-        current_user: models.UserDB = Depends(get_current_user)
-):
+
+async def ask_llm_for_chart(
+        column_profiles: list[models.ColumnProfileDB],
+        cache_key: recommendation_cache.RecommendationKey
+) -> dict:
     """
-    Dosyayı analiz eder ve en uygun grafik tipi ile X,Y eksenlerini önerir.
-    Yapılandırılmış JSON response döner.
+    Veri seti özetiyle LLM'den grafik önerisi ister, cevabı doğrular ve
+    önbelleğe yazar. Aynı anahtar için aynı anda gelen istekler tarafından
+    paylaşıldığından (single-flight) isteğin veritabanı oturumunu kullanmaz;
+    gerekirse kendi oturumunu açar.
     """
-    if client is None:
-        raise HTTPException(status_code=500, detail="OpenAI API anahtarı yapılandırılmamış veya istemci başlatılamadı.")
-
-    # 1. Dosya verisini Pandas DataFrame olarak al
+    # İlk 10 satır sadece önbellekte cevap yoksa okunur
+    db = connection.Sessionlocal()
     try:
-        df = get_file_dataframe(file_id, db, current_user)
-    except HTTPException as e:
-        raise e
-
-    # 2. Veri hakkında bilgi topla
-    column_names = list(df.columns)
-    
-    # Sütun tiplerini analiz et
-    numeric_columns = []
-    date_columns = []
-    categorical_columns = []
-    
-    for col in column_names:
-        col_data = df[col].dropna()
-        if len(col_data) == 0:
-            continue
-            
-        dtype = str(df[col].dtype)
-        
-        # Numeric kontrol
-        if dtype in ['int64', 'float64', 'int32', 'float32']:
-            numeric_columns.append(col)
-        # Date kontrol (basit bir yaklaşım)
-        elif dtype == 'object':
-            sample_val = str(col_data.iloc[0]) if len(col_data) > 0 else ""
-            # Basit date kontrolü
-            if any(keyword in col.lower() for keyword in ['date', 'tarih', 'time', 'zaman', 'year', 'yıl']):
-                date_columns.append(col)
-            else:
-                categorical_columns.append(col)
-        else:
-            categorical_columns.append(col)
-    
-    # İlk birkaç satırı örnek olarak al
-    sample_data = df.head(10).to_dict(orient='records')
-    
-    # 3. OpenAI'ye özel prompt hazırla - JSON formatında cevap iste
+        blob = await run_blocking(db.get, models.BlobDB, cache_key.content_hash)
+        first_rows = await run_blocking(get_sample_rows, blob, db, 10)
+        row_count, correlations = blob.row_count, blob.correlations
+    finally:
+        await run_blocking(db.close)
+
+    # Profilden token bütçesine sığan veri seti özeti (sütun tipleri profilde
+    # bir kez hesaplandı; geniş tablolarda sütun seçilir, uzun hücreler kısaltılır)
+    column_names = [column.name for column in column_profiles]
+    summary = prompts.build_dataset_summary(
+        column_profiles,
+        settings.prompt_token_budget,
+        row_count=row_count,
+        correlations=correlations,
+        sample_rows=first_rows
+    )
+
+    # LLM'e özel prompt hazırla - JSON formatında cevap iste
     prompt = f"""Sen bir veri analisti uzmanısın. Bir veri setini analiz edip en uygun grafik tipini ve eksen seçimlerini önermelisin.
 
-VERİ SETİ BİLGİLERİ:
-- Sütun İsimleri: {column_names}
-- Numeric Sütunlar: {numeric_columns}
-- Kategorik Sütunlar: {categorical_columns}
-- Tarih/Zaman Sütunları: {date_columns}
-
-Örnek Veri (İlk 10 satır):
-{json.dumps(sample_data, default=str, ensure_ascii=False)}
+VERİ SETİ ÖZETİ (sütun: anlamsal tip/veri tipi, boş ve farklı değer sayısı, min/max, örnekler):
+{summary.text}
 
 GÖREVİN:
 Bu veri seti için EN UYGUN grafik tipini ve X, Y eksenlerini belirle.
@@ -218,129 +260,231 @@ KURALLAR:
 
 SADECE JSON CEVAP VER, başka bir şey yazma."""
 
+    response_text = await llm.provider.complete(
+        model=ANALYZE_MODEL,  # Daha iyi JSON parsing için gpt-4o-mini kullan
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a data visualization expert. Always respond with valid JSON only, no other text."
+            },
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.1,  # Çok düşük tut, tutarlı cevaplar için
+        json_mode=True  # JSON format zorunlu
+    )
+    response_text = response_text.strip()
+
+    # JSON parse et
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",  # Daha iyi JSON parsing için gpt-4o-mini kullan
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a data visualization expert. Always respond with valid JSON only, no other text."
-                },
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,  # Çok düşük tut, tutarlı cevaplar için
-            response_format={"type": "json_object"}  # JSON format zorunlu
-        )
+        result = json.loads(response_text)
+    except json.JSONDecodeError:
+        # JSON parse edilemezse, içinden JSON çıkarmaya çalış
+        json_match = re.search(r'\{[^{}]*"chartType"[^{}]*\}', response_text, re.DOTALL)
+        if json_match:
+            result = json.loads(json_match.group())
+        else:
+            raise ValueError("JSON parse edilemedi")
+
+    # Doğrulama ve normalizasyon
+    chart_type = result.get("chartType", "").lower()
+    x_column = result.get("xColumn", "")
+    y_column = result.get("yColumn", "")
+
+    # Geçerli chart type kontrolü
+    valid_chart_types = ["bar", "line", "pie", "scatter", "area", "table"]
+    if chart_type not in valid_chart_types:
+        chart_type = "bar"  # Varsayılan
+
+    # Sütun isimlerini doğrula
+    if x_column not in column_names:
+        x_column = column_names[0] if column_names else ""
+    if y_column not in column_names:
+        y_column = column_names[1] if len(column_names) > 1 else (column_names[0] if column_names else "")
+
+    analysis = {
+        "chartType": chart_type,
+        "xColumn": x_column,
+        "yColumn": y_column,
+        "reason": result.get("reason", "AI analizi sonucu önerildi"),
+        "source": "llm",
+        "promptTokens": summary.tokens
+    }
+
+    # Sadece başarılı cevaplar saklanır; varsayılan (hata) cevapları saklanmaz
+    db = connection.Sessionlocal()
+    try:
+        await run_blocking(recommendation_cache.put, db, cache_key, analysis)
+    finally:
+        await run_blocking(db.close)
+    return analysis
 
-        # API'den gelen cevabı al ve parse et
-        response_text = completion.choices[0].message.content.strip()
-        
-        # JSON parse et
-        try:
-            result = json.loads(response_text)
-        except json.JSONDecodeError:
-            # JSON parse edilemezse, içinden JSON çıkarmaya çalış
-            json_match = re.search(r'\{[^{}]*"chartType"[^{}]*\}', response_text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-            else:
-                raise ValueError("JSON parse edilemedi")
-
-        # Doğrulama ve normalizasyon
-        chart_type = result.get("chartType", "").lower()
-        x_column = result.get("xColumn", "")
-        y_column = result.get("yColumn", "")
-        
-        # Geçerli chart type kontrolü
-        valid_chart_types = ["bar", "line", "pie", "scatter", "area", "table"]
-        if chart_type not in valid_chart_types:
-            chart_type = "bar"  # Varsayılan
-        
-        # Sütun isimlerini doğrula
-        if x_column not in column_names:
-            x_column = column_names[0] if column_names else ""
-        if y_column not in column_names:
-            y_column = column_names[1] if len(column_names) > 1 else (column_names[0] if column_names else "")
-        
-        return {
-            "chartType": chart_type,
-            "xColumn": x_column,
-            "yColumn": y_column,
-            "reason": result.get("reason", "AI analizi sonucu önerildi")
-        }
 
-    except Exception as e:
-        # OpenAI API hatalarını özel olarak yakala
-        error_str = str(e)
-        error_code = None
-        
-        # Hata kodunu mesajdan çıkarmaya çalış
-        if '429' in error_str or 'insufficient_quota' in error_str.lower() or 'quota' in error_str.lower():
-            error_code = 429
-        elif '401' in error_str or 'unauthorized' in error_str.lower() or 'invalid' in error_str.lower():
-            error_code = 401
-        elif '500' in error_str or '503' in error_str:
-            error_code = 500
-        
-        # Status code attribute varsa onu kullan
-        if hasattr(e, 'status_code'):
-            error_code = getattr(e, 'status_code', error_code)
-        
-        error_message = error_str
-        
-        # Hata mesajını daha anlaşılır hale getir
-        if error_code == 429:
-            reason = "OpenAI API kotası aşıldı. Lütfen OpenAI hesabınızda yeterli kredi olduğundan emin olun veya daha sonra tekrar deneyin. Varsayılan grafik ayarları kullanıldı."
-        elif error_code == 401:
-            reason = "OpenAI API anahtarı geçersiz. Lütfen API anahtarınızı kontrol edin. Varsayılan grafik ayarları kullanıldı."
-        elif error_code == 500 or error_code == 503:
-            reason = "OpenAI servisi şu anda kullanılamıyor. Lütfen daha sonra tekrar deneyin. Varsayılan grafik ayarları kullanıldı."
+@router.get("/analyze_file/{file_id}")
+async def analyze_file_for_chart(
+        file_id: int,
+        request: Request,
+        response: Response,
+        mode: str = Query("auto", pattern="^(local|llm|auto)$",
+                          description="local: sadece kurallar, llm: her zaman yapay zeka, "
+                                      "auto: kuralların güveni düşükse yapay zeka"),
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """
+    Dosyayı analiz eder ve en uygun grafik tipi ile X,Y eksenlerini önerir.
+    Yapılandırılmış JSON response döner. Öneri önce kayıtlı profilden kural
+    tabanlı olarak çıkarılır ('source': 'local'); 'auto' modunda sadece bu
+    önerinin güveni düşükse yapay zekaya sorulur ('source': 'llm').
+    """
+    _, _, analysis = await _analyze_file(file_id, mode, db, current_user)
+    # Hata durumunda dönen yedek öneri geçicidir; istemci onu saklamamalı
+    if analysis.get("error"):
+        return analysis
+    return with_etag(request, response, analysis)
+
+
+async def _analyze_file(
+        file_id: int,
+        mode: str,
+        db: Session,
+        current_user: models.UserDB
+) -> tuple[models.FileDB, list[models.ColumnProfileDB], dict]:
+    """
+    analyze_file_for_chart'ın HTTP'den bağımsız gövdesi (sohbet de kullanır).
+    (dosya, sütun profili, öneri) döndürür; sohbet profili tekrar yüklemez.
+    """
+    # 1. Dosyanın kayıtlı profilini al (senkron DB/dosya işleri event loop dışında)
+    db_file, column_profiles = await load_file_profile(file_id, db, current_user)
+
+    # 2. Kural tabanlı öneri: ağ çağrısı yok, profilden mikro saniyeler içinde
+    local = recommender.recommend(column_profiles, db_file.blob.correlations)
+    local_result = {**local.as_dict(), "source": "local"}
+    if mode == "local" or (mode == "auto" and local.confidence >= recommender.CONFIDENCE_THRESHOLD):
+        return db_file, column_profiles, local_result
+    if llm.provider is None:
+        if mode == "auto":
+            return db_file, column_profiles, local_result
+        raise HTTPException(status_code=500, detail="LLM sağlayıcısı yapılandırılmamış veya başlatılamadı.")
+
+    # 3. Aynı içerik ve şema için daha önce öneri alındıysa LLM'e gitmeden onu döndür
+    cache_key = recommendation_key(db_file, column_profiles, "analyze", ANALYZE_MODEL, ANALYZE_PROMPT_VERSION)
+    cached = await run_blocking(recommendation_cache.get, db, cache_key)
+    if cached is not None:
+        return db_file, column_profiles, cached
+
+    # 4. Aynı analiz havadaysa (örn: dosya açılırken arayüz ve sohbet aynı anda
+    # istediyse) LLM'e ikinci kez gidilmez; ilk isteğin sonucu beklenir
+    try:
+        analysis = await singleflight.do(
+            ("llm", cache_key),
+            lambda: ask_llm_for_chart(column_profiles, cache_key)
+        )
+    except (llm.LLMError, ValueError) as e:
+        # LLM'e ulaşılamadı ya da cevabı anlaşılamadı (ValueError): kural tabanlı öneri
+        error_code = e.status_code if isinstance(e, llm.LLMError) else None
+        if isinstance(e, llm.LLMQuotaExceeded):
+            reason = "OpenAI API kotası aşıldı. Lütfen OpenAI hesabınızda yeterli kredi olduğundan emin olun veya daha sonra tekrar deneyin. Kural tabanlı grafik önerisi kullanıldı."
+        elif isinstance(e, llm.LLMAuthError):
+            reason = "OpenAI API anahtarı geçersiz. Lütfen API anahtarınızı kontrol edin. Kural tabanlı grafik önerisi kullanıldı."
+        elif isinstance(e, llm.LLMUnavailable):
+            reason = "OpenAI servisi şu anda kullanılamıyor. Lütfen daha sonra tekrar deneyin. Kural tabanlı grafik önerisi kullanıldı."
         else:
-            reason = f"AI analizi sırasında bir hata oluştu (Kod: {error_code}). Varsayılan grafik ayarları kullanıldı."
-        
-        # Varsayılan değerler döndür
-        x_col = column_names[0] if column_names else ""
-        y_col = column_names[1] if len(column_names) > 1 else (column_names[0] if column_names else "")
-        
-        return {
-            "chartType": "bar",
-            "xColumn": x_col,
-            "yColumn": y_col,
+            reason = f"AI analizi sırasında bir hata oluştu (Kod: {error_code}). Kural tabanlı grafik önerisi kullanıldı."
+
+        # Varsayılan değerler olarak kural tabanlı öneriyi döndür
+        return db_file, column_profiles, {
+            **local_result,
             "reason": reason,
             "error": True,
             "errorCode": error_code
         }
 
+    return db_file, column_profiles, analysis
 
-@router.post("/chat")
-async def chat_with_ai(
-        message: dict,
+
+async def preanalyze_content(payload: dict) -> dict:
+    """
+    'analyze' işi ('ai_preanalyze_on_upload' açıksa yüklemeden sonra): kural
+    tabanlı öneriyi çıkarır, güveni düşükse LLM'e sorup sonucu önbelleğe
+    yazar. Kullanıcı dosyayı açtığında /analyze_file beklemeden cevap verir.
+    """
+    db = connection.Sessionlocal()
+    try:
+        blob = await run_blocking(db.get, models.BlobDB, payload["content_hash"])
+        if blob is None:
+            return {"skipped": "content_deleted"}
+        column_profiles = await run_blocking(profiling.ensure_profile, blob, db)
+        local = recommender.recommend(column_profiles, blob.correlations)
+        if local.confidence >= recommender.CONFIDENCE_THRESHOLD or llm.provider is None:
+            return {**local.as_dict(), "source": "local"}
+
+        cache_key = recommendation_key(blob, column_profiles, "analyze", ANALYZE_MODEL, ANALYZE_PROMPT_VERSION)
+        cached = await run_blocking(recommendation_cache.get, db, cache_key)
+        if cached is not None:
+            return cached
+        return await singleflight.do(("llm", cache_key), lambda: ask_llm_for_chart(column_profiles, cache_key))
+    finally:
+        await run_blocking(db.close)
+
+
+job_queue.register("analyze", preanalyze_content)
+
+
+@router.delete("/cache/{file_id}")
+async def invalidate_recommendations(
+        file_id: int,
         db: Session = Depends(connection.get_db),
         current_user: models.UserDB = Depends(get_current_user)
 ):
     """
-    Chatbot endpoint - kullanıcı mesajını alır, dosyaları kontrol eder ve AI ile konuşur.
-    AI cevapları İngilizce olacak.
+    Dosyanın içeriği için saklanan tüm AI önerilerini siler; sonraki
+    istekler OpenAI'ye yeniden sorar.
+    """
+    db_file = await run_blocking(get_owned_file, file_id, db, current_user)
+    deleted = await run_blocking(recommendation_cache.invalidate, db, db_file.content_hash)
+    return {"file_id": db_file.id, "invalidated": deleted}
+
+
+@dataclass
+class ChatContext:
+    """Bir sohbet isteği için modele gönderilecek her şey."""
+    user_entry: dict
+    messages: list[dict]
+    files_info: list[dict]
+    analysis_result: dict | None
+    prompt_tokens: int
+
+
+async def prepare_chat(
+        message: dict,
+        db: Session,
+        current_user: models.UserDB
+) -> ChatContext:
+    """
+    Kullanıcı mesajını doğrular; dosya listesi, geçmiş ve (mesajda bir dosya
+    geçiyorsa) dosya analizi ile modele gönderilecek mesajları hazırlar.
+    Normal ve akışlı (stream) sohbet endpoint'leri ortak kullanır.
+
+    Dosya analizi sohbetin isteğe bağlı bir parçasıdır: dosyanın o an
+    analiz edilemediğini bildiren HTTP hataları (hâlâ işleniyor 409, eski
+    biçim 409, ayrıştırma kuyruğu dolu 503, zaman aşımı 504 vb.) sohbeti
+    durdurmaz, model analiz olmadan cevap verir. LLM hataları analizde zaten
+    kural tabanlı öneriye çevrilir. Bunların dışındaki hatalar hata olarak
+    kabul edilir ve isteği (500) düşürür; bilerek yakalanmaz.
     """
-    if client is None:
-        raise HTTPException(status_code=500, detail="OpenAI API key is not configured.")
-    
     user_message = message.get("message", "").strip()
     if not user_message:
         raise HTTPException(status_code=400, detail="Message cannot be empty.")
     
     # Kullanıcının dosyalarını al
-    user_files = db.query(models.FileDB).filter(models.FileDB.owner_id == current_user.id).all()
+    user_files = await run_blocking(
+        lambda: db.query(models.FileDB).filter(models.FileDB.owner_id == current_user.id).all()
+    )
     files_info = [{"id": f.id, "filename": f.filename} for f in user_files]
     
-    # Chat history'yi al (yoksa oluştur)
-    if current_user.id not in user_chat_history:
-        user_chat_history[current_user.id] = []
-    
-    history = user_chat_history[current_user.id]
-    
-    # Kullanıcı mesajını history'ye ekle
-    history.append({"role": "user", "content": user_message})
+    # Chat history'yi depodan al (tüm worker'lar aynı geçmişi görür)
+    history = await run_blocking(chat_history.load, current_user.id)
+    user_entry = {"role": "user", "content": user_message}
     
     # System prompt hazırla
     system_prompt = """You are a helpful AI assistant for a data visualization platform. Your role is to help users understand their data files and recommend the best chart types and axis selections.
@@ -355,12 +499,16 @@ IMPORTANT RULES:
 
 Available files will be provided in the context. Analyze files using the provided data when requested."""
 
-    # Dosya bilgilerini context'e ekle
+    # Dosya bilgilerini context'e ekle (çok dosyası olan kullanıcıda liste bütçeyle sınırlı)
     files_context = ""
     if files_info:
-        files_context = f"\n\nUser's available files:\n"
-        for f in files_info:
-            files_context += f"- ID: {f['id']}, Filename: {f['filename']}\n"
+        file_lines, _ = prompts.fit_lines(
+            (f"- ID: {f['id']}, Filename: {f['filename']}" for f in files_info),
+            settings.prompt_token_budget // 3
+        )
+        files_context = f"\n\nUser's available files:\n" + "\n".join(file_lines) + "\n"
+        if len(file_lines) < len(files_info):
+            files_context += f"(+{len(files_info) - len(file_lines)} more files)\n"
     else:
         files_context = "\n\nThe user has no uploaded files yet. Encourage them to upload a CSV or Excel file."
     
@@ -372,65 +520,167 @@ Available files will be provided in the context. Analyze files using the provide
             break
     
     analysis_result = None
+    file_summary = None
     if file_mentioned:
         try:
-            # Dosyayı analiz et - analyze_file_for_chart async olduğu için await kullanıyoruz
-            analysis = await analyze_file_for_chart(file_mentioned["id"], db, current_user)
-            analysis_result = analysis
-        except Exception as e:
-            analysis_result = {"error": str(e)}
+            db_file, column_profiles, analysis_result = await _analyze_file(
+                file_mentioned["id"], "auto", db, current_user
+            )
+            # Modelin soruları cevaplayabilmesi için profilden kısa bir veri özeti
+            file_summary = prompts.build_dataset_summary(
+                column_profiles,
+                settings.prompt_token_budget // 2,
+                row_count=db_file.blob.row_count,
+                correlations=db_file.blob.correlations
+            )
+        except HTTPException as e:
+            # Dosya şu an analiz edilemiyor; sohbet analiz olmadan devam eder
+            # (bkz. docstring)
+            analysis_result = {"error": e.detail}
     
     # OpenAI'ye gönderilecek mesajları hazırla
     messages = [
         {"role": "system", "content": system_prompt + files_context}
     ]
     
-    # History'yi ekle (son 10 mesajı al)
-    for msg in history[-10:]:
-        messages.append(msg)
+    # History'yi ekle (token bütçesine sığan en yeni mesajlar)
+    messages.extend(trim_to_budget(history, settings.chat_history_token_budget))
+    messages.append(dict(user_entry))
     
-    # Eğer analiz sonucu varsa, bunu context'e ekle
+    # Eğer analiz sonucu varsa, bunu context'e ekle (geçmişe kaydedilmez)
     if analysis_result and not analysis_result.get("error"):
         analysis_context = f"\n\nAnalysis result for file '{file_mentioned['filename']}':\n"
         analysis_context += f"- Recommended Chart Type: {analysis_result.get('chartType', 'N/A')}\n"
         analysis_context += f"- Recommended X-axis: {analysis_result.get('xColumn', 'N/A')}\n"
         analysis_context += f"- Recommended Y-axis: {analysis_result.get('yColumn', 'N/A')}\n"
         analysis_context += f"- Explanation: {analysis_result.get('reason', 'N/A')}\n"
+        if file_summary is not None:
+            analysis_context += f"\nData summary:\n{file_summary.text}\n"
         analysis_context += "\nUse this information to provide a helpful response to the user."
         messages[-1]["content"] += analysis_context
-    
+
+    prompt_tokens = sum(
+        prompts.estimate_tokens(m["content"]) + prompts.MESSAGE_TOKEN_OVERHEAD for m in messages
+    )
+    return ChatContext(
+        user_entry=user_entry,
+        messages=messages,
+        files_info=files_info,
+        analysis_result=analysis_result if analysis_result else None,
+        prompt_tokens=prompt_tokens
+    )
+
+
+def fallback_reply(files_info: list[dict]) -> str:
+    """Model cevap veremediğinde kullanıcıya gösterilen basit cevap."""
+    fallback_response = "I apologize, but I'm having trouble processing your request right now. "
+    if files_info:
+        fallback_response += f"However, I can see you have {len(files_info)} file(s) uploaded. Would you like me to analyze one of them?"
+    else:
+        fallback_response += "Please try again later or upload a file to get started."
+    return fallback_response
+
+
+@router.post("/chat")
+async def chat_with_ai(
+        message: dict,
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """
+    Chatbot endpoint - kullanıcı mesajını alır, dosyaları kontrol eder ve AI ile konuşur.
+    AI cevapları İngilizce olacak.
+    """
+    if llm.provider is None:
+        raise HTTPException(status_code=500, detail="LLM provider is not configured.")
+
+    chat = await prepare_chat(message, db, current_user)
+
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
+        ai_response = await llm.provider.complete(
+            model=CHAT_MODEL,
+            messages=chat.messages,
             temperature=0.7,
-            max_tokens=500
+            max_tokens=CHAT_MAX_TOKENS
         )
+        ai_response = ai_response.strip()
         
-        ai_response = completion.choices[0].message.content.strip()
-        
-        # AI cevabını history'ye ekle
-        history.append({"role": "assistant", "content": ai_response})
-        
-        # History'yi sınırla (max 20 mesaj)
-        if len(history) > 20:
-            user_chat_history[current_user.id] = history[-20:]
+        # Kullanıcı mesajını ve AI cevabını history'ye ekle (depo kendi sınırlarını uygular)
+        await run_blocking(
+            chat_history.append, current_user.id,
+            [chat.user_entry, {"role": "assistant", "content": ai_response}]
+        )
         
         return {
             "response": ai_response,
-            "analysis": analysis_result if analysis_result else None
+            "analysis": chat.analysis_result,
+            "promptTokens": chat.prompt_tokens
         }
     
     except Exception as e:
-        error_str = str(e)
-        # Basit bir fallback response
-        fallback_response = "I apologize, but I'm having trouble processing your request right now. "
-        if files_info:
-            fallback_response += f"However, I can see you have {len(files_info)} file(s) uploaded. Would you like me to analyze one of them?"
-        else:
-            fallback_response += "Please try again later or upload a file to get started."
-        
         return {
-            "response": fallback_response,
-            "error": error_str
-        }
\ No newline at end of file
+            "response": fallback_reply(chat.files_info),
+            "error": str(e)
+        }
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Tek bir Server-Sent Events mesajı."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_with_ai_stream(
+        message: dict,
+        request: Request,
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """
+    /chat ile aynı, ancak cevap model ürettikçe Server-Sent Events olarak
+    gönderilir. Olaylar: 'meta' (analiz ve prompt token sayısı), her parça
+    için 'token', sonunda 'done' (tam cevap) veya 'error'. Geçmiş sadece
+    akış tamamlandığında yazılır; istemci bağlantıyı keserse modelden gelen
+    akış kapatılır ve geçmişe bir şey yazılmaz.
+    """
+    if llm.provider is None:
+        raise HTTPException(status_code=500, detail="LLM provider is not configured.")
+
+    chat = await prepare_chat(message, db, current_user)
+    user_id = current_user.id
+
+    async def events():
+        yield sse_event("meta", {"analysis": chat.analysis_result, "promptTokens": chat.prompt_tokens})
+
+        parts = []
+        stream = llm.provider.stream(
+            model=CHAT_MODEL,
+            messages=chat.messages,
+            temperature=0.7,
+            max_tokens=CHAT_MAX_TOKENS
+        )
+        try:
+            # Bağlantı kesildiğinde (iptal) veya hata olduğunda modeldeki akışı da kapat
+            async with contextlib.aclosing(stream):
+                async for delta in stream:
+                    if await request.is_disconnected():
+                        return
+                    parts.append(delta)
+                    yield sse_event("token", {"content": delta})
+        except Exception as e:
+            yield sse_event("error", {"response": fallback_reply(chat.files_info), "error": str(e)})
+            return
+
+        ai_response = "".join(parts).strip()
+        await run_blocking(
+            chat_history.append, user_id,
+            [chat.user_entry, {"role": "assistant", "content": ai_response}]
+        )
+        yield sse_event("done", {"response": ai_response})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Proxy'lerin (örn: nginx) olayları biriktirmemesi için
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -3,31 +3,58 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from database import connection
+from database import connection, models
 from core import security
 from core.config import settings
+from core.executors import run_blocking
 from schemas import token as token_schema
 
 router = APIRouter()
 
 
 @router.post("/token", response_model=token_schema.Token)
-def login_for_access_token(
+async def login_for_access_token(
         form_data: OAuth2PasswordRequestForm = Depends(),
         db: Session = Depends(connection.get_db)
 ):
-    """Kullanıcı girişi (Login). E-posta ve şifre ile token alır."""
-    user = security.get_user_by_email(db, email=form_data.username)  # OAuth2 e-postayı 'username' alanında gönderir
+    """
+    Kullanıcı girişi (Login). E-posta ve şifre ile token alır.
+    Şifre doğrulama ayrı, sınırlı bir havuzda çalışır; havuz doluysa 503 döner.
+    """
+    def find_user():
+        # OAuth2 e-postayı 'username' alanında gönderir
+        user = security.get_user_by_email(db, email=form_data.username)
+        if user is None:
+            return None
+        found = (user.id, user.email, user.hashed_password)
+        # Şifre doğrulanırken DB bağlantısı havuzda boşta dursun
+        db.close()
+        return found
 
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    found = await run_blocking(find_user)
+    verified, new_hash = False, None
+    if found:
+        verified, new_hash = await security.verify_and_update_password(form_data.password, found[2])
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Hatalı e-posta veya şifre",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    user_id, email, _ = found
+
+    # Argon2 parametreleri değiştiyse hash'i yeni parametrelerle güncelle
+    if new_hash:
+        def save_hash():
+            user = db.get(models.UserDB, user_id)
+            user.hashed_password = new_hash
+            db.commit()
+
+        await run_blocking(save_hash)
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        # 'uid' ile kullanıcı her istekte birincil anahtardan bulunur
+        data={"sub": email, "uid": user_id}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
@@ -1,17 +1,78 @@
 # app/routers/files.py
-import shutil
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+import zipfile
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, UploadFile, File, status
 from sqlalchemy.orm import Session
 from database import connection, models
 from schemas import files as file_schemas
 from core.security import get_current_user
-from typing import List
-import os
+from core.config import settings
+from core import columnar, http_cache, ingest, profiling, storage, uploads
+from core.executors import run_blocking
+from core.frame_cache import frame_cache
+from core.jobs import job_queue, JobFailed, QUEUED, RUNNING
+from core.parsing import parse_pool
+from typing import List, Optional
 
 router = APIRouter()
 
 # Yüklenen dosyaların saklanacağı klasör
 UPLOAD_DIRECTORY = "./uploaded_files"
+# İzin verilen dosya türleri
+ALLOWED_CONTENT_TYPES = ["text/csv", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"]
+
+
+def get_owned_file(file_id: int, db: Session, current_user: models.UserDB) -> models.FileDB:
+    """Dosyayı veritabanında bulur ve kullanıcıya ait olduğunu doğrular."""
+    db_file = db.query(models.FileDB).filter(models.FileDB.id == file_id).first()
+    if not db_file:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dosya bulunamadı.")
+    if db_file.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu dosyaya erişim yetkiniz yok.")
+    if db_file.blob is None:
+        # İçerik deposundan önce yüklenmiş ve taşınamamış dosya (bkz. database/backfill_blobs.py)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Bu dosya eski biçimde saklanmış. Lütfen dosyayı yeniden yükleyin."
+        )
+    return db_file
+
+
+def ingest_pending(db: Session, content_hash: str) -> bool:
+    """İçerik için sırada bekleyen ya da çalışan bir 'ingest' işi var mı?"""
+    return db.query(models.JobDB.id).join(
+        models.FileDB, models.JobDB.file_id == models.FileDB.id
+    ).filter(
+        models.FileDB.content_hash == content_hash,
+        models.JobDB.kind == "ingest",
+        models.JobDB.status.in_((QUEUED, RUNNING))
+    ).first() is not None
+
+
+def get_readable_file(file_id: int, db: Session, current_user: models.UserDB) -> models.FileDB:
+    """
+    get_owned_file gibi; içerik arka planda hâlâ işleniyorsa okuyucu dosyayı
+    kendisi ayrıştırmaya başlamaz, 409 (Retry-After ile) döner. Kontrol
+    sadece profil henüz kaydedilmemişken yapılır.
+    """
+    db_file = get_owned_file(file_id, db, current_user)
+    if db_file.blob.row_count is None and ingest_pending(db, db_file.content_hash):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Dosya hâlâ işleniyor. Lütfen biraz sonra tekrar deneyin.",
+            headers={"Retry-After": "2"}
+        )
+    return db_file
+
+
+def file_out(db_file: models.FileDB, job: Optional[models.JobDB]) -> dict:
+    """Yükleme cevabı; içerik arka planda işleniyorsa işin kimliğini de içerir."""
+    return {
+        "id": db_file.id,
+        "filename": db_file.filename,
+        "upload_date": db_file.upload_date,
+        "owner_id": db_file.owner_id,
+        "job_id": job.id if job is not None else None
+    }
 
 
 @router.post("/upload", response_model=file_schemas.File)
@@ -20,31 +81,285 @@ def upload_file(
         db: Session = Depends(connection.get_db),
         current_user: models.UserDB = Depends(get_current_user)
 ):
-    """CSV/Excel dosyası yükler. Korumalı endpoint."""
+    """
+    CSV/Excel dosyası yükler. Korumalı endpoint. Yeni içerik arka planda
+    ayrıştırılır; cevaptaki 'job_id' ile /jobs/{id} üzerinden takip edilir.
+    """
 
     # Güvenlik: Sadece belirli dosya türlerine izin ver
-    if file.content_type not in ["text/csv", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"]:
+    if file.content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(status_code=400, detail="Geçersiz dosya türü. Sadece CSV veya XLSX.")
 
-    file_path = f"{UPLOAD_DIRECTORY}/{current_user.id}_{file.filename}"
-
-    # Dosyayı diske kaydet
+    # Dosyayı diske parça parça yazarken içerik hash'ini hesapla
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        staged = storage.stage_upload(file.file, UPLOAD_DIRECTORY)
     finally:
         file.file.close()
 
+    db_file, job = register_upload(db, staged, file.filename, current_user)
+    db.commit()
+    db.refresh(db_file)
+    return file_out(db_file, job)
+
+
+def register_upload(
+        db: Session,
+        staged: storage.StagedUpload,
+        filename: str,
+        current_user: models.UserDB
+) -> tuple[models.FileDB, Optional[models.JobDB]]:
+    """
+    Hash'i hesaplanmış yüklemeyi depoya alır ve FileDB kaydını ekler. Yeni
+    içerik için arka plan işleme işi sıraya alınır. (FileDB, iş) döner;
+    commit etmez (iş, commit edildiğinde başlar).
+    """
+    # İçerik zaten depodaysa (aynı dosya daha önce yüklendiyse) diskteki kopya,
+    # sidecar ve profil paylaşılır; sadece yeni içerik ayrıştırılır.
+    blob, is_new = storage.acquire_blob(db, staged, UPLOAD_DIRECTORY, storage.extension_for(filename))
+
     # Dosya bilgilerini veritabanına kaydet
     db_file = models.FileDB(
-        filename=file.filename,
-        file_path=file_path,
+        filename=filename,
+        file_path=blob.blob_path,
+        content_hash=blob.content_hash,
         owner_id=current_user.id
     )
     db.add(db_file)
+    db.flush()
+
+    job = None
+    if is_new:
+        job = job_queue.enqueue(
+            db, "ingest", {"content_hash": blob.content_hash, "owner_id": current_user.id},
+            owner_id=current_user.id, file_id=db_file.id
+        )
+    return db_file, job
+
+
+def process_upload(payload: dict) -> dict:
+    """
+    'ingest' işi: sütun profilini ve sütun tabanlı kopyayı (Parquet) tek
+    geçişte, ayrı bir süreçte üretir. Dosya ayrıştırılamazsa profil, hatayı
+    işe yazmak için bir kez daha sidecar üzerinden denenir.
+    Ayrıştırma, okuyucuların tembel ayrıştırmasıyla aynı anahtarı (içerik
+    hash'i) kullanır; aynı içerik aynı anda iki kez ayrıştırılmaz. Kuyruk
+    doluysa iş daha sonra tekrar denenir. İş sürerken okuyucular 409 alır
+    (bkz. get_readable_file).
+    """
+    db = connection.Sessionlocal()
+    try:
+        blob = db.get(models.BlobDB, payload["content_hash"])
+        if blob is None:
+            raise JobFailed("Dosya içeriği bulunamadı (silinmiş olabilir).")
+
+        if blob.row_count is None or not columnar.is_sidecar_fresh(blob.sidecar_path, blob.blob_path):
+            result = parse_pool.run(ingest.ingest_file, blob.blob_path, key=blob.content_hash)
+            if result.sidecar_path is not None:
+                blob.sidecar_path = result.sidecar_path
+                db.commit()
+            if result.profile is not None and blob.row_count is None:
+                profiling.store_profile(blob, db, result.profile)
+        try:
+            profiling.ensure_profile(blob, db)
+        except (columnar.UnsupportedFileFormat, ValueError, zipfile.BadZipFile) as e:
+            # Dosya okunamıyor (pandas ayrıştırma hataları ValueError, bozuk XLSX
+            # BadZipFile'dır); tekrar denemek anlamsız
+            raise JobFailed(str(e))
+
+        if settings.ai_preanalyze_on_upload:
+            job_queue.enqueue(
+                db, "analyze", {"content_hash": blob.content_hash},
+                owner_id=payload.get("owner_id"), file_id=None
+            )
+            db.commit()
+        return {
+            "row_count": blob.row_count,
+            "columns": len(blob.column_profiles),
+            "sidecar": blob.sidecar_path is not None
+        }
+    finally:
+        db.close()
+
+
+job_queue.register("ingest", process_upload)
+
+
+# --- Parçalı (devam ettirilebilir) yükleme ---
+# 1. POST /files/uploads                      -> oturum aç (upload_id, offset=0)
+# 2. PUT  /files/uploads/{id}?offset=N        -> parçayı gönder (X-Chunk-SHA256 başlığıyla)
+#    GET  /files/uploads/{id}                 -> kopan yüklemenin kaldığı offset
+# 3. POST /files/uploads/{id}/complete        -> dosyayı kaydet ve ayrıştır
+
+
+def upload_session_out(session: models.UploadSessionDB) -> dict:
+    return {
+        "upload_id": session.id,
+        "filename": session.filename,
+        "size": session.size,
+        "offset": session.received,
+        "chunk_size": settings.upload_chunk_size,
+        "expires_at": session.expires_at,
+        "file_id": session.file_id
+    }
+
+
+def get_owned_upload(upload_id: str, db: Session, current_user: models.UserDB) -> models.UploadSessionDB:
+    """Yükleme oturumunu bulur ve kullanıcıya ait olduğunu doğrular."""
+    session = uploads.get_session(db, upload_id)
+    if session is None or session.owner_id != current_user.id:
+        # Başkasının oturumunun varlığı da açığa çıkmasın
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Yükleme oturumu bulunamadı.")
+    return session
+
+
+def get_active_upload(upload_id: str, db: Session, current_user: models.UserDB) -> models.UploadSessionDB:
+    """
+    get_owned_upload gibi; oturumun süresi dolduysa oturumu ve parça dosyasını
+    silip 410 döndürür (temizlik 'purge_expired'ı beklemez).
+    """
+    session = get_owned_upload(upload_id, db, current_user)
+    if uploads.is_expired(session):
+        uploads.delete_session(db, session)
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Yükleme oturumunun süresi doldu. Lütfen yüklemeyi yeniden başlatın."
+        )
+    return session
+
+
+@router.post("/uploads", response_model=file_schemas.UploadSession, status_code=status.HTTP_201_CREATED)
+def create_upload_session(
+        upload: file_schemas.UploadSessionCreate,
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """Büyük dosyalar için parçalı yükleme oturumu açar."""
+    if upload.content_type not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(status_code=400, detail="Geçersiz dosya türü. Sadece CSV veya XLSX.")
+    if upload.size <= 0:
+        raise HTTPException(status_code=400, detail="Dosya boyutu sıfırdan büyük olmalı.")
+
+    session = uploads.create_session(
+        db, current_user.id, upload.filename, upload.content_type, upload.size, UPLOAD_DIRECTORY
+    )
+    return upload_session_out(session)
+
+
+@router.get("/uploads/{upload_id}", response_model=file_schemas.UploadSession)
+def get_upload_session(
+        upload_id: str,
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """Yükleme oturumunun durumu; kopan yükleme 'offset'ten devam ettirilir."""
+    return upload_session_out(get_active_upload(upload_id, db, current_user))
+
+
+@router.put("/uploads/{upload_id}", response_model=file_schemas.UploadSession)
+async def upload_chunk(
+        upload_id: str,
+        request: Request,
+        offset: int = Query(..., ge=0, description="Parçanın dosyadaki başlangıç baytı"),
+        chunk_sha256: str = Header(..., alias="X-Chunk-SHA256", description="Parçanın SHA-256 özeti (hex)"),
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """
+    Bir parçayı (ham gövde) dosyanın sonuna ekler. Parça, sunucunun onayladığı
+    son bayttan ('offset') başlamalıdır; zaten alınmış bir parçanın tekrarı
+    (cevabı kaybolan istek) yazılmadan onaylanır. Gövde bellekte biriktirilmez.
+    """
+    def load():
+        session = get_active_upload(upload_id, db, current_user)
+        return session.id, session.part_path, session.size, session.received, session.file_id
+
+    upload_id, part_path, size, received, file_id = await run_blocking(load)
+    if file_id is not None:
+        raise HTTPException(status_code=409, detail="Yükleme zaten tamamlandı.")
+    if offset != received:
+        length = request.headers.get("content-length")
+        if offset < received and length is not None and offset + int(length) <= received:
+            # Daha önce onaylanmış parçanın tekrarı
+            return await run_blocking(lambda: upload_session_out(get_owned_upload(upload_id, db, current_user)))
+        raise HTTPException(status_code=409, detail=f"Parça {received}. bayttan başlamalı.")
+
+    try:
+        writer = await run_blocking(uploads.ChunkWriter, db, upload_id, part_path, offset, size)
+    except uploads.ChunkInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    except uploads.OffsetConflict as e:
+        raise HTTPException(status_code=409, detail=f"Parça {e.expected}. bayttan başlamalı.")
+    try:
+        buffer = bytearray()
+        async for piece in request.stream():
+            buffer += piece
+            if len(buffer) >= storage.COPY_BUFFER_SIZE:
+                await run_blocking(writer.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await run_blocking(writer.write, bytes(buffer))
+        await run_blocking(writer.commit, db, chunk_sha256)
+    except uploads.ChunkTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except uploads.ChecksumMismatch as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except uploads.OffsetConflict as e:
+        raise HTTPException(status_code=409, detail=f"Parça {e.expected}. bayttan başlamalı.")
+    finally:
+        await run_blocking(writer.abort)
+
+    return await run_blocking(lambda: upload_session_out(get_owned_upload(upload_id, db, current_user)))
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=file_schemas.File)
+def complete_upload(
+        upload_id: str,
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """
+    Tüm parçaları alınmış yüklemeyi dosya olarak kaydeder; içerik arka planda
+    ayrıştırılır ('job_id').
+    Tekrar çağrılırsa (cevap kaybolduysa) aynı dosyayı döndürür.
+    """
+    session = get_active_upload(upload_id, db, current_user)
+    if session.file_id is not None:
+        db_file = db.get(models.FileDB, session.file_id)
+        if db_file is None:
+            raise HTTPException(status_code=404, detail="Dosya bulunamadı.")
+        # İlk cevapla aynı biçim: dosyanın (varsa) son 'ingest' işi
+        job = db.query(models.JobDB).filter(
+            models.JobDB.file_id == db_file.id,
+            models.JobDB.kind == "ingest"
+        ).order_by(models.JobDB.id.desc()).first()
+        return file_out(db_file, job)
+    if session.received != session.size:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Yükleme tamamlanmadı: {session.received}/{session.size} bayt alındı."
+        )
+
+    staged = uploads.stage_session(session)
+    db_file, job = register_upload(db, staged, session.filename, current_user)
+    session.file_id = db_file.id
     db.commit()
+    uploads.forget(session.id)
     db.refresh(db_file)
-    return db_file
+    return file_out(db_file, job)
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def abort_upload(
+        upload_id: str,
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """Yükleme oturumunu ve alınan parçaları siler."""
+    session = get_owned_upload(upload_id, db, current_user)
+    uploads.delete_session(db, session)
+    db.commit()
+    return None
 
 
 @router.get("/", response_model=List[file_schemas.File])
@@ -56,6 +371,40 @@ def list_my_files(
     return db.query(models.FileDB).filter(models.FileDB.owner_id == current_user.id).all()
 
 
+@router.get("/{file_id}/profile", response_model=file_schemas.FileProfile)
+def get_file_profile(
+        file_id: int,
+        request: Request,
+        response: Response,
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """
+    Dosyanın sütun profilini (tip, boş sayısı, min/max, farklı değer sayısı,
+    örnek değerler) döndürür. Profil bir kez hesaplanır ve saklanır.
+    """
+    db_file = get_readable_file(file_id, db, current_user)
+    etag = http_cache.request_etag(db_file.content_hash, request)
+    cached = http_cache.conditional(request, response, etag)
+    if cached is not None:
+        return cached
+    try:
+        column_profiles = profiling.ensure_profile(db_file.blob, db)
+    except columnar.UnsupportedFileFormat as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dosya profili çıkarılırken hata oluştu: {e}")
+
+    return {
+        "file_id": db_file.id,
+        "row_count": db_file.blob.row_count,
+        "correlations": db_file.blob.correlations or [],
+        "columns": column_profiles
+    }
+
+
 @router.delete("/{file_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_file(
         file_id: int,
@@ -69,14 +418,15 @@ def delete_file(
     if db_file.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Bu dosyayı silme yetkiniz yok")
 
-    # Diskten sil (varsa)
-    try:
-        if db_file.file_path and os.path.exists(db_file.file_path):
-            os.remove(db_file.file_path)
-    except Exception:
-        # Disk silme başarısız olsa da veritabanından kaldırmaya devam edelim
-        pass
+    # İçeriğin referansını bırak; son referanssa içerik de diskten silinir
+    orphan_paths = storage.release_blob(db, db_file.blob) if db_file.blob else []
+
+    content_hash = db_file.content_hash
 
     db.delete(db_file)
     db.commit()
-    return None
\ No newline at end of file
+    if orphan_paths:
+        # İçerik tamamen silindi; önbellekteki ayrıştırılmış sütunlarını da at
+        frame_cache.invalidate(content_hash)
+        storage.remove_paths(orphan_paths)
+    return None
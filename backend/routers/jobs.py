@@ -0,0 +1,36 @@
+# app/routers/jobs.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from database import connection, models
+from schemas import jobs as job_schemas
+from core.security import get_current_user
+from typing import List
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[job_schemas.Job])
+def list_my_jobs(
+        file_id: int | None = Query(None, description="Sadece bu dosyanın işleri"),
+        limit: int = Query(50, ge=1, le=500),
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """Kullanıcının en son arka plan işlerini (yeniden eskiye) listeler."""
+    query = db.query(models.JobDB).filter(models.JobDB.owner_id == current_user.id)
+    if file_id is not None:
+        query = query.filter(models.JobDB.file_id == file_id)
+    return query.order_by(models.JobDB.id.desc()).limit(limit).all()
+
+
+@router.get("/{job_id}", response_model=job_schemas.Job)
+def get_job(
+        job_id: int,
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """Arka plan işinin durumu (queued, running, succeeded, failed) ve sonucu."""
+    job = db.get(models.JobDB, job_id)
+    if job is None or job.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="İş bulunamadı.")
+    return job
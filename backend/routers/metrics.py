@@ -0,0 +1,33 @@
+# app/routers/metrics.py
+from fastapi import APIRouter, Depends
+from database import connection, models
+from core.security import get_current_user
+from core.frame_cache import frame_cache
+from core.parsing import parse_pool
+from core.executors import password_executor
+from core.jobs import job_queue
+from core.singleflight import singleflight
+from core import auth_cache, llm, recommendation_cache
+
+router = APIRouter()
+
+
+@router.get("/cache")
+def get_cache_metrics(current_user: models.UserDB = Depends(get_current_user)):
+    """
+    Paylaşılan DataFrame önbelleğinin ve AI öneri önbelleğinin isabet/ıskalama
+    sayaçlarını, ayrıştırma ve şifre havuzlarının doluluğunu, birleştirilen (single-flight)
+    işleri, arka plan iş kuyruğunu, LLM sağlayıcısının istek sayaçlarını, kimlik doğrulama
+    önbelleğini ve veritabanı bağlantı havuzunun durumunu döndürür. Sayaçlar bu worker sürecine aittir.
+    """
+    return {
+        "dataframe_cache": frame_cache.stats(),
+        "ai_recommendation_cache": recommendation_cache.stats(),
+        "parse_pool": parse_pool.stats(),
+        "password_pool": password_executor.stats(),
+        "jobs": job_queue.stats(),
+        "singleflight": singleflight.stats(),
+        "llm": llm.provider.info() if llm.provider else None,
+        "auth_cache": auth_cache.stats(),
+        "db_pool": connection.engine.pool.status(),
+    }
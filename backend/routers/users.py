@@ -3,24 +3,29 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from database import connection, models
 from schemas import users as user_schemas
-from core.security import get_password_hash, get_user_by_email, get_current_user
+from core.security import hash_password, get_user_by_email, get_current_user
+from core.executors import run_blocking
 
 router = APIRouter()
 
 @router.post("/", response_model=user_schemas.User)
-def create_user(user: user_schemas.UserCreate, db: Session = Depends(connection.get_db)):
-    """Yeni kullanıcı oluşturma (Kayıt Ol / Register)."""
-    db_user = get_user_by_email(db, email=user.email)
+async def create_user(user: user_schemas.UserCreate, db: Session = Depends(connection.get_db)):
+    """Yeni kullanıcı oluşturma (Kayıt Ol / Register). Şifre, şifre havuzunda hash'lenir."""
+    db_user = await run_blocking(get_user_by_email, db, user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bu e-posta adresi zaten kayıtlı.",
         )
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(user.password)
     db_user = models.UserDB(email=user.email, hashed_password=hashed_password)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+
+    def save():
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+
+    await run_blocking(save)
     return db_user
 
 @router.get("/me", response_model=user_schemas.User)
@@ -1,72 +1,291 @@
 # routers/visualize.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from database import connection, models
 from core.security import get_current_user
+from core import columnar, aggregation, downsampling, arrow_encoding, http_cache, json_encoding, profiling
+from routers.files import get_readable_file
+from typing import List
+import numpy as np
 import pandas as pd
-
-# 'import numpy as np' Gerekebilir, ancak pandas'ın kendi fonksiyonlarını kullanmak daha iyidir.
+import base64
+import json
 
 router = APIRouter()
 
+# Tek bir sayfada döndürülebilecek en fazla satır sayısı
+MAX_PAGE_SIZE = 10_000
+# Arrow IPC cevabında satırlar nesneye çevrilmediği için sayfa çok daha büyük olabilir
+MAX_ARROW_PAGE_SIZE = 1_000_000
+# Downsampling sonrası döndürülebilecek en fazla nokta sayısı
+MAX_SERIES_POINTS = 20_000
+
+
+def load_columns(db_file: models.FileDB, db: Session, columns: List[str]) -> pd.DataFrame:
+    """Sadece istenen sütunları okur; okuma hatalarını HTTP hatalarına çevirir."""
+    try:
+        return columnar.load_dataframe(db_file.blob, db, columns=columns)
+    except columnar.UnsupportedFileFormat as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except columnar.UnknownColumns as e:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen sütun(lar): {e.args[0]}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dosya okunurken hata oluştu: {e}")
+
+
+def encode_cursor(offset: int) -> str:
+    """Sonraki sayfanın başlangıcını opak bir cursor'a çevirir."""
+    raw = json.dumps({"offset": offset}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor.encode()))["offset"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Geçersiz cursor.")
+    if not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=400, detail="Geçersiz cursor.")
+    return offset
+
 
 @router.get("/{file_id}/data")
 def get_visualization_data(
         file_id: int,
+        request: Request,
+        response: Response,
+        offset: int = Query(0, ge=0, description="Başlangıç satırı"),
+        limit: int = Query(1000, ge=1, le=MAX_ARROW_PAGE_SIZE,
+                           description=f"Sayfadaki satır sayısı (JSON'da en fazla {MAX_PAGE_SIZE})"),
+        columns: List[str] | None = Query(None, description="Sadece bu sütunları döndür"),
+        cursor: str | None = Query(None, description="Önceki cevaptaki 'next_cursor' (offset'in yerine geçer)"),
+        format: str = Query("records", pattern="^(records|columnar)$",
+                            description="records: satır nesneleri listesi, columnar: sütun başına değer listesi"),
         db: Session = Depends(connection.get_db),
         current_user: models.UserDB = Depends(get_current_user)
 ):
     """
-    Belirli bir dosyanın içeriğini okur, işler ve
+    Belirli bir dosyanın içeriğini sayfa sayfa okur ve
     grafik kütüphanesinin (React, Vue vb.) anlayacağı bir JSON formatında döndürür.
+    Sadece istenen satırlar ve sütunlar diskten okunur.
+
+    'format=columnar' ile veri {"columns": [...], "values": [[sütun0...], ...]}
+    olarak, sütun adları tekrarlanmadan ve NumPy dizilerinden doğrudan
+    (orjson) kodlanarak gönderilir; büyük sayfalarda çok daha küçük ve hızlıdır.
+
+    'Accept: application/vnd.apache.arrow.stream' başlığıyla veri Arrow IPC
+    stream olarak, kayıt grupları halinde gönderilir ('format' yok sayılır).
+    Sayfa bilgisi X-Total-Rows, X-Offset ve X-Next-Cursor başlıklarındadır.
+
+    Cevap ETag taşır; dosya ve parametreler değişmediyse If-None-Match ile
+    gelen istek veri okunmadan 304 ile cevaplanır.
     """
-    # 1. Dosyayı veritabanında bul
-    db_file = db.query(models.FileDB).filter(models.FileDB.id == file_id).first()
+    as_arrow = arrow_encoding.accepts_arrow(request.headers.get("accept"))
+    if not as_arrow and limit > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"JSON cevabında limit en fazla {MAX_PAGE_SIZE} olabilir.")
 
-    if not db_file:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dosya bulunamadı.")
+    db_file = get_readable_file(file_id, db, current_user)
 
-    # 2. Güvenlik: Dosya bu kullanıcıya mı ait?
-    if db_file.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu dosyaya erişim yetkiniz yok.")
+    # Aynı içerik + parametreler her zaman aynı cevabı üretir
+    etag = http_cache.request_etag(db_file.content_hash, request, "arrow" if as_arrow else "json")
+    cached = http_cache.conditional(request, response, etag, vary="Accept")
+    if cached is not None:
+        return cached
 
-    # 3. Dosyayı diskten oku (Pandas kullanarak)
+    if cursor is not None:
+        offset = decode_cursor(cursor)
+
+    # 3. İstenen satır penceresini sütun tabanlı kopyadan (Parquet) oku
     try:
-        file_path = db_file.file_path
-        if db_file.filename.endswith(".csv"):
-            df = pd.read_csv(file_path)
-        elif db_file.filename.endswith(".xlsx"):
-            df = pd.read_excel(file_path)
+        if as_arrow:
+            table, total_rows = columnar.read_window_table(db_file.blob, db, offset, limit, columns=columns)
         else:
-            raise HTTPException(status_code=400, detail="Desteklenmeyen dosya formatı.")
-
+            df, total_rows = columnar.read_window(db_file.blob, db, offset, limit, columns=columns)
+    except columnar.UnsupportedFileFormat as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except columnar.UnknownColumns as e:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen sütun(lar): {e.args[0]}")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dosya okunurken hata oluştu: {e}")
 
-    # --- DÜZELTİLMİŞ KISIM ---
     # 4. Veriyi ve sütun isimlerini frontend'e göndermek için hazırla
+    if as_arrow:
+        next_offset = offset + table.num_rows
+        paging = {
+            "total_rows": str(total_rows),
+            "offset": str(offset),
+            "limit": str(limit),
+            "next_cursor": encode_cursor(next_offset) if next_offset < total_rows else "",
+        }
+        headers = {
+            **http_cache.cache_headers(etag, vary="Accept"),
+            "X-Total-Rows": paging["total_rows"],
+            "X-Offset": paging["offset"],
+        }
+        if paging["next_cursor"]:
+            headers["X-Next-Cursor"] = paging["next_cursor"]
+        return StreamingResponse(
+            arrow_encoding.iter_ipc_stream(table, metadata=paging),
+            media_type=arrow_encoding.ARROW_STREAM_MEDIA_TYPE,
+            headers=headers
+        )
+
+    if format == "columnar":
+        next_offset = offset + len(df)
+        try:
+            content = json_encoding.dumps_columnar(
+                df,
+                total_rows=total_rows,
+                offset=offset,
+                limit=limit,
+                next_cursor=encode_cursor(next_offset) if next_offset < total_rows else None
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Veri JSON'a dönüştürülürken hata oluştu: {e}")
+        return Response(content=content, media_type="application/json",
+                        headers=http_cache.cache_headers(etag, vary="Accept"))
 
     try:
-        # --- YENİ SATIR: NaN DEĞERLERİNİ DÜZELTME ---
         # JSON standardı NaN (Not a Number) değerlerini desteklemez.
         # Bu yüzden Pandas'taki NaN'ları Python'un 'None' (JSON'da 'null' olur) değerine çeviriyoruz.
-        # Bunu yapmanın en sağlam yolu:
+        # Dönüşüm artık dosyanın tamamına değil, sadece bu sayfaya uygulanıyor.
         df_cleaned = df.astype(object).where(pd.notnull(df), None)
-        # --- BİTTİ ---
 
-        # Sütun isimlerini bir liste olarak al
         column_names = list(df_cleaned.columns)
-
-        # Verinin tamamı yerine ilk 1000 satırı al (büyük dosyalar için)
-        # .to_dict() kullanarak JSON listesine çevir
-        json_data = df_cleaned.head(1000).to_dict(orient="records")
+        json_data = df_cleaned.to_dict(orient="records")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Veri JSON'a dönüştürülürken hata oluştu: {e}")
 
-    # Hem sütunları hem de veriyi tek bir JSON objesi olarak döndür
+    next_offset = offset + len(json_data)
     return {
         "columns": column_names,
-        "data": json_data
-    }
\ No newline at end of file
+        "data": json_data,
+        "total_rows": total_rows,
+        "offset": offset,
+        "limit": limit,
+        "next_cursor": encode_cursor(next_offset) if next_offset < total_rows else None
+    }
+
+
+@router.get("/{file_id}/aggregate")
+def get_aggregated_chart_data(
+        file_id: int,
+        request: Request,
+        response: Response,
+        chart_type: str = Query(..., alias="chartType", description="bar | line | pie | scatter | area"),
+        x_column: str = Query(..., alias="xColumn"),
+        y_column: str | None = Query(None, alias="yColumn"),
+        agg: str = Query("sum", alias="aggregation", description="sum | mean | count | min | max"),
+        bins: int | None = Query(None, description="Sayısal X için histogram kova sayısı"),
+        time_bucket: str | None = Query(None, alias="timeBucket", description="hour | day | week | month | quarter | year"),
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """
+    Grafiği dosyanın tamamı üzerinden sunucuda hesaplar ve sadece
+    toplanmış seriyi ({"label", "value"} listesi) döndürür.
+    Diskten sadece X ve Y sütunları okunur.
+    """
+    db_file = get_readable_file(file_id, db, current_user)
+    etag = http_cache.request_etag(db_file.content_hash, request)
+    cached = http_cache.conditional(request, response, etag)
+    if cached is not None:
+        return cached
+
+    columns = [x_column] if y_column in (None, x_column) else [x_column, y_column]
+    df = load_columns(db_file, db, columns)
+
+    try:
+        return aggregation.aggregate(
+            df, chart_type, x_column, y_column,
+            aggregation=agg, bins=bins, time_bucket=time_bucket
+        )
+    except aggregation.AggregationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _x_axis_values(x: pd.Series, semantic_type: str) -> tuple[np.ndarray, bool]:
+    """
+    X sütununu downsampling için float dizisine çevirir. Tarih sütunları
+    (profildeki anlamsal tipe göre) epoch nanosaniyeye çevrilir; ikinci değer
+    X'in tarih olup olmadığıdır.
+    """
+    if semantic_type != "datetime" and pd.api.types.is_numeric_dtype(x) and not pd.api.types.is_bool_dtype(x):
+        return x.to_numpy(dtype=float, na_value=np.nan), False
+    if semantic_type not in ("datetime", "empty"):
+        raise HTTPException(status_code=400, detail="X sütunu sayısal veya tarih olmalı.")
+
+    x_time = x if pd.api.types.is_datetime64_any_dtype(x) else pd.to_datetime(x, errors="coerce")
+    if x_time.notna().sum() == 0:
+        raise HTTPException(status_code=400, detail="X sütunu sayısal veya tarih olmalı.")
+    values = x_time.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float)
+    values[x_time.isna().to_numpy()] = np.nan
+    return values, True
+
+
+@router.get("/{file_id}/series")
+def get_downsampled_series(
+        file_id: int,
+        request: Request,
+        response: Response,
+        x_column: str = Query(..., alias="xColumn"),
+        y_column: str = Query(..., alias="yColumn"),
+        downsample: str = Query("lttb", description="lttb | minmax | random"),
+        points: int = Query(1000, ge=3, le=MAX_SERIES_POINTS, description="Hedef nokta sayısı"),
+        db: Session = Depends(connection.get_db),
+        current_user: models.UserDB = Depends(get_current_user)
+):
+    """
+    Line, area ve scatter grafikler için serinin tamamını temsil eden
+    yaklaşık 'points' adet (x, y) noktası döndürür. İlk N satır yerine
+    görsel şekli koruyan downsampling kullanılır.
+    """
+    if downsample not in downsampling.METHODS:
+        raise HTTPException(status_code=400, detail=f"Geçersiz downsampling yöntemi: {downsample}")
+
+    db_file = get_readable_file(file_id, db, current_user)
+    etag = http_cache.request_etag(db_file.content_hash, request)
+    cached = http_cache.conditional(request, response, etag)
+    if cached is not None:
+        return cached
+
+    columns = [x_column] if y_column == x_column else [x_column, y_column]
+    df = load_columns(db_file, db, columns)
+
+    # Sütun tipi profilden gelir; veriyi tahmin için yeniden taramaya gerek yok
+    semantic_types = {c.name: c.semantic_type for c in profiling.ensure_profile(db_file.blob, db)}
+    x_values, x_is_time = _x_axis_values(df[x_column], semantic_types.get(x_column, "empty"))
+    y_values = pd.to_numeric(df[y_column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+    # Eksik noktaları at ve X'e göre sırala (zaten sıralıysa kopyalama yapma)
+    valid = ~(np.isnan(x_values) | np.isnan(y_values))
+    x_values, y_values = x_values[valid], y_values[valid]
+    if len(x_values) > 1 and np.any(np.diff(x_values) < 0):
+        order = np.argsort(x_values, kind="stable")
+        x_values, y_values = x_values[order], y_values[order]
+
+    selected = downsampling.downsample(x_values, y_values, downsample, points)
+    x_out, y_out = x_values[selected], y_values[selected]
+
+    if x_is_time:
+        x_labels = pd.to_datetime(x_out.astype(np.int64)).strftime("%Y-%m-%dT%H:%M:%S").tolist()
+    elif pd.api.types.is_integer_dtype(df[x_column]):
+        x_labels = x_out.astype(np.int64).tolist()
+    else:
+        x_labels = x_out.tolist()
+
+    return {
+        "xColumn": x_column,
+        "yColumn": y_column,
+        "downsample": downsample,
+        "points": len(selected),
+        "total_points": len(x_values),
+        "data": [{"x": x, "y": y} for x, y in zip(x_labels, y_out.tolist())]
+    }
@@ -1,5 +1,6 @@
 # app/schemas/files.py
 from pydantic import BaseModel
+from typing import Any, List
 import datetime
 
 class File(BaseModel):
@@ -7,6 +8,51 @@ class File(BaseModel):
     filename: str
     upload_date: datetime.datetime
     owner_id: int
+    job_id: int | None = None  # Yükleme sonrası arka plan işi (/jobs/{id})
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+
+
+class UploadSession(BaseModel):
+    upload_id: str
+    filename: str
+    size: int
+    offset: int  # Sunucunun onayladığı bayt; sonraki parça buradan başlar
+    chunk_size: int  # Önerilen parça boyutu
+    expires_at: datetime.datetime
+    file_id: int | None = None  # Yükleme tamamlandıysa oluşan dosya
+
+
+class ColumnProfile(BaseModel):
+    name: str
+    dtype: str
+    semantic_type: str
+    count: int
+    null_count: int
+    distinct_count: int
+    is_monotonic: bool | None = None
+    min_value: Any = None
+    max_value: Any = None
+    sample: List[Any] = []
+
+    class Config:
+        from_attributes = True
+
+
+class Correlation(BaseModel):
+    x: str
+    y: str
+    r: float
+
+
+class FileProfile(BaseModel):
+    file_id: int
+    row_count: int
+    columns: List[ColumnProfile]
+    correlations: List[Correlation] = []
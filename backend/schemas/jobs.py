@@ -0,0 +1,22 @@
+# app/schemas/jobs.py
+from pydantic import BaseModel
+from typing import Any
+import datetime
+
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    attempts: int
+    max_attempts: int
+    file_id: int | None = None
+    result: Any = None
+    error: str | None = None
+    created_at: datetime.datetime
+    run_after: datetime.datetime
+    started_at: datetime.datetime | None = None
+    finished_at: datetime.datetime | None = None
+
+    class Config:
+        from_attributes = True
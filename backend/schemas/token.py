@@ -5,4 +5,6 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    email: str | None = None
\ No newline at end of file
+    email: str | None = None
+    user_id: int | None = None  # 'uid' claim'i (eski token'larda yok)
+    expires_at: float = 0  # 'exp' claim'i (Unix zamanı)
\ No newline at end of file
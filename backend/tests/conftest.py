@@ -0,0 +1,133 @@
+# tests/conftest.py
+"""
+Testler geçici bir klasörde, geçici bir SQLite veritabanıyla çalışır.
+Ayarlar ortam değişkenleriyle, uygulama içe aktarılmadan önce verilir:
+ayrıştırma aynı süreçte yapılır, LLM çevrimdışı (stub) sağlayıcıdır ve
+Argon2 maliyeti testleri yavaşlatmayacak kadar düşüktür.
+"""
+import datetime
+import io
+import itertools
+import os
+import tempfile
+import time
+
+WORK_DIR = tempfile.mkdtemp(prefix="visdata-test-")
+os.environ.update({
+    "database_url": f"sqlite:///{WORK_DIR}/test.db",
+    "parse_workers": "0",
+    "llm_provider": "stub",
+    "argon2_time_cost": "1",
+    "argon2_memory_cost": "1024",
+    "argon2_parallelism": "1",
+    "job_poll_interval_seconds": "0.05",
+    "job_retry_backoff_seconds": "0.01",
+})
+os.chdir(WORK_DIR)
+os.makedirs("uploaded_files", exist_ok=True)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from database import connection, models  # noqa: E402
+
+_user_ids = itertools.count()
+
+
+@pytest.fixture
+def client():
+    """Uygulama; başlangıç olayları ve arka plan iş kuyruğu çalışır."""
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def register_user(client) -> tuple:
+    """Yeni bir kullanıcı kaydeder: (e-posta, şifre, yetki başlıkları)."""
+    email, password = f"user{next(_user_ids)}@example.com", "test-password"
+    response = client.post("/users/", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    token = client.post("/auth/token", data={"username": email, "password": password}).json()["access_token"]
+    return email, password, {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def user(client):
+    return register_user(client)
+
+
+@pytest.fixture
+def headers(user):
+    return user[2]
+
+
+def make_frame(rows: int = 500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=rows, freq="h").astype(str),
+        "category": rng.choice(["a", "b", "c"], rows),
+        "value": rng.normal(size=rows),
+        "count": np.arange(rows),
+    })
+
+
+def wait_for_job(client, headers, job_id: int, timeout: float = 10.0) -> dict:
+    """İş bitene (succeeded/failed) kadar bekler ve son durumunu döndürür."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}", headers=headers).json()
+        if job["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def upload_csv(client, headers, df: pd.DataFrame, filename: str = "data.csv"):
+    """Dosyayı yükler ve (yeni içerikse) arka plan işlemesinin bitmesini bekler."""
+    content = io.BytesIO(df.to_csv(index=False).encode())
+    response = client.post("/files/upload", files={"file": (filename, content, "text/csv")}, headers=headers)
+    assert response.status_code == 200, response.text
+    uploaded = response.json()
+    if uploaded.get("job_id") is not None:
+        assert wait_for_job(client, headers, uploaded["job_id"])["status"] == "succeeded"
+    return uploaded
+
+
+def reset_content(content_hash: str) -> None:
+    """İçeriği hiç işlenmemiş hale getirir (profil ve sidecar yok)."""
+    db = connection.Sessionlocal()
+    try:
+        blob = db.get(models.BlobDB, content_hash)
+        if blob.sidecar_path and os.path.exists(blob.sidecar_path):
+            os.remove(blob.sidecar_path)
+        blob.column_profiles = []
+        blob.row_count = None
+        blob.sidecar_path = None
+        db.commit()
+    finally:
+        db.close()
+
+
+def content_hash_of(file_id: int) -> str:
+    db = connection.Sessionlocal()
+    try:
+        return db.get(models.FileDB, file_id).content_hash
+    finally:
+        db.close()
+
+
+def queue_ingest_job(file_id: int, content_hash: str) -> int:
+    """Bir saat sonra çalışacak (yani testte hep bekleyen) bir 'ingest' işi ekler."""
+    db = connection.Sessionlocal()
+    try:
+        job = models.JobDB(
+            kind="ingest", status="queued", payload={"content_hash": content_hash}, attempts=0,
+            max_attempts=3, file_id=file_id,
+            run_after=datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        )
+        db.add(job)
+        db.commit()
+        return job.id
+    finally:
+        db.close()
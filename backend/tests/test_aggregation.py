@@ -0,0 +1,89 @@
+# tests/test_aggregation.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_frame, upload_csv
+from core import aggregation
+
+
+def test_group_by_category_sorts_bar_by_value():
+    df = pd.DataFrame({"category": ["a", "b", "a", "c", "b", "a"], "value": [1, 5, 2, 1, 5, 3]})
+
+    result = aggregation.aggregate(df, "bar", "category", "value", aggregation="sum")
+
+    assert result["data"] == [
+        {"label": "b", "value": 10.0},
+        {"label": "a", "value": 6.0},
+        {"label": "c", "value": 1.0},
+    ]
+    assert result["truncated"] is False
+
+
+def test_bins_cover_all_rows_in_x_order():
+    x = np.arange(100, dtype=float)
+    df = pd.DataFrame({"x": x})
+
+    result = aggregation.aggregate(df, "bar", "x", None, aggregation="count", bins=4)
+
+    assert [point["value"] for point in result["data"]] == [25, 25, 25, 25]
+    assert [point["label"] for point in result["data"]][1:] == ["24.75 – 49.5", "49.5 – 74.25", "74.25 – 99"]
+
+
+def test_time_bucket_groups_by_period_start():
+    df = pd.DataFrame({
+        "date": pd.date_range("2024-01-30", periods=4, freq="D").astype(str),
+        "value": [1.0, 2.0, 3.0, 4.0],
+    })
+
+    result = aggregation.aggregate(df, "line", "date", "value", aggregation="sum", time_bucket="month")
+
+    assert result["data"] == [
+        {"label": "2024-01-01T00:00:00", "value": 3.0},
+        {"label": "2024-02-01T00:00:00", "value": 7.0},
+    ]
+
+
+@pytest.mark.parametrize("agg", ["sum", "mean", "count", "max"])
+def test_overflow_categories_are_folded_into_other(agg):
+    categories = [f"k{i:03d}" for i in range(aggregation.MAX_CATEGORIES + 20)]
+    df = pd.DataFrame({"category": categories * 2, "value": np.arange(len(categories) * 2, dtype=float)})
+
+    result = aggregation.aggregate(df, "pie", "category", "value", aggregation=agg)
+
+    data = result["data"]
+    assert result["truncated"] is True
+    assert len(data) == aggregation.MAX_CATEGORIES
+    assert data[-1]["label"] == aggregation.OTHER_LABEL
+    shown = {point["label"] for point in data[:-1]}
+    rest = df[~df["category"].isin(shown)]["value"]
+    assert data[-1]["value"] == pytest.approx(rest.agg(agg))
+
+
+def test_invalid_parameters_raise():
+    df = pd.DataFrame({"x": [1, 2], "y": [3, 4]})
+    with pytest.raises(aggregation.AggregationError):
+        aggregation.aggregate(df, "bar", "x", "y", bins=3, time_bucket="day")
+    with pytest.raises(aggregation.AggregationError):
+        aggregation.aggregate(df, "bar", "x", None, aggregation="sum")
+    with pytest.raises(aggregation.AggregationError):
+        aggregation.aggregate(df, "bar", "x", "y", time_bucket="fortnight")
+
+
+def test_aggregate_endpoint_uses_whole_file(client, headers):
+    df = make_frame(rows=3000, seed=44)
+    uploaded = upload_csv(client, headers, df, "aggregate.csv")
+
+    response = client.get(
+        f"/visualize/{uploaded['id']}/aggregate?chartType=bar&xColumn=category&yColumn=count&aggregation=sum",
+        headers=headers
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_rows"] == len(df)
+    expected = df.groupby("category")["count"].sum()
+    assert {point["label"]: point["value"] for point in body["data"]} == expected.astype(float).to_dict()
+
+    bad = client.get(f"/visualize/{uploaded['id']}/aggregate?chartType=bar&xColumn=category&aggregation=sum",
+                     headers=headers)
+    assert bad.status_code == 400
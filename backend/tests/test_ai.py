@@ -0,0 +1,197 @@
+# tests/test_ai.py
+import json
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from conftest import content_hash_of, make_frame, queue_ingest_job, register_user, reset_content, upload_csv
+
+
+def test_chat_includes_analysis_of_mentioned_file(client, headers):
+    uploaded = upload_csv(client, headers, make_frame(), "sales.csv")
+
+    response = client.post("/ai/chat", json={"message": "What should I plot for sales.csv?"}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert "error" not in body
+    analysis = body["analysis"]
+    assert not analysis.get("error")
+    assert analysis["chartType"] and analysis["xColumn"] and analysis["yColumn"]
+
+    direct = client.get(f"/ai/analyze_file/{uploaded['id']}?mode=auto", headers=headers).json()
+    assert {k: direct[k] for k in ("chartType", "xColumn", "yColumn")} == \
+        {k: analysis[k] for k in ("chartType", "xColumn", "yColumn")}
+
+
+def test_analyze_file_etag(client, headers):
+    uploaded = upload_csv(client, headers, make_frame(), "etag.csv")
+    url = f"/ai/analyze_file/{uploaded['id']}?mode=local"
+
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    second = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test_recommend_chart_propagates_http_errors(client, headers):
+    assert client.get("/ai/recommend_chart/999999", headers=headers).status_code == 404
+
+    uploaded = upload_csv(client, headers, make_frame(seed=21), "owned.csv")
+    _, _, other_headers = register_user(client)
+    assert client.get(f"/ai/recommend_chart/{uploaded['id']}", headers=other_headers).status_code == 403
+
+    # İçerik arka planda işlenirken 409 (Retry-After ile) döner, 200 değil
+    reset_content(content_hash_of(uploaded["id"]))
+    queue_ingest_job(uploaded["id"], content_hash_of(uploaded["id"]))
+    response = client.get(f"/ai/recommend_chart/{uploaded['id']}", headers=headers)
+    assert response.status_code == 409
+    assert "Retry-After" in response.headers
+
+
+def test_chat_loads_mentioned_file_profile_once(client, headers, monkeypatch):
+    from routers import ai
+
+    upload_csv(client, headers, make_frame(seed=22), "once.csv")
+    calls = []
+    original = ai.load_file_profile
+
+    async def counting_load(*args, **kwargs):
+        calls.append(args[0])
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(ai, "load_file_profile", counting_load)
+    response = client.post("/ai/chat", json={"message": "Tell me about once.csv"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["analysis"]["chartType"]
+    assert len(calls) == 1
+
+
+def test_chat_continues_while_file_is_processing(client, headers):
+    uploaded = upload_csv(client, headers, make_frame(seed=23), "busy.csv")
+    reset_content(content_hash_of(uploaded["id"]))
+    queue_ingest_job(uploaded["id"], content_hash_of(uploaded["id"]))
+
+    response = client.post("/ai/chat", json={"message": "Plot busy.csv"}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["response"]
+    # Analiz yok; hata modele gönderilmez ama cevapta görünür
+    assert body["analysis"]["error"]
+
+
+@pytest.mark.parametrize("status, reason_word", [(429, "kota"), (401, "anahtar"), (503, "kullanılamıyor")])
+def test_analyze_file_falls_back_on_typed_llm_errors(client, headers, monkeypatch, status, reason_word):
+    from core import llm
+
+    def reject(request):
+        return httpx.Response(status, json={"error": {"message": "upstream says no", "type": "error"}})
+
+    provider = llm.OpenAIProvider(api_key="test", base_url="http://llm.test/v1", max_retries=0)
+    provider.client = AsyncOpenAI(
+        api_key="test",
+        base_url="http://llm.test/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(reject))
+    )
+    monkeypatch.setattr(llm, "provider", provider)
+
+    uploaded = upload_csv(client, headers, make_frame(seed=30 + status), f"llm_{status}.csv")
+    response = client.get(f"/ai/analyze_file/{uploaded['id']}?mode=llm", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["error"] is True
+    assert body["errorCode"] == status
+    assert reason_word in body["reason"]
+    assert body["source"] == "local" and body["chartType"]
+    # Geçici yedek öneri önbelleğe alınmaz
+    assert "ETag" not in response.headers
+
+
+def _user_id(email: str) -> int:
+    from database import connection, models
+
+    db = connection.Sessionlocal()
+    try:
+        return db.query(models.UserDB).filter(models.UserDB.email == email).one().id
+    finally:
+        db.close()
+
+
+def _sse_events(body: str) -> list:
+    """Boş satırla ayrılmış 'event:'/'data:' bloklarını (olay, veri) listesine çevirir."""
+    assert body.endswith("\n\n")
+    events = []
+    for block in body.split("\n\n")[:-1]:
+        event_line, data_line = block.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+def test_chat_stream_frames_tokens_and_saves_history(client, user):
+    from core import llm
+    from core.chat_history import chat_history
+
+    email, _, headers = user
+    with client.stream("POST", "/ai/chat/stream", json={"message": "hello"}, headers=headers) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["X-Accel-Buffering"] == "no"
+        events = _sse_events(response.read().decode())
+
+    names = [name for name, _ in events]
+    assert names[0] == "meta" and names[-1] == "done"
+    assert set(names[1:-1]) == {"token"}
+    reply = "".join(data["content"] for name, data in events if name == "token")
+    assert reply == llm.StubProvider.REPLY == events[-1][1]["response"]
+    assert [m["role"] for m in chat_history.load(_user_id(email))[-2:]] == ["user", "assistant"]
+
+
+def test_chat_stream_reports_provider_errors(client, headers, monkeypatch):
+    from core import llm
+
+    class Failing(llm.StubProvider):
+        async def stream(self, messages, model, temperature=0.7, max_tokens=None):
+            yield "partial"
+            raise llm.LLMUnavailable("bağlantı koptu")
+
+    monkeypatch.setattr(llm, "provider", Failing())
+    response = client.post("/ai/chat/stream", json={"message": "hello"}, headers=headers)
+    events = _sse_events(response.text)
+
+    assert [name for name, _ in events] == ["meta", "token", "error"]
+    assert events[-1][1]["error"] == "bağlantı koptu"
+    assert events[-1][1]["response"]
+
+
+def test_chat_stream_disconnect_closes_upstream_without_history(client, user, monkeypatch):
+    from starlette.requests import Request
+
+    from core import llm
+    from core.chat_history import chat_history
+
+    closed = []
+
+    class Endless(llm.StubProvider):
+        async def stream(self, messages, model, temperature=0.7, max_tokens=None):
+            try:
+                while True:
+                    yield "word "
+            finally:
+                closed.append(True)
+
+    async def disconnected(self):
+        return True
+
+    email, _, headers = user
+    monkeypatch.setattr(llm, "provider", Endless())
+    monkeypatch.setattr(Request, "is_disconnected", disconnected)
+    response = client.post("/ai/chat/stream", json={"message": "hello"}, headers=headers)
+
+    assert [name for name, _ in _sse_events(response.text)] == ["meta"]
+    assert closed == [True]
+    assert chat_history.load(_user_id(email)) == []
@@ -0,0 +1,65 @@
+# tests/test_arrow_encoding.py
+import pyarrow as pa
+import pytest
+
+from conftest import make_frame, upload_csv
+from core import arrow_encoding
+from routers.visualize import MAX_PAGE_SIZE
+
+ARROW = {"Accept": arrow_encoding.ARROW_STREAM_MEDIA_TYPE}
+
+
+def test_accepts_arrow_parses_media_ranges():
+    assert arrow_encoding.accepts_arrow("application/json, application/vnd.apache.arrow.stream;q=0.9")
+    assert arrow_encoding.accepts_arrow("Application/Vnd.Apache.Arrow.Stream")
+    assert not arrow_encoding.accepts_arrow("application/json")
+    assert not arrow_encoding.accepts_arrow(None)
+
+
+def test_ipc_stream_yields_one_chunk_per_batch():
+    table = pa.table({"x": list(range(10)), "y": [str(i) for i in range(10)]})
+
+    chunks = list(arrow_encoding.iter_ipc_stream(table, metadata={"total_rows": "10"}, batch_size=4))
+
+    # 3 kayıt grubu (ilkiyle birlikte şema) + bitiş işareti
+    assert len(chunks) == 4
+    reader = pa.ipc.open_stream(b"".join(chunks))
+    assert reader.schema.metadata[b"total_rows"] == b"10"
+    assert reader.read_all().to_pydict() == table.to_pydict()
+
+
+def test_arrow_response_carries_paging_headers(client, headers):
+    df = make_frame(rows=400, seed=52)
+    uploaded = upload_csv(client, headers, df, "arrow.csv")
+    url = f"/visualize/{uploaded['id']}/data?offset=100&limit=250&columns=count&columns=value"
+
+    response = client.get(url, headers={**headers, **ARROW})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == arrow_encoding.ARROW_STREAM_MEDIA_TYPE
+    assert response.headers["X-Total-Rows"] == "400"
+    assert response.headers["X-Offset"] == "100"
+    assert "Accept" in response.headers["Vary"]
+
+    reader = pa.ipc.open_stream(response.content)
+    assert reader.schema.metadata[b"next_cursor"].decode() == response.headers["X-Next-Cursor"]
+    table = reader.read_all()
+    assert table.column_names == ["count", "value"]
+    assert table.column("count").to_pylist() == list(range(100, 350))
+    assert table.column("value").to_pylist() == pytest.approx(df["value"].iloc[100:350].tolist())
+
+    json_response = client.get(url, headers=headers)
+    assert json_response.headers["ETag"] != response.headers["ETag"]
+
+    last = client.get(f"{url}&cursor={response.headers['X-Next-Cursor']}", headers={**headers, **ARROW})
+    assert "X-Next-Cursor" not in last.headers
+    assert pa.ipc.open_stream(last.content).read_all().num_rows == 50
+
+
+def test_arrow_allows_pages_larger_than_json(client, headers):
+    uploaded = upload_csv(client, headers, make_frame(rows=50, seed=53), "large_page.csv")
+    url = f"/visualize/{uploaded['id']}/data?limit={MAX_PAGE_SIZE + 1}"
+
+    assert client.get(url, headers=headers).status_code == 400
+    response = client.get(url, headers={**headers, **ARROW})
+    assert response.status_code == 200
+    assert pa.ipc.open_stream(response.content).read_all().num_rows == 50
@@ -0,0 +1,55 @@
+# tests/test_auth_cache.py
+from core.auth_cache import user_cache
+from database import connection, models
+
+
+def _user_id(client, headers) -> int:
+    response = client.get("/users/me", headers=headers)
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_cached_user_with_other_email_is_rejected(client, user):
+    email, _, headers = user
+    user_id = _user_id(client, headers)
+    cached = user_cache.get(user_id)
+    assert cached is not None and cached["email"] == email
+
+    # Önbellekteki kayıt token'daki e-postayla uyuşmuyorsa kabul edilmez
+    user_cache.put(user_id, {**cached, "email": "baska@example.com"})
+    assert client.get("/users/me", headers=headers).status_code == 401
+
+
+def test_email_change_invalidates_cache(client, user):
+    email, _, headers = user
+    user_id = _user_id(client, headers)
+    assert user_cache.get(user_id) is not None
+
+    db = connection.Sessionlocal()
+    try:
+        db_user = db.get(models.UserDB, user_id)
+        db_user.email = f"yeni-{email}"
+        db.commit()
+    finally:
+        db.close()
+
+    assert user_cache.get(user_id) is None
+    assert client.get("/users/me", headers=headers).status_code == 401
+
+
+def test_password_change_invalidates_cache(client, user):
+    email, _, headers = user
+    user_id = _user_id(client, headers)
+
+    db = connection.Sessionlocal()
+    try:
+        db_user = db.get(models.UserDB, user_id)
+        db_user.hashed_password = "x"
+        db.flush()
+        # Commit'ten önce eski satırı okuyan bir istek önbelleği doldurabilir
+        user_cache.put(user_id, {"id": user_id, "email": email, "hashed_password": "eski"})
+        db.commit()
+    finally:
+        db.close()
+
+    assert user_cache.get(user_id) is None
@@ -0,0 +1,35 @@
+# tests/test_connection.py
+from sqlalchemy import create_engine, text
+
+from core.config import settings
+from database import connection
+
+
+def test_engine_options_per_backend():
+    sqlite_file = connection.engine_options("sqlite:///data.db")
+    assert sqlite_file["pool_size"] == settings.db_pool_size
+    assert sqlite_file["pool_pre_ping"] is settings.db_pool_pre_ping
+    assert sqlite_file["connect_args"] == {"timeout": settings.db_statement_timeout_ms / 1000}
+
+    postgres = connection.engine_options("postgresql://user:pw@localhost/visdata")
+    assert postgres["pool_recycle"] == settings.db_pool_recycle_seconds
+    assert postgres["connect_args"] == {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+
+    # Bellek içi SQLite'ta havuz ayarları yok
+    assert "pool_size" not in connection.engine_options("sqlite://")
+
+
+def test_file_sqlite_connections_get_pragmas():
+    with connection.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == settings.sqlite_journal_mode
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.sqlite_cache_size_kib
+        assert conn.execute(text("PRAGMA mmap_size")).scalar() == settings.sqlite_mmap_size
+
+
+def test_memory_sqlite_skips_wal():
+    engine = create_engine("sqlite://", **connection.engine_options("sqlite://"))
+    connection.apply_sqlite_pragmas(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "memory"
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.sqlite_cache_size_kib
@@ -0,0 +1,28 @@
+# tests/test_downsampling.py
+import numpy as np
+import pytest
+
+from core import downsampling
+
+
+@pytest.mark.parametrize("method", downsampling.METHODS)
+@pytest.mark.parametrize("points", [3, 4, 5, 7, 50, 999])
+def test_never_returns_more_than_requested(method, points):
+    rng = np.random.default_rng(0)
+    x = np.arange(1000, dtype=float)
+    y = rng.normal(size=1000)
+
+    selected = downsampling.downsample(x, y, method, points)
+
+    assert len(selected) <= points
+    assert np.all(np.diff(selected) > 0)
+
+
+def test_minmax_keeps_endpoints_and_outliers():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    y[500], y[700] = 9.0, -9.0
+
+    selected = downsampling.minmax(x, y, 20)
+
+    assert {0, 999, 500, 700} <= set(selected.tolist())
@@ -0,0 +1,45 @@
+# tests/test_frame_cache.py
+import numpy as np
+import pandas as pd
+
+from conftest import make_frame, upload_csv
+from core import columnar
+from core.frame_cache import FrameCache, frame_cache
+from database import connection, models
+
+
+def _root(array: np.ndarray) -> np.ndarray:
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+def test_lru_eviction_respects_byte_budget():
+    cache = FrameCache(max_bytes=3 * 8000 + 500)
+    for i in range(5):
+        cache.put(("h", i), pd.Series(np.zeros(1000)))
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes
+    assert stats["evictions"] == 2
+    assert cache.get(("h", 0)) is None and cache.get(("h", 4)) is not None
+
+
+def test_cached_columns_own_their_memory(client, headers):
+    df = make_frame(2000)
+    df["value2"] = df["value"] * 2
+    uploaded = upload_csv(client, headers, df, "blocks.csv")
+
+    db = connection.Sessionlocal()
+    try:
+        blob = db.get(models.FileDB, uploaded["id"]).blob
+        frame_cache.clear()
+        columnar.load_dataframe(blob, db, columns=["value", "value2"])
+        content_hash = blob.content_hash
+    finally:
+        db.close()
+
+    for column in ("value", "value2"):
+        values = frame_cache.get((content_hash, column)).to_numpy()
+        # Önbellekte ölçülen boyut, Series'in gerçekten tuttuğu bellek olmalı;
+        # ortak 2 boyutlu bloğun bir satırı olmamalı
+        assert _root(values).nbytes <= values.nbytes
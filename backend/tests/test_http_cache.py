@@ -0,0 +1,45 @@
+# tests/test_http_cache.py
+import gzip
+
+import pytest
+import zstandard
+
+from conftest import make_frame, upload_csv
+
+
+@pytest.fixture
+def data_url(client, headers):
+    uploaded = upload_csv(client, headers, make_frame(2000), "cache.csv")
+    return f"/visualize/{uploaded['id']}/data?limit=500"
+
+
+def test_conditional_get_returns_304(client, headers, data_url):
+    first = client.get(data_url, headers={**headers, "Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    second = client.get(data_url, headers={**headers, "Accept-Encoding": "identity", "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize("encoding, decompress", [
+    ("gzip", gzip.decompress),
+    ("zstd", lambda body: zstandard.ZstdDecompressor().decompressobj().decompress(body)),
+])
+def test_compressed_body_and_suffixed_etag(client, headers, data_url, encoding, decompress):
+    plain = client.get(data_url, headers={**headers, "Accept-Encoding": "identity"})
+    # httpx gzip'i kendisi açar; ham gövdeyi karşılaştırmak için stream ile oku
+    with client.stream("GET", data_url, headers={**headers, "Accept-Encoding": encoding}) as response:
+        raw = b"".join(response.iter_raw())
+        assert response.headers["Content-Encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["Vary"]
+        etag = response.headers["ETag"]
+    assert decompress(raw) == plain.content
+    assert etag != plain.headers["ETag"] and etag.endswith(f'-{encoding}"')
+
+    # Sıkıştırılmış temsilin ETag'i de aynı içeriği gösterir
+    again = client.get(data_url, headers={**headers, "Accept-Encoding": encoding, "If-None-Match": etag})
+    assert again.status_code == 304
+    # 304, istemcinin doğruladığı temsilin etiketini geri gönderir
+    assert again.headers["ETag"] == etag
@@ -0,0 +1,200 @@
+# tests/test_ingest.py
+import datetime
+import glob
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from conftest import content_hash_of, make_frame, reset_content, upload_csv
+from core import columnar, ingest, profiling
+from core.parsing import parse_pool
+from database import connection, models
+from routers import files
+
+
+def test_readers_get_409_while_ingest_is_pending(client, headers):
+    uploaded = upload_csv(client, headers, make_frame(seed=1), "pending.csv")
+    content_hash = content_hash_of(uploaded["id"])
+    reset_content(content_hash)
+
+    db = connection.Sessionlocal()
+    try:
+        job = models.JobDB(
+            kind="ingest", status="queued", payload={"content_hash": content_hash}, attempts=0,
+            max_attempts=3, file_id=uploaded["id"],
+            run_after=datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        )
+        db.add(job)
+        db.commit()
+
+        response = client.get(f"/files/{uploaded['id']}/profile", headers=headers)
+        assert response.status_code == 409
+        assert "Retry-After" in response.headers
+        assert client.get(
+            f"/visualize/{uploaded['id']}/data?limit=10", headers=headers
+        ).status_code == 409
+        # Okuyucu sidecar üretmeye başlamamalı
+        assert db.get(models.BlobDB, content_hash).sidecar_path is None
+
+        job.status = "failed"
+        db.commit()
+    finally:
+        db.close()
+
+    # İş bittiyse (başarısız da olsa) okuyucu içeriği kendisi işler
+    response = client.get(f"/files/{uploaded['id']}/profile", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["row_count"] == 500
+
+
+def test_ingest_job_parses_under_content_hash_key(client, headers, monkeypatch):
+    uploaded = upload_csv(client, headers, make_frame(seed=2), "keyed.csv")
+    content_hash = content_hash_of(uploaded["id"])
+    reset_content(content_hash)
+
+    keys = []
+    original_run = parse_pool.run
+
+    def recording_run(func, *args, key=None):
+        keys.append(key)
+        return original_run(func, *args, key=key)
+
+    monkeypatch.setattr(parse_pool, "run", recording_run)
+    result = files.process_upload({"content_hash": content_hash, "owner_id": 1})
+    assert result["row_count"] == 500
+    assert keys == [content_hash]
+
+
+def test_concurrent_sidecar_writes_do_not_collide(tmp_path):
+    raw_path = str(tmp_path / "data.csv")
+    make_frame(5000).to_csv(raw_path, index=False)
+    errors = []
+
+    def write(use_ingest: bool):
+        try:
+            for _ in range(5):
+                if use_ingest:
+                    assert ingest.ingest_file(raw_path).sidecar_path is not None
+                else:
+                    columnar.build_sidecar(raw_path)
+        except Exception as e:  # Hata ana thread'de raporlanır
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(i % 2 == 0,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert glob.glob(str(tmp_path / "*.tmp")) == []
+    assert columnar.pq.read_metadata(columnar.sidecar_path_for(raw_path)).num_rows == 5000
+
+
+def test_profile_is_saved_once_when_two_readers_race(client, headers):
+    uploaded = upload_csv(client, headers, make_frame(seed=3), "race.csv")
+    content_hash = content_hash_of(uploaded["id"])
+    reset_content(content_hash)
+
+    first, second = connection.Sessionlocal(), connection.Sessionlocal()
+    try:
+        # İki okuyucu da profili henüz kaydedilmemiş görür
+        blob_a = first.get(models.BlobDB, content_hash)
+        blob_b = second.get(models.BlobDB, content_hash)
+        assert blob_a.row_count is None and blob_b.row_count is None
+
+        profiles_a = profiling.ensure_profile(blob_a, first)
+        profiles_b = profiling.ensure_profile(blob_b, second)
+        assert [p.id for p in profiles_a] == [p.id for p in profiles_b]
+        assert second.query(models.ColumnProfileDB).filter(
+            models.ColumnProfileDB.content_hash == content_hash
+        ).count() == 4
+    finally:
+        first.close()
+        second.close()
+
+
+def _write_csv(tmp_path, df) -> str:
+    path = str(tmp_path / "drift.csv")
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_chunk_boundaries_match_single_pass_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CSV_CHUNK_ROWS", 700)
+    df = make_frame(5000, seed=4)
+    path = _write_csv(tmp_path, df)
+
+    result = ingest.ingest_file(path)
+    whole = profiling.profile_dataframe(pd.read_csv(path))
+
+    assert result.profile["row_count"] == 5000
+    parquet_file = pq.ParquetFile(result.sidecar_path)
+    assert parquet_file.metadata.num_rows == 5000
+    # Satır grupları parça sınırlarını takip eder; veriler sırayla korunur
+    assert parquet_file.num_row_groups == 8
+    pd.testing.assert_frame_equal(pd.read_parquet(result.sidecar_path), pd.read_csv(path))
+    for chunked, single in zip(result.profile["columns"], whole["columns"]):
+        for field in ("name", "dtype", "semantic_type", "count", "null_count", "min", "max", "is_monotonic"):
+            assert chunked[field] == single[field], field
+
+
+def test_type_drift_widens_sidecar_schema(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CSV_CHUNK_ROWS", 100)
+    n = 350
+    df = pd.DataFrame({
+        "id": range(n),
+        # int -> (boş hücreyle) float
+        "amount": [float(i) if i != 150 else None for i in range(n)],
+        # int -> metin
+        "code": [str(i) for i in range(300)] + [f"X{i}" for i in range(50)],
+        # ilk parçada tamamen boş
+        "note": [None] * 100 + ["a"] * 250,
+    })
+    path = _write_csv(tmp_path, df)
+    df_written = pd.read_csv(path, dtype={"code": str})
+
+    result = ingest.ingest_file(path)
+    assert result.sidecar_path is not None
+    schema = pq.read_schema(result.sidecar_path)
+    assert schema.field("id").type == pa.int64()
+    assert schema.field("amount").type == pa.float64()
+    assert schema.field("code").type == pa.string()
+    assert schema.field("note").type == pa.string()
+
+    table = pq.read_table(result.sidecar_path)
+    assert table.num_rows == n
+    assert table.column("code").to_pylist() == list(df_written["code"])
+    assert table.column("amount").null_count == 1
+    assert table.column("note").null_count == 100
+    assert glob.glob(str(tmp_path / "*.tmp")) == []
+
+    columns = {c["name"]: c for c in result.profile["columns"]}
+    assert columns["amount"]["dtype"] == "float"
+    assert columns["code"]["dtype"] == "string"
+
+
+def test_unparseable_file_is_logged_not_raised(tmp_path, caplog):
+    path = str(tmp_path / "broken.xlsx")
+    with open(path, "wb") as f:
+        f.write(b"PK\x03\x04 bozuk")
+    with caplog.at_level("WARNING", logger="core.ingest"):
+        result = ingest.ingest_file(path)
+    assert result.sidecar_path is None and result.profile is None
+    assert "ayrıştırılamadı" in caplog.text
+
+
+def test_programming_errors_propagate(tmp_path, monkeypatch):
+    path = _write_csv(tmp_path, make_frame(50))
+
+    def broken_update(self, chunk):
+        raise RuntimeError("profiler hatası")
+
+    monkeypatch.setattr(profiling.DatasetProfiler, "update", broken_update)
+    with pytest.raises(RuntimeError):
+        ingest.ingest_file(path)
+    assert glob.glob(str(tmp_path / "*.tmp")) == []
@@ -0,0 +1,40 @@
+# tests/test_jobs.py
+import io
+
+from conftest import make_frame, upload_csv, wait_for_job
+
+
+def test_upload_is_ingested_in_background(client, headers):
+    uploaded = upload_csv(client, headers, make_frame(seed=7), "job.csv")
+    job = client.get(f"/jobs/{uploaded['job_id']}", headers=headers).json()
+    assert job["kind"] == "ingest" and job["status"] == "succeeded"
+    assert job["result"]["row_count"] == 500 and job["result"]["sidecar"] is True
+
+    # Aynı içerik tekrar yüklenirse yeniden işlenmez
+    again = upload_csv(client, headers, make_frame(seed=7), "copy.csv")
+    assert again["job_id"] is None
+
+
+def test_unreadable_file_fails_without_retry(client, headers):
+    content = io.BytesIO(b"PK\x03\x04 bozuk xlsx")
+    response = client.post(
+        "/files/upload",
+        files={"file": ("broken.xlsx", content,
+                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+        headers=headers
+    )
+    assert response.status_code == 200, response.text
+    job = wait_for_job(client, headers, response.json()["job_id"])
+    assert job["status"] == "failed"
+    assert job["attempts"] == 1
+
+
+def test_jobs_are_private(client, headers, user):
+    uploaded = upload_csv(client, headers, make_frame(seed=8), "private.csv")
+    other = client.post("/users/", json={"email": f"other-{user[0]}", "password": "test-password"})
+    assert other.status_code == 200
+    token = client.post(
+        "/auth/token", data={"username": f"other-{user[0]}", "password": "test-password"}
+    ).json()["access_token"]
+    response = client.get(f"/jobs/{uploaded['job_id']}", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
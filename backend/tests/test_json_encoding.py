@@ -0,0 +1,66 @@
+# tests/test_json_encoding.py
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_frame, upload_csv
+from core import json_encoding
+
+
+def test_columnar_encoding_writes_nulls_for_missing_values():
+    df = pd.DataFrame({
+        "f": [1.5, np.nan, np.inf],
+        "i": pd.array([1, None, 3], dtype="Int64"),
+        "s": ["a", None, "c"],
+        "t": pd.to_datetime(["2024-01-02 03:04:05", None, "2024-01-03 00:00:00"]),
+        "b": [True, False, True],
+    })
+
+    payload = json.loads(json_encoding.dumps_columnar(df, total_rows=3))
+
+    assert payload == {
+        "columns": ["f", "i", "s", "t", "b"],
+        "values": [
+            [1.5, None, None],
+            [1, None, 3],
+            ["a", None, "c"],
+            ["2024-01-02T03:04:05", None, "2024-01-03T00:00:00"],
+            [True, False, True],
+        ],
+        "total_rows": 3,
+    }
+
+
+def test_columnar_encoding_uses_numpy_buffers_directly():
+    assert isinstance(json_encoding.column_values(pd.Series(np.arange(3))), np.ndarray)
+    assert isinstance(json_encoding.column_values(pd.Series([0.5, np.nan])), np.ndarray)
+    assert isinstance(json_encoding.column_values(pd.Series(pd.date_range("2024-01-01", periods=2))), np.ndarray)
+
+
+def test_columnar_response_matches_record_response(client, headers):
+    df = make_frame(rows=300, seed=51)
+    uploaded = upload_csv(client, headers, df, "columnar.csv")
+    url = f"/visualize/{uploaded['id']}/data?offset=100&limit=150"
+
+    records = client.get(url, headers=headers).json()
+    response = client.get(url + "&format=columnar", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    columnar = response.json()
+
+    assert columnar["columns"] == records["columns"] == list(df.columns)
+    for name, values in zip(columnar["columns"], columnar["values"]):
+        expected = [row[name] for row in records["data"]]
+        if name == "value":
+            assert values == pytest.approx(expected)
+        else:
+            assert values == expected
+    assert {k: columnar[k] for k in ("total_rows", "offset", "limit", "next_cursor")} == \
+        {k: records[k] for k in ("total_rows", "offset", "limit", "next_cursor")}
+    assert columnar["total_rows"] == 300 and columnar["next_cursor"] is not None
+
+    last = client.get(f"{url}&format=columnar&cursor={columnar['next_cursor']}", headers=headers).json()
+    assert last["values"][3] == list(range(250, 300))
+    assert last["next_cursor"] is None
@@ -0,0 +1,74 @@
+# tests/test_legacy_files.py
+import os
+
+from conftest import make_frame, upload_csv
+from core import storage
+from database import connection, models
+from routers.files import UPLOAD_DIRECTORY
+
+
+def _legacy_file(db, owner_email: str, path: str) -> models.FileDB:
+    owner = db.query(models.UserDB).filter(models.UserDB.email == owner_email).one()
+    db_file = models.FileDB(filename=os.path.basename(path), file_path=path, owner_id=owner.id)
+    db.add(db_file)
+    db.commit()
+    return db_file
+
+
+def test_legacy_file_without_blob_returns_409(client, user):
+    email, _, headers = user
+    db = connection.Sessionlocal()
+    try:
+        file_id = _legacy_file(db, email, os.path.join(UPLOAD_DIRECTORY, "missing.csv")).id
+    finally:
+        db.close()
+
+    for url in (f"/files/{file_id}/profile", f"/visualize/{file_id}/data", f"/ai/analyze_file/{file_id}?mode=local"):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 409, (url, response.text)
+
+
+def test_backfill_links_legacy_files_to_blobs(client, user):
+    email, _, headers = user
+    df = make_frame(50, seed=7)
+    legacy_path = os.path.join(UPLOAD_DIRECTORY, "legacy.csv")
+    df.to_csv(legacy_path, index=False)
+    # Aynı içerik yeni yoldan da yüklenmiş: backfill mevcut içeriği paylaşmalı
+    uploaded = upload_csv(client, headers, df, "new.csv")
+
+    db = connection.Sessionlocal()
+    try:
+        first = _legacy_file(db, email, legacy_path).id
+        second = _legacy_file(db, email, legacy_path).id
+        result = storage.backfill_legacy_files(db, UPLOAD_DIRECTORY)
+        assert result["linked"] == 2
+
+        legacy = [db.get(models.FileDB, file_id) for file_id in (first, second)]
+        new = db.get(models.FileDB, uploaded["id"])
+        assert {f.content_hash for f in legacy} == {new.content_hash}
+        assert new.blob.ref_count == 3
+        assert not os.path.exists(legacy_path)
+    finally:
+        db.close()
+
+    response = client.get(f"/visualize/{first}/data?limit=5", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["total_rows"] == 50
+
+
+def test_add_missing_constraints_dedupes_profiles(tmp_path):
+    from sqlalchemy import create_engine, inspect, text
+    from database.backfill_blobs import add_missing_constraints
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # Tekillik kısıtı eklenmeden önceki tablo
+        conn.execute(text("CREATE TABLE column_profiles (id INTEGER PRIMARY KEY, content_hash VARCHAR, position INTEGER)"))
+        conn.execute(text("INSERT INTO column_profiles (content_hash, position) VALUES ('h', 0), ('h', 1), ('h', 0)"))
+
+    add_missing_constraints(engine)
+    add_missing_constraints(engine)  # Tekrar çalıştırmak güvenli
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id FROM column_profiles ORDER BY id")).scalars().all() == [1, 2]
+    assert any(index["unique"] for index in inspect(engine).get_indexes("column_profiles"))
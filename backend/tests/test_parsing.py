@@ -0,0 +1,41 @@
+# tests/test_parsing.py
+import time
+
+import pytest
+
+from core.parsing import ParseQueueFull, ParseTimeout, ParsingService
+
+
+def _wait_until(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_timeout_keeps_slot_until_worker_finishes():
+    service = ParsingService(workers=1, queue_limit=0, max_per_key=1, timeout=0.3)
+    try:
+        assert service.run(time.sleep, 0) is None  # Havuzu ısıt
+
+        with pytest.raises(ParseTimeout):
+            service.run(time.sleep, 2.0, key="owner")
+        # Worker hâlâ çalışıyor: kota bırakılmamalı
+        assert service.stats()["pending"] == 1
+        with pytest.raises(ParseQueueFull):
+            service.run(time.sleep, 0, key="other")
+
+        assert _wait_until(lambda: service.stats()["pending"] == 0)
+        assert service.stats()["pending_keys"] == 0
+        assert service.run(time.sleep, 0, key="other") is None
+    finally:
+        service.shutdown()
+
+
+def test_inline_mode_releases_slot():
+    service = ParsingService(workers=0, queue_limit=1, max_per_key=1, timeout=1)
+    with pytest.raises(ZeroDivisionError):
+        service.run(divmod, 1, 0, key="k")
+    assert service.stats()["pending"] == 0
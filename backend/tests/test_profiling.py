@@ -0,0 +1,78 @@
+# tests/test_profiling.py
+import io
+
+import pandas as pd
+
+from conftest import make_frame, upload_csv, wait_for_job
+from core import columnar, profiling
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def test_datetime_samples_are_iso_strings():
+    df = pd.DataFrame({"when": pd.date_range("2020-03-18", periods=5000, freq="h")})
+    profiler = profiling.DatasetProfiler()
+    # Birden fazla parça: örneklemin değiştirme (replacement) yolu da çalışır
+    for start in range(0, len(df), 1000):
+        profiler.update(df.iloc[start:start + 1000])
+    column = profiler.result()["columns"][0]
+
+    assert column["dtype"] == "datetime"
+    assert column["min"] == "2020-03-18T00:00:00"
+    assert len(column["sample"]) == profiling.SAMPLE_SIZE
+    for value in column["sample"]:
+        assert isinstance(value, str)
+        assert pd.Timestamp(value) >= pd.Timestamp(column["min"])
+
+
+def test_xlsx_date_column_profile(client, headers):
+    df = pd.DataFrame({
+        "date": pd.date_range("2020-03-18", periods=30, freq="D"),
+        "value": range(30),
+    })
+    content = io.BytesIO()
+    df.to_excel(content, index=False)
+    content.seek(0)
+    response = client.post("/files/upload", files={"file": ("dates.xlsx", content, XLSX)}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert wait_for_job(client, headers, response.json()["job_id"])["status"] == "succeeded"
+
+    profile = client.get(f"/files/{response.json()['id']}/profile", headers=headers).json()
+    date_column = next(c for c in profile["columns"] if c["name"] == "date")
+    assert date_column["semantic_type"] == "datetime"
+    assert all(isinstance(v, str) and v.startswith("2020-") for v in date_column["sample"])
+
+
+def test_profile_endpoint_reports_column_statistics(client, headers):
+    df = make_frame(rows=400, seed=45)
+    uploaded = upload_csv(client, headers, df, "profiled.csv")
+
+    response = client.get(f"/files/{uploaded['id']}/profile", headers=headers)
+    assert response.status_code == 200
+    profile = response.json()
+    assert profile["row_count"] == len(df)
+    columns = {column["name"]: column for column in profile["columns"]}
+    assert [column["name"] for column in profile["columns"]] == list(df.columns)
+    assert {name: column["semantic_type"] for name, column in columns.items()} == {
+        "date": "datetime", "category": "categorical", "value": "numeric", "count": "numeric"
+    }
+    assert columns["count"]["dtype"] == "integer"
+    assert (columns["count"]["min_value"], columns["count"]["max_value"]) == (0, len(df) - 1)
+    assert columns["count"]["is_monotonic"] is True
+    assert columns["category"]["distinct_count"] == 3
+    assert columns["value"]["null_count"] == 0
+
+
+def test_stored_profile_is_served_without_reading_data(client, headers, monkeypatch):
+    uploaded = upload_csv(client, headers, make_frame(rows=200, seed=46), "stored.csv")
+
+    def no_reads(*args, **kwargs):
+        raise AssertionError("veri yeniden okunmamalı")
+
+    monkeypatch.setattr(columnar, "ensure_sidecar", no_reads)
+    monkeypatch.setattr(columnar, "read_raw_file", no_reads)
+
+    assert client.get(f"/files/{uploaded['id']}/profile", headers=headers).status_code == 200
+    analysis = client.get(f"/ai/analyze_file/{uploaded['id']}?mode=local", headers=headers)
+    assert analysis.status_code == 200
+    assert analysis.json()["source"] == "local"
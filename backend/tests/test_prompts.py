@@ -0,0 +1,69 @@
+# tests/test_prompts.py
+import pandas as pd
+import pytest
+
+from core import prompts
+from database import models
+
+SEMANTIC_TYPES = [("datetime", "datetime"), ("numeric", "float"), ("categorical", "string"), ("text", "string")]
+
+
+def wide_profile(columns: int) -> list:
+    profiles = []
+    for i in range(columns):
+        semantic_type, dtype = SEMANTIC_TYPES[i % len(SEMANTIC_TYPES)]
+        profiles.append(models.ColumnProfileDB(
+            name=f"col_{i:03d}", dtype=dtype, semantic_type=semantic_type, count=1000, null_count=i,
+            distinct_count=10 + i, is_monotonic=False, min_value=0, max_value=i,
+            sample=["x" * 500, f"value {i}", i]
+        ))
+    return profiles
+
+
+@pytest.mark.parametrize("budget", [60, 200, 800, 4000])
+def test_summary_never_exceeds_budget(budget):
+    columns = wide_profile(300)
+    rows = pd.DataFrame({column.name: ["y" * 300] * 10 for column in columns})
+
+    summary = prompts.build_dataset_summary(columns, budget, row_count=1000, sample_rows=rows)
+
+    assert summary.tokens <= budget
+    assert summary.tokens == prompts.estimate_tokens(summary.text)
+    assert summary.columns_total == 300
+    assert summary.columns_shown < 300
+    assert f"(+{300 - summary.columns_shown} more columns not shown)" in summary.text
+
+
+def test_wide_tables_sample_every_column_type():
+    summary = prompts.build_dataset_summary(wide_profile(300), 400)
+
+    shown = [line for line in summary.text.splitlines() if line.startswith("- col_")]
+    assert len(shown) == summary.columns_shown
+    for semantic_type, _ in SEMANTIC_TYPES:
+        assert any(f"({semantic_type}/" in line for line in shown)
+    # Seçilen sütunlar dosyadaki sıralarıyla gösterilir
+    assert shown == sorted(shown)
+
+
+def test_long_cells_are_truncated():
+    text = prompts.truncate_value("a  very\nlong " + "z" * 500)
+
+    assert len(text) == prompts.MAX_CELL_CHARS
+    assert text.startswith("a very long ") and text.endswith("…")
+    assert prompts.truncate_value(None) == "null"
+    assert prompts.truncate_value(1 / 3) == "0.333333"
+
+
+def test_small_tables_fit_with_sample_rows():
+    columns = wide_profile(4)
+    rows = pd.DataFrame({column.name: [f"r{i}" for i in range(5)] for column in columns})
+
+    summary = prompts.build_dataset_summary(
+        columns, 2000, row_count=5, correlations=[{"x": "col_001", "y": "col_000", "r": 0.91}], sample_rows=rows
+    )
+
+    assert summary.columns_shown == 4
+    assert summary.rows_shown == 5
+    assert "more columns" not in summary.text
+    assert "correlations: col_001~col_000 r=0.91" in summary.text
+    assert "x" * (prompts.MAX_CELL_CHARS + 1) not in summary.text
@@ -0,0 +1,70 @@
+# tests/test_recommendation_cache.py
+import dataclasses
+
+from conftest import content_hash_of, make_frame, upload_csv
+from core import llm, recommendation_cache
+from core.config import settings
+from database import connection
+
+
+def _counting_provider(monkeypatch) -> llm.StubProvider:
+    provider = llm.StubProvider()
+    monkeypatch.setattr(llm, "provider", provider)
+    return provider
+
+
+def test_repeated_recommendation_is_served_from_cache(client, headers, monkeypatch):
+    provider = _counting_provider(monkeypatch)
+    uploaded = upload_csv(client, headers, make_frame(seed=47), "cached.csv")
+    url = f"/ai/recommend_chart/{uploaded['id']}"
+    before = recommendation_cache.stats()
+
+    first = client.get(url, headers=headers)
+    second = client.get(url, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert provider.stats.requests == 1
+    after = recommendation_cache.stats()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+    assert client.get("/metrics/cache", headers=headers).json()["ai_recommendation_cache"]["hits"] >= 1
+
+
+def test_delete_cache_forces_a_new_llm_call(client, headers, monkeypatch):
+    provider = _counting_provider(monkeypatch)
+    uploaded = upload_csv(client, headers, make_frame(seed=48), "invalidate.csv")
+    url = f"/ai/recommend_chart/{uploaded['id']}"
+
+    client.get(url, headers=headers)
+    deleted = client.delete(f"/ai/cache/{uploaded['id']}", headers=headers)
+    assert deleted.status_code == 200
+    assert deleted.json()["invalidated"] == 1
+
+    client.get(url, headers=headers)
+    assert provider.stats.requests == 2
+
+
+def test_expired_entries_are_misses(client, headers, monkeypatch):
+    uploaded = upload_csv(client, headers, make_frame(seed=49), "expired.csv")
+    key = recommendation_cache.RecommendationKey(
+        content_hash=content_hash_of(uploaded["id"]),
+        kind="recommend",
+        schema_hash="schema",
+        model="stub:test",
+        prompt_version="v1"
+    )
+    db = connection.Sessionlocal()
+    try:
+        recommendation_cache.put(db, key, {"recommendation": "fresh"})
+        assert recommendation_cache.get(db, key) == {"recommendation": "fresh"}
+        # Farklı prompt sürümü aynı kaydı kullanmaz
+        assert recommendation_cache.get(db, dataclasses.replace(key, prompt_version="v2")) is None
+
+        monkeypatch.setattr(settings, "ai_cache_ttl_seconds", -1)
+        recommendation_cache.put(db, key, {"recommendation": "stale"})
+        assert recommendation_cache.get(db, key) is None
+        # Süresi dolan kayıt silinir
+        assert recommendation_cache.invalidate(db, key.content_hash) == 0
+    finally:
+        db.close()
@@ -0,0 +1,80 @@
+# tests/test_recommender.py
+import pandas as pd
+
+from conftest import upload_csv
+from core import llm, recommender
+from database import models
+
+
+def column(name, semantic_type, dtype=None, count=100, distinct_count=50, is_monotonic=False, min_value=None):
+    dtype = dtype or {"numeric": "float", "datetime": "datetime"}.get(semantic_type, "string")
+    return models.ColumnProfileDB(
+        name=name, dtype=dtype, semantic_type=semantic_type, count=count, null_count=0,
+        distinct_count=distinct_count, is_monotonic=is_monotonic, min_value=min_value
+    )
+
+
+def test_sorted_dates_with_a_measure_give_a_confident_line():
+    result = recommender.recommend([
+        column("day", "datetime", is_monotonic=True),
+        column("sales", "numeric", min_value=1.0),
+    ])
+
+    assert (result.chart_type, result.x_column, result.y_column) == ("line", "day", "sales")
+    assert result.confidence >= recommender.CONFIDENCE_THRESHOLD
+
+
+def test_unsorted_dates_score_lower_than_sorted_ones():
+    sorted_dates = recommender.recommend([column("day", "datetime", is_monotonic=True), column("v", "numeric")])
+    unsorted_dates = recommender.recommend([column("day", "datetime"), column("v", "numeric")])
+
+    assert unsorted_dates.chart_type == "line"
+    assert unsorted_dates.confidence < sorted_dates.confidence
+
+
+def test_few_categories_prefer_bar_and_skip_id_columns():
+    result = recommender.recommend([
+        column("row_id", "numeric", dtype="integer", distinct_count=100, is_monotonic=True, min_value=0),
+        column("region", "categorical", distinct_count=4),
+        column("revenue", "numeric", min_value=0.0),
+    ])
+
+    assert (result.chart_type, result.x_column, result.y_column) == ("bar", "region", "revenue")
+    assert result.confidence >= recommender.CONFIDENCE_THRESHOLD
+
+
+def test_correlation_strength_decides_scatter_confidence():
+    columns = [column("height", "numeric"), column("weight", "numeric")]
+
+    strong = recommender.recommend(columns, [{"x": "height", "y": "weight", "r": -0.8}])
+    weak = recommender.recommend(columns, [{"x": "height", "y": "weight", "r": 0.1}])
+
+    assert strong.chart_type == "scatter" and strong.confidence >= recommender.CONFIDENCE_THRESHOLD
+    assert weak.confidence < recommender.CONFIDENCE_THRESHOLD
+
+
+def test_without_numeric_columns_recommends_a_low_confidence_table():
+    result = recommender.recommend([column("note", "text"), column("author", "text")])
+
+    assert result.chart_type == "table"
+    assert result.confidence < recommender.CONFIDENCE_THRESHOLD
+
+
+def test_auto_mode_asks_llm_only_below_threshold(client, headers, monkeypatch):
+    provider = llm.StubProvider()
+    monkeypatch.setattr(llm, "provider", provider)
+    confident = pd.DataFrame({
+        "date": pd.date_range("2021-01-01", periods=120, freq="D").astype(str),
+        "amount": [i * 1.5 for i in range(120)],
+    })
+    vague = pd.DataFrame({"note": [f"not {i}" for i in range(120)], "author": [f"kişi {i}" for i in range(120)]})
+    confident_file = upload_csv(client, headers, confident, "confident.csv")
+    vague_file = upload_csv(client, headers, vague, "vague.csv")
+
+    local = client.get(f"/ai/analyze_file/{confident_file['id']}?mode=auto", headers=headers).json()
+    assert local["source"] == "local" and local["chartType"] == "line"
+    assert provider.stats.requests == 0
+
+    asked = client.get(f"/ai/analyze_file/{vague_file['id']}?mode=auto", headers=headers).json()
+    assert asked["source"] == "llm"
+    assert provider.stats.requests == 1
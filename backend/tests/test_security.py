@@ -0,0 +1,56 @@
+# tests/test_security.py
+import asyncio
+import threading
+
+import pytest
+from passlib.context import CryptContext
+
+from conftest import register_user
+from core import security
+from core.executors import BoundedExecutor, ExecutorBusy
+from database import connection, models
+
+
+def test_bounded_executor_rejects_when_queue_is_full():
+    executor = BoundedExecutor("test-pool", workers=1, queue_limit=1, busy_detail="meşgul")
+    release = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorBusy) as rejected:
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+        return rejected.value
+
+    error = asyncio.run(main())
+
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
+    assert executor.stats() == {"workers": 1, "queue_limit": 1, "pending": 0, "completed": 2, "rejected": 1}
+
+
+def test_login_upgrades_hashes_made_with_old_parameters(client):
+    email, password, _ = register_user(client)
+    old_context = CryptContext(schemes=["argon2"], argon2__time_cost=2, argon2__memory_cost=2048,
+                               argon2__parallelism=1)
+    db = connection.Sessionlocal()
+    try:
+        user = db.query(models.UserDB).filter(models.UserDB.email == email).one()
+        user.hashed_password = old_context.hash(password)
+        db.commit()
+        assert security.pwd_context.needs_update(user.hashed_password)
+
+        response = client.post("/auth/token", data={"username": email, "password": password})
+        assert response.status_code == 200
+
+        db.expire_all()
+        upgraded = db.get(models.UserDB, user.id).hashed_password
+        assert not security.pwd_context.needs_update(upgraded)
+        assert security.verify_password(password, upgraded)
+    finally:
+        db.close()
+
+    assert client.post("/auth/token", data={"username": email, "password": password}).status_code == 200
+    assert client.post("/auth/token", data={"username": email, "password": "wrong"}).status_code == 401
@@ -0,0 +1,98 @@
+# tests/test_singleflight.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import make_frame, upload_csv
+from core import llm
+from core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"answer": 42}
+
+    async def main():
+        return await asyncio.gather(*(flight.do(("llm", "key"), work) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"leaders": 1, "followers": 4, "in_flight": 0}
+
+
+def test_different_keys_and_later_calls_run_again():
+    flight = SingleFlight()
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def main():
+        await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+        # Sonuç saklanmaz; iş bittikten sonraki çağrı yeniden çalıştırır
+        await flight.do("a", lambda: work("a"))
+
+    asyncio.run(main())
+
+    assert sorted(calls) == ["a", "a", "b"]
+
+
+def test_errors_are_shared_by_all_waiters():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_work():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_concurrent_identical_analyses_make_one_llm_call(client, headers, monkeypatch):
+    provider = llm.StubProvider(delay=0.3)
+    monkeypatch.setattr(llm, "provider", provider)
+    uploaded = upload_csv(client, headers, make_frame(seed=50), "coalesced.csv")
+    url = f"/ai/analyze_file/{uploaded['id']}?mode=llm"
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        responses = list(pool.map(lambda _: client.get(url, headers=headers), range(3)))
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert all(response.json() == responses[0].json() for response in responses)
+    assert provider.stats.requests == 1
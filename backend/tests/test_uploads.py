@@ -0,0 +1,159 @@
+# tests/test_uploads.py
+import datetime
+import hashlib
+import os
+
+import pytest
+
+from conftest import make_frame, wait_for_job
+from database import connection, models
+
+
+def _open_session(client, headers, content: bytes) -> dict:
+    response = client.post(
+        "/files/uploads",
+        json={"filename": "big.csv", "content_type": "text/csv", "size": len(content)},
+        headers=headers
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _put(client, headers, upload_id: str, offset: int, chunk: bytes, sha256: str | None = None):
+    return client.put(
+        f"/files/uploads/{upload_id}?offset={offset}",
+        content=chunk,
+        headers={**headers, "X-Chunk-SHA256": sha256 or hashlib.sha256(chunk).hexdigest()}
+    )
+
+
+def _expire(upload_id: str) -> str:
+    db = connection.Sessionlocal()
+    try:
+        session = db.get(models.UploadSessionDB, upload_id)
+        session.expires_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+        db.commit()
+        return session.part_path
+    finally:
+        db.close()
+
+
+def _session_exists(upload_id: str) -> bool:
+    db = connection.Sessionlocal()
+    try:
+        return db.get(models.UploadSessionDB, upload_id) is not None
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def content() -> bytes:
+    return make_frame(2000, seed=5).to_csv(index=False).encode()
+
+
+def test_chunked_upload_resumes_and_completes(client, headers, content):
+    upload_id = _open_session(client, headers, content)["upload_id"]
+    half = len(content) // 2
+
+    assert _put(client, headers, upload_id, 0, content[:half]).json()["offset"] == half
+    # Bozuk parça yazılmaz, offset ilerlemez
+    assert _put(client, headers, upload_id, half, content[half:], sha256="0" * 64).status_code == 400
+    # Boşluk bırakan parça reddedilir
+    assert _put(client, headers, upload_id, half + 1, content[half + 1:]).status_code == 409
+    # Cevabı kaybolan parçanın tekrarı yazılmadan onaylanır
+    assert _put(client, headers, upload_id, 0, content[:half]).json()["offset"] == half
+
+    assert client.get(f"/files/uploads/{upload_id}", headers=headers).json()["offset"] == half
+    assert _put(client, headers, upload_id, half, content[half:]).json()["offset"] == len(content)
+
+    completed = client.post(f"/files/uploads/{upload_id}/complete", headers=headers)
+    assert completed.status_code == 200, completed.text
+    file_id = completed.json()["id"]
+    # Tekrar çağrı aynı dosyayı, aynı biçimde (iş kimliğiyle) döndürür
+    assert client.post(f"/files/uploads/{upload_id}/complete", headers=headers).json() == completed.json()
+    assert wait_for_job(client, headers, completed.json()["job_id"])["status"] == "succeeded"
+    profile = client.get(f"/files/{file_id}/profile", headers=headers)
+    assert profile.status_code == 200
+    assert profile.json()["row_count"] == 2000
+
+
+def test_expired_session_rejects_chunks(client, headers, content):
+    upload_id = _open_session(client, headers, content)["upload_id"]
+    assert _put(client, headers, upload_id, 0, content[:100]).status_code == 200
+    part_path = _expire(upload_id)
+    assert os.path.exists(part_path)
+
+    assert _put(client, headers, upload_id, 100, content[100:]).status_code == 410
+    assert not _session_exists(upload_id)
+    assert not os.path.exists(part_path)
+    assert _put(client, headers, upload_id, 100, content[100:]).status_code == 404
+
+
+def test_expired_session_cannot_complete(client, headers, content):
+    upload_id = _open_session(client, headers, content)["upload_id"]
+    assert _put(client, headers, upload_id, 0, content).status_code == 200
+    part_path = _expire(upload_id)
+
+    assert client.post(f"/files/uploads/{upload_id}/complete", headers=headers).status_code == 410
+    assert not _session_exists(upload_id)
+    assert not os.path.exists(part_path)
+
+
+def test_second_writer_at_same_offset_is_rejected(client, headers, content):
+    from core import uploads
+
+    upload_id = _open_session(client, headers, content)["upload_id"]
+    chunk_a = content[:1000]
+    db = connection.Sessionlocal()
+    try:
+        part_path = db.get(models.UploadSessionDB, upload_id).part_path
+        first = uploads.ChunkWriter(db, upload_id, part_path, 0, len(content))
+        # İlk yazıcı onaylamadan ikinci yazıcı dosyaya dokunamaz
+        with pytest.raises(uploads.ChunkInProgress):
+            uploads.ChunkWriter(db, upload_id, part_path, 0, len(content))
+        first.write(chunk_a)
+        assert first.commit(db, hashlib.sha256(chunk_a).hexdigest()) == 1000
+
+        # Onaydan sonra aynı offset'e yazmak onaylı baytları kesmez
+        with pytest.raises(uploads.OffsetConflict):
+            uploads.ChunkWriter(db, upload_id, part_path, 0, len(content))
+        with open(part_path, "rb") as part:
+            assert part.read() == chunk_a
+    finally:
+        db.close()
+
+
+def test_concurrent_puts_at_same_offset_keep_content_hash_valid(client, headers, content):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from core import storage
+
+    upload_id = _open_session(client, headers, content)["upload_id"]
+    half = len(content) // 2
+    # Aynı offset'e, aynı uzunlukta ama farklı içerikli parçalar
+    variants = [content[:half]] + [bytes([48 + i]) * half for i in range(5)]
+    with ThreadPoolExecutor(len(variants)) as pool:
+        responses = list(pool.map(lambda chunk: _put(client, headers, upload_id, 0, chunk), variants))
+    assert {r.status_code for r in responses} <= {200, 409}
+    assert sum(r.status_code == 200 for r in responses) >= 1
+
+    db = connection.Sessionlocal()
+    try:
+        part_path = db.get(models.UploadSessionDB, upload_id).part_path
+    finally:
+        db.close()
+    with open(part_path, "rb") as part:
+        written = part.read()
+    assert len(written) == half and written in variants
+
+    assert _put(client, headers, upload_id, half, content[half:]).status_code == 200
+    completed = client.post(f"/files/uploads/{upload_id}/complete", headers=headers)
+    assert completed.status_code == 200, completed.text
+
+    db = connection.Sessionlocal()
+    try:
+        blob = db.get(models.FileDB, completed.json()["id"]).blob
+        # İçerik adresi diskteki baytların gerçek hash'i olmalı
+        assert storage.hash_file(blob.blob_path) == blob.content_hash
+    finally:
+        db.close()
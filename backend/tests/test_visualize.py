@@ -0,0 +1,58 @@
+# tests/test_visualize.py
+import pytest
+
+from conftest import make_frame, upload_csv
+
+
+def test_data_reads_requested_window_and_columns(client, headers):
+    df = make_frame(seed=40)
+    uploaded = upload_csv(client, headers, df, "window.csv")
+
+    response = client.get(f"/visualize/{uploaded['id']}/data?offset=10&limit=5&columns=value&columns=count",
+                          headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["columns"] == ["value", "count"]
+    assert body["total_rows"] == len(df)
+    assert body["offset"] == 10 and body["limit"] == 5
+    assert [row["count"] for row in body["data"]] == list(range(10, 15))
+    assert [row["value"] for row in body["data"]] == pytest.approx(df["value"].iloc[10:15].tolist())
+
+
+def test_data_cursor_pages_through_whole_file(client, headers):
+    df = make_frame(rows=450, seed=41)
+    uploaded = upload_csv(client, headers, df, "cursor.csv")
+
+    counts, cursor, pages = [], None, 0
+    while True:
+        url = f"/visualize/{uploaded['id']}/data?limit=200&columns=count"
+        if cursor:
+            url += f"&cursor={cursor}"
+        body = client.get(url, headers=headers).json()
+        counts += [row["count"] for row in body["data"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert counts == list(range(len(df)))
+
+
+def test_data_offset_past_end_returns_empty_page(client, headers):
+    uploaded = upload_csv(client, headers, make_frame(rows=50, seed=42), "short.csv")
+
+    response = client.get(f"/visualize/{uploaded['id']}/data?offset=1000&limit=10", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["data"] == []
+    assert body["total_rows"] == 50
+    assert body["next_cursor"] is None
+
+
+def test_data_rejects_bad_cursor_and_unknown_columns(client, headers):
+    uploaded = upload_csv(client, headers, make_frame(rows=50, seed=43), "bad.csv")
+    url = f"/visualize/{uploaded['id']}/data"
+
+    assert client.get(f"{url}?cursor=not-a-cursor", headers=headers).status_code == 400
+    assert client.get(f"{url}?columns=missing", headers=headers).status_code == 400